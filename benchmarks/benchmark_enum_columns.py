@@ -0,0 +1,120 @@
+"""Benchmark storing repetitive text columns of ContactsTable and ChannelsTable as text vs. EnumData.
+
+Writes and reads a 5000-row ContactsTable and ChannelsTable with the text columns stored as variable-length
+strings or as EnumData columns, and reports the write time, read time and file size.
+
+usage: python benchmarks/benchmark_enum_columns.py
+"""
+
+import datetime
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+from hdmf.common import DynamicTableRegion, VectorData
+from ndx_extracellular_channels import ChannelsTable, ContactsTable, Probe, ProbeModel
+
+from pynwb import NWBHDF5IO, NWBFile
+
+NUM_ROWS = 5000
+NUM_REPEATS = 3
+
+
+def add_text_column(table, name: str, values: list, use_enum: bool):
+    description = next(col["description"] for col in table.__columns__ if col["name"] == name)
+    if use_enum:
+        elements, indices = np.unique(values, return_inverse=True)
+        table.add_column(name=name, description=description, data=indices.astype(np.uint8), enum=elements.tolist())
+    else:
+        table.add_column(name=name, description=description, data=values)
+
+
+def make_nwbfile(use_enum: bool) -> NWBFile:
+    nwbfile = NWBFile(
+        session_description="benchmark",
+        identifier="benchmark",
+        session_start_time=datetime.datetime.now(datetime.timezone.utc),
+    )
+    # build the tables column by column because adding 5000 rows one by one is slow
+    rows = np.arange(NUM_ROWS)
+    contacts_table = ContactsTable(
+        description="contacts",
+        id=rows.tolist(),
+        columns=[
+            VectorData(
+                name="relative_position_in_um",
+                description="Relative position of the contact in micrometers",
+                data=np.column_stack([16.0 * (rows % 4), 20.0 * (rows // 4)]),
+            )
+        ],
+    )
+    add_text_column(contacts_table, "shape", ["square"] * NUM_ROWS, use_enum)
+    add_text_column(contacts_table, "shank_id", [f"shank{i % 4}" for i in rows], use_enum)
+    probe_model = ProbeModel(model="benchmark probe", contacts_table=contacts_table)
+    probe = Probe(name="probe", probe_model=probe_model)
+    nwbfile.add_device(probe_model)
+    nwbfile.add_device(probe)
+
+    channels_table = ChannelsTable(
+        description="channels",
+        probe=probe,
+        id=rows.tolist(),
+        columns=[
+            DynamicTableRegion(
+                name="contact",
+                description="The row in a ContactsTable that represents the contact used as a channel.",
+                data=rows,
+                table=contacts_table,
+            )
+        ],
+    )
+    areas = ["CA1", "CA3", "DG", "VISp", "LP"]
+    area_values = [areas[i * len(areas) // NUM_ROWS] for i in rows]
+    add_text_column(channels_table, "filter", ["High-pass at 300 Hz"] * NUM_ROWS, use_enum)
+    add_text_column(channels_table, "estimated_brain_area", area_values, use_enum)
+    add_text_column(channels_table, "confirmed_brain_area", area_values, use_enum)
+    nwbfile.add_acquisition(channels_table)
+    return nwbfile
+
+
+def read_columns(path: str):
+    with NWBHDF5IO(path, "r") as io:
+        nwbfile = io.read()
+        contacts_table = nwbfile.devices["benchmark probe"].contacts_table
+        channels_table = nwbfile.acquisition["ChannelsTable"]
+        for name in ContactsTable.ENUM_COLUMNS:
+            contacts_table[name][:]
+        for name in ChannelsTable.ENUM_COLUMNS:
+            channels_table[name][:]
+
+
+def main():
+    warnings.filterwarnings("ignore", message="EnumData is experimental")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for use_enum in (False, True):
+            path = os.path.join(tmpdir, f"benchmark_enum_{use_enum}.nwb")
+            write_times = []
+            read_times = []
+            for _ in range(NUM_REPEATS):
+                nwbfile = make_nwbfile(use_enum)
+                start = time.perf_counter()
+                with NWBHDF5IO(path, "w") as io:
+                    io.write(nwbfile)
+                write_times.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                read_columns(path)
+                read_times.append(time.perf_counter() - start)
+
+            label = "EnumData" if use_enum else "text"
+            print(
+                f"{label:>8}: write {np.median(write_times) * 1e3:8.1f} ms, "
+                f"read {np.median(read_times) * 1e3:8.1f} ms, "
+                f"size {os.path.getsize(path) / 1024:8.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
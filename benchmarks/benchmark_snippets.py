@@ -0,0 +1,102 @@
+"""Benchmark extracting waveform snippets with ExtracellularSeries.get_snippets vs. slicing once per spike.
+
+Writes a chunked and compressed 60-second, 384-channel int16 recording to an HDF5 file, then extracts 82-frame
+snippets on 32 channels around 5000 spike times by slicing `data` once per spike and with
+`ExtracellularSeries.get_snippets`, which merges nearby windows into chunk-aligned reads, and reports the times.
+
+usage: python benchmarks/benchmark_snippets.py
+"""
+
+import os
+import tempfile
+import time
+
+import h5py
+import numpy as np
+from hdmf.common import DynamicTableRegion, VectorData
+from ndx_extracellular_channels import ChannelsTable, ContactsTable, ExtracellularSeries, Probe, ProbeModel
+
+NUM_CHANNELS = 384
+RATE = 30000.0
+DURATION = 60
+NUM_SPIKES = 5000
+NUM_FRAMES_BEFORE = 30
+NUM_FRAMES_AFTER = 52
+CHANNELS = np.arange(100, 132)
+CHUNKS = (8192, 64)
+
+
+def make_series(data) -> ExtracellularSeries:
+    # build the tables column by column because adding hundreds of rows one by one is slow
+    rows = np.arange(NUM_CHANNELS)
+    contacts_table = ContactsTable(
+        description="contacts",
+        id=rows.tolist(),
+        columns=[
+            VectorData(
+                name="relative_position_in_um",
+                description="Relative position of the contact in micrometers",
+                data=np.column_stack([16.0 * (rows % 4), 20.0 * (rows // 4)]),
+            )
+        ],
+    )
+    probe = Probe(name="probe", probe_model=ProbeModel(model="benchmark probe", contacts_table=contacts_table))
+    channels_table = ChannelsTable(
+        description="channels",
+        probe=probe,
+        id=rows.tolist(),
+        columns=[DynamicTableRegion(name="contact", description="contact", data=rows, table=contacts_table)],
+    )
+    channels = DynamicTableRegion(name="channels", description="channels", data=rows, table=channels_table)
+    return ExtracellularSeries(
+        name="series", data=data, rate=RATE, channels=channels, channel_conversion=[1.0] * NUM_CHANNELS
+    )
+
+
+def naive_snippets(series, frames) -> np.ndarray:
+    gains = series.get_conversion_factors()[CHANNELS]
+    out = np.empty((len(frames), NUM_FRAMES_BEFORE + NUM_FRAMES_AFTER, len(CHANNELS)), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        snippet = series.data[frame - NUM_FRAMES_BEFORE : frame + NUM_FRAMES_AFTER, CHANNELS[0] : CHANNELS[-1] + 1]
+        out[i] = snippet * gains + series.offset
+    return out
+
+
+def main():
+    rng = np.random.default_rng(0)
+    num_times = int(DURATION * RATE)
+    frames = rng.integers(NUM_FRAMES_BEFORE, num_times - NUM_FRAMES_AFTER, size=NUM_SPIKES)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "recording.h5")
+        with h5py.File(path, "w") as f:
+            dset = f.create_dataset(
+                "data", shape=(num_times, NUM_CHANNELS), dtype=np.int16, chunks=CHUNKS, compression="gzip"
+            )
+            for start in range(0, num_times, CHUNKS[0] * 16):
+                stop = min(start + CHUNKS[0] * 16, num_times)
+                dset[start:stop] = rng.integers(-200, 200, size=(stop - start, NUM_CHANNELS), dtype=np.int16)
+
+        with h5py.File(path, "r") as f:
+            series = make_series(f["data"])
+
+            start = time.perf_counter()
+            expected = naive_snippets(series, frames)
+            naive_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            snippets = series.get_snippets(
+                frames=frames,
+                num_frames_before=NUM_FRAMES_BEFORE,
+                num_frames_after=NUM_FRAMES_AFTER,
+                channels=CHANNELS,
+            )
+            coalesced_time = time.perf_counter() - start
+
+    assert np.array_equal(snippets, expected)
+    print(f"{NUM_SPIKES} snippets of {NUM_FRAMES_BEFORE + NUM_FRAMES_AFTER} frames x {len(CHANNELS)} channels")
+    print(f"per-spike slicing:  {naive_time:8.3f} s")
+    print(f"get_snippets:       {coalesced_time:8.3f} s ({naive_time / coalesced_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Build the probe library shipped with ndx-extracellular-channels.
+
+Generates the full electrode layout of the Neuropixels probes described in ``probeinterface.io.npx_probe``, with
+the same contact positions, contact IDs ("e{electrode}" or "s{shank}e{electrode}"), shapes and contours as the
+probes read by ``probeinterface.read_spikeglx``, converts them with ``from_probeinterface`` and saves them with
+``save_probe_library``. Other probes, e.g., from ``probeinterface.get_probe``, can be added to ``extra_probes``.
+
+usage: python scripts/build_probe_library.py [output_path]
+"""
+
+import sys
+
+import numpy as np
+import probeinterface
+from ndx_extracellular_channels import from_probeinterface, save_probe_library
+from ndx_extracellular_channels.library import LIBRARY_PATH
+from probeinterface.io import npx_probe
+
+# probe type in probeinterface.io.npx_probe -> number of electrodes per shank
+NEUROPIXELS_PROBES = {
+    "0": 960,  # Neuropixels 1.0
+    "2003": 1280,  # Neuropixels 2.0 - Single Shank
+    "2013": 1280,  # Neuropixels 2.0 - Four Shank
+    "1100": 384,  # Neuropixels Ultra
+}
+
+
+def make_neuropixels_probe(probe_type: str, num_electrodes: int) -> probeinterface.Probe:
+    description = npx_probe[probe_type]
+    num_shanks = description["shank_number"]
+    elec_ids = np.tile(np.arange(num_electrodes), num_shanks)
+    shank_ids = np.repeat(np.arange(num_shanks), num_electrodes)
+
+    y_idx, x_idx = np.divmod(elec_ids, description["ncol"])
+    stagger = np.mod(y_idx + 1, 2) * description["stagger"]
+    x_pos = x_idx * description["x_pitch"] + stagger + shank_ids * description["shank_pitch"]
+    y_pos = y_idx * description["y_pitch"]
+
+    probe = probeinterface.Probe(
+        ndim=2, si_units="um", name=description["model_name"], model_name=description["model_name"], manufacturer="IMEC"
+    )
+    probe.set_contacts(
+        positions=np.stack((x_pos, y_pos), axis=1).astype(float),
+        shapes="square",
+        shank_ids=shank_ids if num_shanks > 1 else None,
+        shape_params={"width": description["contact_width"]},
+    )
+    if num_shanks > 1:
+        probe.set_contact_ids([f"s{shank}e{elec}" for shank, elec in zip(shank_ids, elec_ids)])
+    else:
+        probe.set_contact_ids([f"e{elec}" for elec in elec_ids])
+    polygon = np.array(description["polygon"])
+    contour = np.concatenate([polygon + [description["shank_pitch"] * shank, 0] for shank in range(num_shanks)])
+    probe.set_planar_contour(contour - [11, 11])
+    return probe
+
+
+def main(output_path: str = LIBRARY_PATH, extra_probes: tuple = ()):
+    probes = [make_neuropixels_probe(probe_type, num) for probe_type, num in NEUROPIXELS_PROBES.items()]
+    probes.extend(extra_probes)
+    probe_models = [from_probeinterface(probe, compact_plane_axes=True)[0].probe_model for probe in probes]
+    save_probe_library(output_path, probe_models)
+    print(f"Saved {len(probe_models)} probe models to {output_path}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -1,8 +1,16 @@
 import os
 import warnings
 
+import numpy as np
+from hdmf.common import DynamicTableRegion, EnumData
+from hdmf.common.io.table import DynamicTableMap
+from hdmf.data_utils import DataIO
 from hdmf.utils import docval, get_docval, get_data_shape
-from pynwb import get_class, load_namespaces, register_class
+from pynwb import get_class, load_namespaces, register_class, register_map
+
+from .groups import GroupIndex
+from .instrumentation import add_hook, instrumented, record_operations, remove_hook, write_nwbfile
+from .reading import BlockPrefetcher, CachedDataset, ChunkCache
 
 try:
     from importlib.resources import files
@@ -21,13 +29,333 @@ if not os.path.exists(__spec_path):
 # Load the namespace
 load_namespaces(str(__spec_path))
 
-ProbeInsertion = get_class("ProbeInsertion", "ndx-extracellular-channels")
-ContactsTable = get_class("ContactsTable", "ndx-extracellular-channels")
+AutoProbeInsertion = get_class("ProbeInsertion", "ndx-extracellular-channels")
+AutoContactsTable = get_class("ContactsTable", "ndx-extracellular-channels")
 AutoProbeModel = get_class("ProbeModel", "ndx-extracellular-channels")
 Probe = get_class("Probe", "ndx-extracellular-channels")
 AutoChannelsTable = get_class("ChannelsTable", "ndx-extracellular-channels")
 AutoExtracellularSeries = get_class("ExtracellularSeries", "ndx-extracellular-channels")
 
+enum_columns_dv = {
+    "name": "enum_columns",
+    "type": (list, tuple),
+    "doc": (
+        "names of text columns to store as EnumData columns, i.e., as integer indices into the set of distinct "
+        "values of the column. Must be a subset of ``ENUM_COLUMNS``. Values are decoded transparently when the "
+        "column is indexed, e.g., ``table['shape'][:]``."
+    ),
+    "default": None,
+}
+
+
+def _add_enum_columns(table, enum_columns):
+    for name in enum_columns:
+        if name not in table.ENUM_COLUMNS:
+            raise ValueError(
+                f"{table.__class__.__name__} '{table.name}': Column '{name}' cannot be stored as EnumData. "
+                f"Supported columns are: {list(table.ENUM_COLUMNS)}."
+            )
+        if name in table.colnames:
+            raise ValueError(f"{table.__class__.__name__} '{table.name}': Column '{name}' already exists.")
+        description = next(col["description"] for col in table.__columns__ if col["name"] == name)
+        table.add_column(name=name, description=description, enum=True)
+
+
+float_precision_dv = [
+    {
+        "name": "dtype",
+        "type": (str, type, np.dtype),
+        "doc": "floating point type to store the columns with, e.g., 'float32' to halve their size",
+        "default": "float32",
+    },
+    {
+        "name": "max_error_in_um",
+        "type": float,
+        "doc": "maximum rounding error of a position or size, in micrometers",
+        "default": 0.01,
+    },
+]
+
+
+def _set_float_precision(table, dtype, max_error_in_um):
+    dtype = np.dtype(dtype)
+    if dtype.kind != "f":
+        raise ValueError(f"`dtype` must be a floating point type, not '{dtype}'.")
+    converted = {}
+    for name, um_per_unit in table.FLOAT_COLUMNS.items():
+        if name not in table.colnames:
+            continue
+        values = np.asarray(table[name].data[:], dtype=np.float64)
+        rounded = values.astype(dtype)
+        # columns without a unit, e.g., the plane axes, are not checked
+        if um_per_unit is not None and values.size:
+            max_error = np.nanmax(np.abs(rounded - values)) * um_per_unit
+            if max_error > max_error_in_um:
+                raise ValueError(
+                    f"{table.__class__.__name__} '{table.name}': Storing column '{name}' as {dtype} would change "
+                    f"values by up to {max_error:g} um, which exceeds `max_error_in_um` ({max_error_in_um:g} um)."
+                )
+        converted[name] = rounded
+    # convert only after all columns are checked, so that the table is unchanged if a check fails
+    for name, rounded in converted.items():
+        table[name].transform(lambda data, rounded=rounded: rounded)
+
+
+class _LoadedOnAccess:
+    """Array-like wrapper of a dataset that reads the whole dataset into memory when it is first indexed.
+
+    The shape, dtype and length are those of the dataset and do not read it.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self._array = None
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._array is None:
+            self._array = self.dataset[:]
+        return self._array
+
+    @property
+    def shape(self):
+        return self.dataset.shape
+
+    @property
+    def dtype(self):
+        return self.dataset.dtype
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, key):
+        return self.array[key]
+
+    def __iter__(self):
+        return iter(self.array)
+
+    def __array__(self, dtype=None):
+        return np.asarray(self.array, dtype=dtype)
+
+
+def _load_enum_elements(table):
+    # EnumData decodes values by indexing its elements with the (unsorted, repeated) integer indices,
+    # which h5py datasets do not support. The elements are few and the indices are small integers,
+    # so both are read into memory when a value of the column is first accessed, not when the file is read.
+    for col in table.columns:
+        if isinstance(col, EnumData) and not isinstance(col.elements.data, (list, tuple, np.ndarray, _LoadedOnAccess)):
+            col.elements.transform(lambda data: _LoadedOnAccess(data))
+            col.transform(lambda data: _LoadedOnAccess(data))
+
+
+columns_dv = {
+    "name": "columns",
+    "type": (list, tuple),
+    "doc": "names of the columns to read. Other columns are not read. If not provided, all columns are read",
+    "default": None,
+}
+
+
+def _select_columns(table, kwargs):
+    """Convert the "columns" argument of ``to_dataframe`` to the "exclude" argument of DynamicTable.to_dataframe."""
+    columns = kwargs.pop("columns")
+    if columns is not None:
+        unknown = [name for name in columns if name not in table.colnames]
+        if unknown:
+            raise ValueError(f"{table.__class__.__name__} '{table.name}': Columns {unknown} do not exist.")
+        kwargs["exclude"] = set(kwargs["exclude"] or ()) | (set(table.colnames) - set(columns))
+    return kwargs
+
+
+@register_class("ProbeInsertion", "ndx-extracellular-channels")
+class ProbeInsertion(AutoProbeInsertion):
+
+    @docval(*get_docval(AutoProbeInsertion.__init__))
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # 4x4 transform from probe to stereotaxic coordinates, built lazily by `get_transform`, and the attribute
+        # values it was computed from. Attributes that are None can be set later, which invalidates the transform.
+        self._transform = None
+        self._transform_key = None
+
+    def get_transform(self):
+        """Get the rigid transform from probe coordinates in micrometers to stereotaxic coordinates in millimeters.
+
+        The transform is a read-only 4x4 matrix computed from the insertion position, depth and angles and cached
+        until one of them changes. The insertion position and depth are required. Missing angles are treated as zero,
+        i.e., a probe inserted straight down. See ``compute_insertion_transform`` for the coordinate conventions.
+        """
+        required = (
+            "insertion_position_ap_in_mm",
+            "insertion_position_ml_in_mm",
+            "insertion_position_dv_in_mm",
+            "depth_in_mm",
+        )
+        angles = ("insertion_angle_yaw_in_deg", "insertion_angle_pitch_in_deg", "insertion_angle_roll_in_deg")
+        missing = [name for name in required if getattr(self, name) is None]
+        if missing:
+            raise ValueError(
+                f"{self.__class__.__name__} '{self.name}': Cannot compute the transform without {missing}."
+            )
+        key = tuple(getattr(self, name) for name in required) + tuple(getattr(self, name) or 0.0 for name in angles)
+        if self._transform is None or key != self._transform_key:
+            transform = compute_insertion_transform(**dict(zip(required + angles, key)))
+            transform.flags.writeable = False
+            self._transform = transform
+            self._transform_key = key
+        return self._transform
+
+
+@register_class("ContactsTable", "ndx-extracellular-channels")
+class ContactsTable(AutoContactsTable):
+
+    # text columns that typically take a handful of distinct values and can be stored as EnumData
+    ENUM_COLUMNS = ("shape", "shank_id")
+    # float columns and the number of micrometers per unit of their values (None for columns without a unit)
+    FLOAT_COLUMNS = {
+        "relative_position_in_um": 1.0,
+        "plane_axes": None,
+        "radius_in_um": 1.0,
+        "width_in_um": 1.0,
+        "height_in_um": 1.0,
+    }
+
+    @docval(*get_docval(AutoContactsTable.__init__), enum_columns_dv)
+    @instrumented("ContactsTable.__init__", rows=lambda args, kwargs, result: len(args[0]))
+    def __init__(self, **kwargs):
+        enum_columns = kwargs.pop("enum_columns")
+        super().__init__(**kwargs)
+        # map from contact_id to row index, built lazily by `rows_for_contact_ids` and reset when rows are added
+        self._contact_id_index = None
+        _load_enum_elements(self)
+        if enum_columns:
+            _add_enum_columns(self, enum_columns)
+        if self.shared_plane_axes is not None and "plane_axes" in self.colnames:
+            raise ValueError(
+                f"{self.__class__.__name__} '{self.name}': `shared_plane_axes` and the `plane_axes` column "
+                "cannot both be specified."
+            )
+
+    @docval(*get_docval(AutoContactsTable.add_row), allow_extra=True)
+    @instrumented("ContactsTable.add_row", rows=lambda args, kwargs, result: 1)
+    def add_row(self, **kwargs):
+        row = kwargs["data"] if kwargs.get("data") is not None else kwargs
+        if self.shared_plane_axes is not None and "plane_axes" in row:
+            raise ValueError(
+                f"{self.__class__.__name__} '{self.name}': Cannot add a row with `plane_axes` to a table with "
+                "`shared_plane_axes`."
+            )
+        super().add_row(**kwargs)
+        self._contact_id_index = None
+
+    @docval(*get_docval(AutoContactsTable.add_column), allow_extra=True)
+    def add_column(self, **kwargs):
+        super().add_column(**kwargs)
+        self._contact_id_index = None
+
+    @docval(*get_docval(AutoContactsTable.to_dataframe), columns_dv)
+    def to_dataframe(self, **kwargs):
+        """Produce a pandas DataFrame of the table, reading only the given columns from disk.
+
+        For example, ``to_dataframe(columns=["relative_position_in_um"])`` reads the positions and the ids but none
+        of the other columns.
+        """
+        return super().to_dataframe(**_select_columns(self, kwargs))
+
+    @docval(*float_precision_dv)
+    def set_float_precision(self, **kwargs):
+        """Convert the float columns in ``FLOAT_COLUMNS`` to ``dtype``, e.g., float32, before writing.
+
+        Raises a ValueError and leaves the table unchanged if any position or size would change by more than
+        ``max_error_in_um``. Columns stored as float32 are read back as float32. Call this after all rows are added,
+        because adding a row appends float64 values.
+        """
+        _set_float_precision(self, **kwargs)
+
+    def get_plane_axes(self):
+        """Get the plane axes of all contacts as an array with shape (num_contacts, 2, ndim).
+
+        If the table stores `shared_plane_axes` instead of the `plane_axes` column, a read-only view of the shared
+        axes broadcast to all contacts is returned, so memory does not scale with the number of contacts.
+        Returns None if neither is present.
+        """
+        if self.shared_plane_axes is not None:
+            shared_plane_axes = np.asarray(self.shared_plane_axes)
+            return np.broadcast_to(shared_plane_axes, (len(self),) + shared_plane_axes.shape)
+        if "plane_axes" in self.colnames:
+            return np.asarray(self["plane_axes"].data[:])
+        return None
+
+    @docval(
+        {
+            "name": "dtype",
+            "type": (str, type, np.dtype),
+            "doc": "floating point type of the distances, e.g., 'float32' to halve the memory use",
+            "default": "float64",
+        },
+        {
+            "name": "max_distance",
+            "type": (int, float),
+            "doc": (
+                "if given, return a sparse CSR matrix (requires scipy) with only the distances less than or equal to "
+                "this value, in micrometers"
+            ),
+            "default": None,
+        },
+        {
+            "name": "block_size",
+            "type": int,
+            "doc": "number of rows of the dense distance matrix computed at once",
+            "default": 256,
+        },
+        returns="matrix of distances between contacts in micrometers, with shape (num_contacts, num_contacts)",
+    )
+    def get_contact_distances(self, **kwargs):
+        """Compute the distances between all pairs of contacts from `relative_position_in_um`.
+
+        See ``compute_contact_distances``. Results are cached by contact positions, so repeated calls for the same
+        probe model, e.g., across sessions, are free. The returned matrices are read-only.
+        """
+        positions = self["relative_position_in_um"].data[:]
+        return compute_contact_distances(positions, **kwargs)
+
+    def _get_contact_id_index(self):
+        if self._contact_id_index is None:
+            if "contact_id" not in self.colnames:
+                raise ValueError(f"{self.__class__.__name__} '{self.name}': The table has no 'contact_id' column.")
+            contact_ids = self["contact_id"].data[:]
+            index = {contact_id: row for row, contact_id in enumerate(contact_ids)}
+            if len(index) != len(contact_ids):
+                raise ValueError(f"{self.__class__.__name__} '{self.name}': The values of 'contact_id' are not unique.")
+            self._contact_id_index = index
+        return self._contact_id_index
+
+    @docval(
+        {
+            "name": "contact_ids",
+            "type": ("array_data", "data"),
+            "doc": "the values of the 'contact_id' column to look up",
+        },
+        returns="the row indices of the contacts, in the order of ``contact_ids``",
+        rtype=np.ndarray,
+    )
+    def rows_for_contact_ids(self, **kwargs):
+        """Look up the row indices of contacts by their 'contact_id' values.
+
+        The map from 'contact_id' to row index is built on the first call and cached until a row or column is added,
+        so each lookup takes constant time.
+        """
+        contact_ids = kwargs["contact_ids"]
+        index = self._get_contact_id_index()
+        missing = [contact_id for contact_id in contact_ids if contact_id not in index]
+        if missing:
+            raise ValueError(
+                f"{self.__class__.__name__} '{self.name}': The following contact IDs were not found in the table: "
+                f"{missing}."
+            )
+        return np.fromiter((index[contact_id] for contact_id in contact_ids), dtype=int, count=len(contact_ids))
+
+
 probe_model_init_dv = [dv for dv in get_docval(AutoProbeModel.__init__) if dv["name"] != "name"]
 probe_model_init_dv.append(
     {
@@ -37,6 +365,17 @@ probe_model_init_dv.append(
         "default": None,
     }
 )
+probe_model_init_dv.append(
+    {
+        "name": "check_geometry",
+        "type": bool,
+        "doc": (
+            "whether to check that the contacts lie inside ``planar_contour_in_um`` and do not overlap. "
+            "See ``ProbeModel.validate_geometry``"
+        ),
+        "default": False,
+    }
+)
 
 
 @register_class("ProbeModel", "ndx-extracellular-channels")
@@ -45,9 +384,51 @@ class ProbeModel(AutoProbeModel):
     @docval(*probe_model_init_dv)
     def __init__(self, **kwargs):
         # If the user does not provide a name, we set it to the value of "model"
+        check_geometry = kwargs.pop("check_geometry")
         if kwargs.get("name") is None:
             kwargs["name"] = kwargs["model"]
         super().__init__(**kwargs)
+        if check_geometry:
+            self.validate_geometry()
+
+    def validate_geometry(self):
+        """Check that the contacts lie inside ``planar_contour_in_um`` and that no two contacts overlap.
+
+        The checks are vectorized over all contacts, see ``validate_contacts_geometry``. Raises a ValueError that
+        lists the offending rows if either check fails.
+        """
+        validate_contacts_geometry(self.contacts_table, self.planar_contour_in_um)
+
+    @docval(*get_docval(ContactsTable.get_contact_distances))
+    def get_contact_distances(self, **kwargs):
+        """Compute the distances between all pairs of contacts. See ``ContactsTable.get_contact_distances``."""
+        return self.contacts_table.get_contact_distances(**kwargs)
+
+    @classmethod
+    @docval(
+        {
+            "name": "model",
+            "type": str,
+            "doc": (
+                "the 'manufacturer/model' key of the model in the library, e.g., 'IMEC/Neuropixels 1.0', or only the "
+                "model name if it is unique"
+            ),
+        },
+        {"name": "name", "type": str, "doc": "name of the ProbeModel. Defaults to the model name", "default": None},
+        {
+            "name": "path",
+            "type": (str, os.PathLike),
+            "doc": "path of the library. Defaults to the library shipped with the package",
+            "default": None,
+        },
+    )
+    def from_library(cls, **kwargs):
+        """Create a ProbeModel and its ContactsTable from the precomputed probe library, without probeinterface.
+
+        The library is loaded once per process. See ``list_probe_library`` for the available models and
+        ``save_probe_library`` to build a library.
+        """
+        return probe_model_from_library(**kwargs)
 
 
 channels_table_init_dv = [dv for dv in get_docval(AutoChannelsTable.__init__) if dv["name"] != "target_tables"]
@@ -56,8 +437,16 @@ channels_table_init_dv = [dv for dv in get_docval(AutoChannelsTable.__init__) if
 @register_class("ChannelsTable", "ndx-extracellular-channels")
 class ChannelsTable(AutoChannelsTable):
 
-    @docval(*channels_table_init_dv)
+    # text columns that typically take a handful of distinct values and can be stored as EnumData
+    ENUM_COLUMNS = ("filter", "estimated_brain_area", "confirmed_brain_area")
+    # float columns and the number of micrometers per unit of their values
+    FLOAT_COLUMNS = {
+        f"{kind}_position_{axis}_in_mm": 1000.0 for kind in ("estimated", "confirmed") for axis in ("ap", "ml", "dv")
+    }
+
+    @docval(*channels_table_init_dv, enum_columns_dv)
     def __init__(self, **kwargs):
+        enum_columns = kwargs.pop("enum_columns")
         # DynamicTable has an optional constructor argument "target_tables"
         # that sets the target tables for the foreign keys in the table after initializing
         # each column. Since `probe`, `Probe.probe_model` and `ProbeModel.contacts_table` are all
@@ -66,9 +455,37 @@ class ChannelsTable(AutoChannelsTable):
             "contact": kwargs["probe"].probe_model.contacts_table,
         }
         super().__init__(**kwargs)
+        # map from column name to GroupIndex, built lazily by `get_group_index` and reset when rows are added
+        self._group_indices = {}
+        _load_enum_elements(self)
+        if enum_columns:
+            _add_enum_columns(self, enum_columns)
+
+    @docval(*get_docval(AutoChannelsTable.to_dataframe), columns_dv)
+    def to_dataframe(self, **kwargs):
+        """Produce a pandas DataFrame of the table, reading only the given columns from disk.
+
+        Leave out "contact" and "reference_contact" to avoid reading the referenced rows of the ContactsTable.
+        """
+        return super().to_dataframe(**_select_columns(self, kwargs))
 
     @docval(*get_docval(AutoChannelsTable.add_row), allow_extra=True)
+    @instrumented("ChannelsTable.add_row", rows=lambda args, kwargs, result: 1)
     def add_row(self, **kwargs):
+        # "contact" and "reference_contact" may be given as values of the "contact_id" column of the
+        # ContactsTable instead of row indices. These are resolved using the cached contact ID index of the
+        # ContactsTable so that adding many rows by contact ID takes linear time.
+        if kwargs.get("data") is not None:
+            # resolve the contact IDs in a copy, so that the dict passed by the caller is not modified
+            row = dict(kwargs["data"])
+            kwargs["data"] = row
+        else:
+            row = kwargs
+        for key in ("contact", "reference_contact"):
+            if isinstance(row.get(key), str):
+                contacts_table = self.probe.probe_model.contacts_table
+                row[key] = int(contacts_table.rows_for_contact_ids([row[key]])[0])
+
         # "reference_contact" is an optional column that is only added if the column is not already present.
         # When it is added, we need to make sure that the target table is set correctly.
         # So here, if the user supplies a "reference_contact" value and the column is not present,
@@ -82,17 +499,328 @@ class ChannelsTable(AutoChannelsTable):
                 }
             )
         super().add_row(**kwargs)
+        self._group_indices = {}
+
+    @docval(*get_docval(AutoChannelsTable.add_column), allow_extra=True)
+    def add_column(self, **kwargs):
+        super().add_column(**kwargs)
+        self._group_indices = {}
+
+    @docval(
+        {
+            "name": "by",
+            "type": str,
+            "doc": (
+                "name of the column to group the channels by. A column of the ContactsTable that is not a column of "
+                "this table, e.g., 'shank_id', is resolved through the 'contact' column"
+            ),
+            "default": "shank_id",
+        },
+        returns="the index of the rows of the channels in each group",
+        rtype=GroupIndex,
+    )
+    def get_group_index(self, **kwargs):
+        """Get the rows of the channels grouped by the values of a column, e.g., by shank for per-shank processing.
+
+        The index is stored as offsets into an array of rows, like a CSR matrix, so iterating over the groups takes
+        constant time per group. It is built on the first call for each column and cached until a row or column is
+        added.
+        Changes to the values of a column in place are not detected.
+        """
+        by = kwargs["by"]
+        if by not in self._group_indices:
+            contacts_table = self.probe.probe_model.contacts_table
+            if by in self.colnames and not isinstance(self[by], DynamicTableRegion):
+                values = self[by][:]
+            elif by in contacts_table.colnames:
+                values = np.asarray(contacts_table[by][:])[np.asarray(self["contact"].data[:], dtype=int)]
+            else:
+                raise ValueError(
+                    f"{self.__class__.__name__} '{self.name}': Column '{by}' does not exist in the table or in the "
+                    "ContactsTable."
+                )
+            self._group_indices[by] = GroupIndex(values)
+        return self._group_indices[by]
+
+    @docval(*float_precision_dv)
+    def set_float_precision(self, **kwargs):
+        """Convert the float columns in ``FLOAT_COLUMNS`` to ``dtype``, e.g., float32, before writing.
+
+        Raises a ValueError and leaves the table unchanged if any position or size would change by more than
+        ``max_error_in_um``. Columns stored as float32 are read back as float32. Call this after all rows are added,
+        because adding a row appends float64 values.
+        """
+        _set_float_precision(self, **kwargs)
+
+    @docval(
+        {
+            "name": "probe_insertion",
+            "type": ProbeInsertion,
+            "doc": "the insertion of the probe. If not provided, ``probe.probe_insertion`` is used",
+            "default": None,
+        },
+    )
+    def add_estimated_positions(self, **kwargs):
+        """Add the `estimated_position_{ap,ml,dv}_in_mm` columns computed from the positions of the contacts.
+
+        The `relative_position_in_um` of the contact of every channel is mapped to stereotaxic coordinates with the
+        rigid transform of the probe insertion (see ``ProbeInsertion.get_transform``) in a single matrix multiply,
+        and the three columns are added at once. The insertion position and depth of the probe insertion are
+        required; missing angles are treated as zero.
+        """
+        probe_insertion = kwargs["probe_insertion"] or self.probe.probe_insertion
+        if probe_insertion is None:
+            raise ValueError(
+                f"{self.__class__.__name__} '{self.name}': The probe has no `probe_insertion`. "
+                "Provide `probe_insertion` to compute the estimated positions."
+            )
+        colnames = [f"estimated_position_{axis}_in_mm" for axis in ("ap", "ml", "dv")]
+        existing = [name for name in colnames if name in self.colnames]
+        if existing:
+            raise ValueError(f"{self.__class__.__name__} '{self.name}': Columns {existing} already exist.")
+
+        contact_positions = np.asarray(self.probe.probe_model.contacts_table["relative_position_in_um"].data[:])
+        positions = apply_transform(probe_insertion.get_transform(), contact_positions[self["contact"].data[:]])
+        for i, name in enumerate(colnames):
+            description = next(col["description"] for col in self.__columns__ if col["name"] == name)
+            self.add_column(name=name, description=description, data=positions[:, i].tolist())
+
+    @docval(
+        {
+            "name": "annotation",
+            "type": (np.ndarray, str, os.PathLike),
+            "doc": (
+                "annotation volume with axes (AP, ML, DV), or the path to a .npy or .nrrd file that is memory-mapped. "
+                "See ``lookup_brain_areas``"
+            ),
+        },
+        {
+            "name": "voxel_size_in_mm",
+            "type": (float, list, tuple, np.ndarray),
+            "doc": "size of the voxels along (AP, ML, DV), in millimeters",
+        },
+        {
+            "name": "origin_in_mm",
+            "type": (list, tuple, np.ndarray),
+            "doc": "stereotaxic (AP, ML, DV) position of the center of voxel (0, 0, 0), in millimeters",
+            "default": (0.0, 0.0, 0.0),
+        },
+        {
+            "name": "labels",
+            "type": (dict, list, tuple, np.ndarray),
+            "doc": "map from annotation value to brain area name. If not provided, the values are converted to str",
+            "default": None,
+        },
+        {
+            "name": "outside_label",
+            "type": str,
+            "doc": "brain area of the channels that are outside the volume",
+            "default": "outside atlas",
+        },
+        {
+            "name": "enum",
+            "type": bool,
+            "doc": "whether to store the column as an EnumData column. See ``ChannelsTable.ENUM_COLUMNS``",
+            "default": False,
+        },
+    )
+    def add_estimated_brain_areas(self, **kwargs):
+        """Add the `estimated_brain_area` column by looking up the estimated positions in an annotation volume.
+
+        The `estimated_position_{ap,ml,dv}_in_mm` columns are required, e.g., from ``add_estimated_positions``.
+        All channels are looked up at once, see ``lookup_brain_areas``.
+        """
+        colnames = [f"estimated_position_{axis}_in_mm" for axis in ("ap", "ml", "dv")]
+        missing = [name for name in colnames if name not in self.colnames]
+        if missing:
+            raise ValueError(
+                f"{self.__class__.__name__} '{self.name}': Columns {missing} are required to look up the brain areas."
+            )
+        if "estimated_brain_area" in self.colnames:
+            raise ValueError(f"{self.__class__.__name__} '{self.name}': Column 'estimated_brain_area' already exists.")
+
+        enum = kwargs.pop("enum")
+        positions = np.column_stack([self[name].data[:] for name in colnames])
+        areas = lookup_brain_areas(positions, **kwargs)
+        description = next(col["description"] for col in self.__columns__ if col["name"] == "estimated_brain_area")
+        if enum:
+            elements, indices = np.unique(areas, return_inverse=True)
+            self.add_column(
+                name="estimated_brain_area", description=description, data=indices.tolist(), enum=elements.tolist()
+            )
+        else:
+            self.add_column(name="estimated_brain_area", description=description, data=areas.tolist())
+
+    @docval(
+        {
+            "name": "shank_ids",
+            "type": (list, tuple, set, np.ndarray),
+            "doc": "select the channels whose contact has one of these values of `shank_id`",
+            "default": None,
+        },
+        {
+            "name": "contact_position_bounds",
+            "type": (list, tuple),
+            "doc": (
+                "select the channels whose contact lies in this box: one (min, max) pair per axis of "
+                "`relative_position_in_um`, in micrometers, or None for an unbounded axis, e.g., "
+                "``[None, (500.0, 1500.0)]`` for depths from 500 to 1500 um. Bounds are inclusive"
+            ),
+            "default": None,
+        },
+        {
+            "name": "estimated_position_bounds",
+            "type": dict,
+            "doc": (
+                "select the channels in this box of estimated positions: map from axis ('ap', 'ml' or 'dv') to a "
+                "(min, max) pair in millimeters. Bounds are inclusive"
+            ),
+            "default": None,
+        },
+        {
+            "name": "brain_areas",
+            "type": (list, tuple, set, np.ndarray),
+            "doc": "select the channels whose brain area is one of these values",
+            "default": None,
+        },
+        {
+            "name": "brain_area_column",
+            "type": str,
+            "doc": "column of the brain areas, 'estimated_brain_area' or 'confirmed_brain_area'",
+            "default": "estimated_brain_area",
+        },
+        {
+            "name": "mask",
+            "type": ("array_data", "data"),
+            "doc": "boolean mask of the channels to select, with one value per row",
+            "default": None,
+        },
+        {
+            "name": "region_name",
+            "type": str,
+            "doc": "if provided, return a DynamicTableRegion with this name instead of the row indices",
+            "default": None,
+        },
+        {
+            "name": "region_description",
+            "type": str,
+            "doc": "description of the DynamicTableRegion. If not provided, the query is described",
+            "default": None,
+        },
+        returns="the sorted row indices of the selected channels, or a DynamicTableRegion of them",
+    )
+    def select_channels(self, **kwargs):
+        """Select the channels that match all the given criteria, e.g., a shank, a depth range and a brain area.
+
+        Each criterion is evaluated for all channels at once with array operations. The "contact" column and the
+        columns of the ContactsTable are read only if a criterion needs them. For example,
+        ``select_channels(shank_ids=["2"], contact_position_bounds=[None, (500.0, 1500.0)], region_name="channels")``
+        returns a region for the `channels` of an ExtracellularSeries of the channels on shank 2 between 500 and 1500
+        um from the tip.
+        """
+        shank_ids, contact_position_bounds = kwargs["shank_ids"], kwargs["contact_position_bounds"]
+        estimated_position_bounds, brain_areas = kwargs["estimated_position_bounds"], kwargs["brain_areas"]
+        brain_area_column, mask = kwargs["brain_area_column"], kwargs["mask"]
+
+        selected = np.ones(len(self), dtype=bool)
+        if mask is not None:
+            mask = np.asarray(mask)
+            if mask.dtype != bool or mask.shape != selected.shape:
+                raise ValueError(
+                    f"{self.__class__.__name__} '{self.name}': `mask` must be a boolean array with one value per row "
+                    f"({len(self)}), not an array of {mask.dtype} with shape {mask.shape}."
+                )
+            selected &= mask
+
+        if shank_ids is not None or contact_position_bounds is not None:
+            contacts_table = self.probe.probe_model.contacts_table
+            contacts = np.asarray(self["contact"].data[:])
+            if shank_ids is not None:
+                if "shank_id" not in contacts_table.colnames:
+                    raise ValueError(
+                        f"{self.__class__.__name__} '{self.name}': The ContactsTable has no 'shank_id' column."
+                    )
+                shank_id_of_contacts = np.asarray(contacts_table["shank_id"][:]).astype(str)
+                selected &= np.isin(shank_id_of_contacts[contacts], [str(shank_id) for shank_id in shank_ids])
+            if contact_position_bounds is not None:
+                positions = np.asarray(contacts_table["relative_position_in_um"].data[:])[contacts]
+                if len(contact_position_bounds) > positions.shape[1]:
+                    raise ValueError(
+                        f"{self.__class__.__name__} '{self.name}': `contact_position_bounds` has "
+                        f"{len(contact_position_bounds)} axes, but the contacts have {positions.shape[1]}."
+                    )
+                for axis, bounds in enumerate(contact_position_bounds):
+                    if bounds is not None:
+                        selected &= (positions[:, axis] >= bounds[0]) & (positions[:, axis] <= bounds[1])
+
+        if estimated_position_bounds is not None:
+            for axis, bounds in estimated_position_bounds.items():
+                name = f"estimated_position_{axis}_in_mm"
+                if name not in self.colnames:
+                    raise ValueError(f"{self.__class__.__name__} '{self.name}': Column '{name}' does not exist.")
+                # NaN positions are never selected
+                positions = np.asarray(self[name].data[:], dtype=np.float64)
+                selected &= (positions >= bounds[0]) & (positions <= bounds[1])
+
+        if brain_areas is not None:
+            if brain_area_column not in self.colnames:
+                raise ValueError(
+                    f"{self.__class__.__name__} '{self.name}': Column '{brain_area_column}' does not exist."
+                )
+            areas = np.asarray(self[brain_area_column][:]).astype(str)
+            selected &= np.isin(areas, [str(area) for area in brain_areas])
+
+        rows = np.flatnonzero(selected)
+        if kwargs["region_name"] is None:
+            return rows
+        description = kwargs["region_description"]
+        if description is None:
+            criteria = [
+                name
+                for name in ("shank_ids", "contact_position_bounds", "estimated_position_bounds", "brain_areas", "mask")
+                if kwargs[name] is not None
+            ]
+            description = f"Channels selected by {', '.join(criteria) or 'no criteria'}."
+        return self.create_region(name=kwargs["region_name"], region=rows.tolist(), description=description)
+
+
+@register_map(ContactsTable)
+@register_map(ChannelsTable)
+class EnumColumnsTableMap(DynamicTableMap):
+    """Object mapper that writes EnumData columns of ContactsTable and ChannelsTable with their integer dtype.
+
+    The columns that can be stored as EnumData have dtype "text" in the spec, which would convert the integer
+    indices of an EnumData column to strings on write. EnumData columns are therefore built only from the
+    generic "columns" spec of DynamicTable, which does not constrain the dtype, and not from the named column spec.
+    """
+
+    @docval(*get_docval(DynamicTableMap.get_attr_value), returns="the value of the attribute")
+    def get_attr_value(self, **kwargs):
+        attr_value = super().get_attr_value(**kwargs)
+        if isinstance(attr_value, EnumData) and kwargs["spec"].name is not None:
+            return None
+        return attr_value
 
 
 extracellular_series_init_dv = [dv for dv in get_docval(AutoExtracellularSeries.__init__) if dv["name"] != "unit"]
 
 
+def _nbytes(data) -> int:
+    # size of in-memory data. Data that is read lazily, e.g., from an HDF5 file, is not counted
+    return data.nbytes if isinstance(data, np.ndarray) else 0
+
+
 @register_class("ExtracellularSeries", "ndx-extracellular-channels")
 class ExtracellularSeries(AutoExtracellularSeries):
 
     @docval(*extracellular_series_init_dv)
+    @instrumented("ExtracellularSeries.__init__", nbytes=lambda args, kwargs, result: _nbytes(kwargs["data"]))
     def __init__(self, **kwargs):
-        data_shape = get_data_shape(kwargs["data"], strict_no_data_load=True)
+        if isinstance(kwargs["data"], DataIO) and not kwargs["data"].valid:
+            # an empty dataset created from a shape and dtype, e.g., H5DataIO(shape=..., dtype=...)
+            data_shape = kwargs["data"].shape
+        else:
+            data_shape = get_data_shape(kwargs["data"], strict_no_data_load=True)
         if data_shape is not None:
             # check that the second dimension of `data` matches the length of `channels`
             channels_length = len(kwargs["channels"].data)
@@ -110,21 +838,164 @@ class ExtracellularSeries(AutoExtracellularSeries):
                         f"({data_shape[1]}) does not match the length of `channels` ({channels_length})."
                     )
             # check that the second dimension of `data` matches the length of `channel_conversion`
-            channel_conversion_length = len(kwargs["channel_conversion"])
-            if kwargs["channel_conversion"] and data_shape[1] != channel_conversion_length:
+            if kwargs["channel_conversion"] is not None and data_shape[1] != len(kwargs["channel_conversion"]):
                 raise ValueError(
                     f"{self.__class__.__name__} '{kwargs['name']}': The length of the second dimension of `data` "
                     f"({data_shape[1]}) does not match the length of `channel_conversion` "
-                    f"({channel_conversion_length})."
+                    f"({len(kwargs['channel_conversion'])})."
                 )
 
         # NOTE: "unit" is a required constructor argument in the auto-generated class
         # but it's value is fixed to "microvolts"
         kwargs["unit"] = "microvolts"
         super().__init__(**kwargs)
+        # CachedDataset of `data`, created lazily by `get_cached_data`
+        self._cached_data = None
+
+    def get_conversion_factors(self):
+        """Get the factors that convert the data of each channel to microvolts, before adding `offset`.
+
+        Returns an array with shape (num_channels,) equal to ``conversion * channel_conversion``, or to
+        ``conversion`` for all channels if `channel_conversion` is not present.
+        """
+        num_channels = len(self.channels.data)
+        if self.channel_conversion is None:
+            return np.full(num_channels, self.conversion, dtype=np.float64)
+        return self.conversion * np.asarray(self.channel_conversion[:], dtype=np.float64)
+
+    @docval(
+        {"name": "block_size", "type": int, "doc": "number of time points read at once", "default": 30000},
+        {
+            "name": "max_workers",
+            "type": int,
+            "doc": "number of threads. If not provided, the default of ``ThreadPoolExecutor`` is used",
+            "default": None,
+        },
+        {
+            "name": "saturation_range",
+            "type": (tuple, list),
+            "doc": (
+                "raw values at or beyond which a sample is counted as saturated. If not provided, the limits of "
+                "the dtype are used for integer data"
+            ),
+            "default": None,
+        },
+        {
+            "name": "column_prefix",
+            "type": str,
+            "doc": "if provided, add the statistics to the ChannelsTable as columns with this prefix",
+            "default": None,
+        },
+    )
+    def compute_channel_stats(self, **kwargs):
+        """Compute per-channel summary statistics in microvolts by streaming the data in blocks.
+
+        See ``compute_channel_stats``. Returns a pandas DataFrame indexed by the row of each channel in the
+        ChannelsTable.
+        """
+        return compute_channel_stats(self, **kwargs)
 
+    @docval(
+        {"name": "frames", "type": ("array_data", "data"), "doc": "time indices of the snippets, in any order"},
+        {"name": "num_frames_before", "type": int, "doc": "number of time points before each frame"},
+        {"name": "num_frames_after", "type": int, "doc": "number of time points from each frame"},
+        {
+            "name": "channels",
+            "type": ("array_data", "data"),
+            "doc": "indices of the channels of this series to extract. If not provided, all channels are extracted",
+            "default": None,
+        },
+        {"name": "convert", "type": bool, "doc": "whether to convert the data to microvolts", "default": True},
+        {
+            "name": "dtype",
+            "type": (str, type, np.dtype),
+            "doc": (
+                "dtype of the output. Defaults to float32 if ``convert`` is True and to the dtype of the data "
+                "otherwise"
+            ),
+            "default": None,
+        },
+        {
+            "name": "out",
+            "type": (np.ndarray, str, os.PathLike),
+            "doc": "preallocated output array, e.g., a numpy.memmap, or the path of a .npy file to memory-map",
+            "default": None,
+        },
+        {
+            "name": "max_gap",
+            "type": int,
+            "doc": "maximum number of time points between windows that are read at once. Defaults to the chunk length",
+            "default": None,
+        },
+        {
+            "name": "max_read_frames",
+            "type": int,
+            "doc": "maximum number of time points of a single read",
+            "default": None,
+        },
+    )
+    def get_snippets(self, **kwargs):
+        """Extract the snippets of data around many frames, merging nearby windows into chunk-aligned reads.
 
+        See ``extract_snippets``. Returns an array with shape (num_frames, num_frames_before + num_frames_after,
+        num_channels) in the order of ``frames``.
+        """
+        return extract_snippets(self, **kwargs)
+
+    @docval(
+        {"name": "block_size", "type": int, "doc": "number of time points per block", "default": 30000},
+        {"name": "prefetch_depth", "type": int, "doc": "number of blocks read ahead", "default": 1},
+        {"name": "start", "type": int, "doc": "first time point to read", "default": 0},
+        {"name": "stop", "type": int, "doc": "time point to stop reading at. Defaults to the end", "default": None},
+    )
+    def iter_blocks(self, **kwargs):
+        """Iterate over consecutive time blocks of `data` while the next blocks are read in a background thread.
+
+        Returns a ``BlockPrefetcher`` that yields ``(start, block)`` with the raw (unconverted) data of each block.
+        Blocks are views into reused buffers that are only valid until the next iteration. The read and wait times
+        of each block are recorded in ``BlockPrefetcher.timings``.
+        """
+        return BlockPrefetcher(self.data, **kwargs)
+
+    @docval(
+        {
+            "name": "cache",
+            "type": ChunkCache,
+            "doc": "the cache to use, e.g., shared by several series. If not provided, a new cache is created",
+            "default": None,
+        },
+    )
+    def get_cached_data(self, **kwargs):
+        """Get a view of `data` that serves reads from decoded chunks kept in an LRU cache bounded by bytes.
+
+        Returns a ``CachedDataset`` that is indexed like `data`, e.g., ``series.get_cached_data()[start:stop, :]``.
+        The same view is returned by later calls unless a different ``cache`` is given. Hit and miss counts are
+        available from ``CachedDataset.cache``.
+        """
+        cache = kwargs["cache"]
+        if self._cached_data is None or (cache is not None and cache is not self._cached_data.cache):
+            self._cached_data = CachedDataset(self.data, cache=cache)
+        return self._cached_data
+
+
+from .atlas import lookup_brain_areas
+from .catalog import ArchiveIndex, scan_nwb_file, scan_nwb_files
+from .compare import probe_diff, probe_equal
+from .demultiplex import DemultiplexedDataChunkIterator, InterleavedDemultiplexer, build_channel_map
+from .geometry import (
+    apply_transform,
+    clear_distances_cache,
+    compute_contact_distances,
+    compute_insertion_transform,
+    validate_contacts_geometry,
+)
 from .io import from_probeinterface, to_probeinterface
+from .legacy import export_electrical_series, export_nwb_file, migrate_electrical_series, migrate_nwb_file
+from .library import list_probe_library, probe_model_from_library, save_probe_library
+from .snippets import extract_snippets
+from .stats import compute_channel_stats
+from .streams import MultiStreamBuilder
+from .validation import validate_nwb_file, validate_nwb_files
 
 __all__ = (
     "ProbeInsertion",
@@ -135,8 +1006,40 @@ __all__ = (
     "ExtracellularSeries",
     "from_probeinterface",
     "to_probeinterface",
+    "scan_nwb_file",
+    "scan_nwb_files",
+    "ArchiveIndex",
+    "compute_contact_distances",
+    "clear_distances_cache",
+    "validate_contacts_geometry",
+    "compute_insertion_transform",
+    "lookup_brain_areas",
+    "compute_channel_stats",
+    "extract_snippets",
+    "BlockPrefetcher",
+    "ChunkCache",
+    "CachedDataset",
+    "record_operations",
+    "add_hook",
+    "remove_hook",
+    "write_nwbfile",
+    "MultiStreamBuilder",
+    "InterleavedDemultiplexer",
+    "DemultiplexedDataChunkIterator",
+    "build_channel_map",
+    "migrate_electrical_series",
+    "migrate_nwb_file",
+    "export_electrical_series",
+    "export_nwb_file",
+    "list_probe_library",
+    "save_probe_library",
+    "validate_nwb_file",
+    "validate_nwb_files",
+    "probe_equal",
+    "probe_diff",
+    "GroupIndex",
 )
 
 # Remove these functions from the package
-del load_namespaces, get_class, extracellular_series_init_dv, AutoExtracellularSeries
-del channels_table_init_dv, AutoChannelsTable
+del load_namespaces, get_class, AutoProbeInsertion, extracellular_series_init_dv, AutoExtracellularSeries
+del channels_table_init_dv, AutoChannelsTable, AutoContactsTable, enum_columns_dv, float_precision_dv
@@ -0,0 +1,147 @@
+"""Look up brain areas of channel positions in a local annotation (atlas) volume."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+import os
+from typing import Mapping, Sequence, Union
+
+import numpy as np
+
+
+def load_annotation_volume(path: Union[str, os.PathLike]) -> np.ndarray:
+    """
+    Open an annotation volume from a .npy or .nrrd file as a read-only memory-mapped array.
+
+    Only the pages of the file that are indexed are read from disk, so looking up a few hundred channels in a
+    large atlas reads a few megabytes at most.
+
+    Parameters
+    ----------
+    path: str or os.PathLike
+        Path to a .npy file, or to a .nrrd file with raw encoding and attached data (requires pynrrd).
+
+    Returns
+    -------
+    annotation: numpy.memmap
+        The annotation volume, e.g., integer structure IDs, with shape (num_x, num_y, num_z).
+    """
+    path = os.fspath(path)
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    if path.endswith(".nrrd"):
+        return _memmap_nrrd(path)
+    raise ValueError(f"Annotation volume '{path}' must be a .npy or .nrrd file.")
+
+
+# NRRD type names and their equivalent numpy dtypes, from the NRRD specification
+_NRRD_DTYPES = {
+    **dict.fromkeys(("signed char", "int8", "int8_t"), "i1"),
+    **dict.fromkeys(("uchar", "unsigned char", "uint8", "uint8_t"), "u1"),
+    **dict.fromkeys(("short", "short int", "signed short", "signed short int", "int16", "int16_t"), "i2"),
+    **dict.fromkeys(("ushort", "unsigned short", "unsigned short int", "uint16", "uint16_t"), "u2"),
+    **dict.fromkeys(("int", "signed int", "int32", "int32_t"), "i4"),
+    **dict.fromkeys(("uint", "unsigned int", "uint32", "uint32_t"), "u4"),
+    **dict.fromkeys(
+        ("longlong", "long long", "long long int", "signed long long", "signed long long int", "int64", "int64_t"),
+        "i8",
+    ),
+    **dict.fromkeys(("ulonglong", "unsigned long long", "unsigned long long int", "uint64", "uint64_t"), "u8"),
+    "float": "f4",
+    "double": "f8",
+}
+
+
+def _nrrd_dtype(path: str, header: Mapping) -> np.dtype:
+    if header.get("type") not in _NRRD_DTYPES:
+        raise ValueError(f"Annotation volume '{path}' has an unsupported NRRD type '{header.get('type')}'.")
+    dtype = np.dtype(_NRRD_DTYPES[header["type"]])
+    if dtype.itemsize > 1:
+        dtype = dtype.newbyteorder("<" if header.get("endian", "little") == "little" else ">")
+    return dtype
+
+
+def _memmap_nrrd(path: str) -> np.memmap:
+    try:
+        import nrrd
+    except ImportError:
+        raise ImportError("To read .nrrd annotation volumes, install pynrrd: pip install pynrrd")
+
+    with open(path, "rb") as f:
+        header = nrrd.read_header(f)
+        offset = f.tell()
+    if header.get("encoding") != "raw" or "data file" in header or "datafile" in header:
+        raise ValueError(
+            f"Annotation volume '{path}' cannot be memory-mapped because it is compressed or stored in a separate "
+            "file. Load it with `nrrd.read` and pass the array instead."
+        )
+    dtype = _nrrd_dtype(path, header)
+    # NRRD stores the fastest-varying axis first, i.e., in Fortran order
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=tuple(header["sizes"]), order="F")
+
+
+def lookup_brain_areas(
+    positions: np.ndarray,
+    annotation: Union[np.ndarray, str, os.PathLike],
+    voxel_size_in_mm: Union[float, Sequence[float]],
+    origin_in_mm: Sequence[float] = (0.0, 0.0, 0.0),
+    labels: Union[Mapping, Sequence, None] = None,
+    outside_label: str = "outside atlas",
+) -> np.ndarray:
+    """
+    Look up the labels of the voxels that contain each position, for all positions at once.
+
+    The positions are converted to voxel indices in one vectorized step and the annotation values are gathered with
+    a single fancy index in sorted order, so a memory-mapped volume is read sequentially and only at the needed pages.
+
+    Parameters
+    ----------
+    positions: array-like
+        Stereotaxic (AP, ML, DV) positions in millimeters with shape (num_positions, 3), e.g., the estimated
+        positions of the channels.
+    annotation: numpy.ndarray, str or os.PathLike
+        Annotation volume whose axes correspond to (AP, ML, DV), or the path to a .npy or .nrrd file with such a
+        volume (see ``load_annotation_volume``). A volume stored with other axes, e.g., (AP, DV, ML), can be passed
+        as a transposed view, e.g., ``annotation.transpose(0, 2, 1)``, which is not copied.
+    voxel_size_in_mm: float or sequence of float
+        Size of the voxels along (AP, ML, DV), in millimeters. Use a negative size for an axis where the index
+        increases in the negative direction, e.g., -0.025 for a DV axis that points down.
+    origin_in_mm: sequence of float, default: (0, 0, 0)
+        Stereotaxic (AP, ML, DV) position of the center of voxel (0, 0, 0), in millimeters.
+    labels: mapping or sequence, optional
+        Map from annotation value to brain area name, e.g., from structure ID to acronym. If None, the annotation
+        values are converted to strings.
+    outside_label: str, default: "outside atlas"
+        Label of the positions that are outside the volume.
+
+    Returns
+    -------
+    areas: numpy.ndarray
+        Array of str with shape (num_positions,).
+    """
+    if not isinstance(annotation, np.ndarray):
+        annotation = load_annotation_volume(annotation)
+    positions = np.asarray(positions, dtype=np.float64)
+    if positions.ndim != 2 or positions.shape[1] != 3:
+        raise ValueError(f"`positions` must have shape (num_positions, 3), not {positions.shape}.")
+    if annotation.ndim != 3:
+        raise ValueError(f"`annotation` must be a 3D volume, not an array with shape {annotation.shape}.")
+
+    voxel_indices = np.rint((positions - np.asarray(origin_in_mm)) / np.asarray(voxel_size_in_mm)).astype(np.int64)
+    inside = np.all((voxel_indices >= 0) & (voxel_indices < annotation.shape), axis=1)
+
+    # gather the distinct voxels in the order they are laid out in memory. Indexing with the voxel indices reads
+    # only these voxels for any memory layout, e.g., a transposed memory-mapped volume, without a copy of the volume.
+    voxels = voxel_indices[inside]
+    memory_offsets = voxels @ np.asarray(annotation.strides, dtype=np.int64)
+    _, first, inverse = np.unique(memory_offsets, return_index=True, return_inverse=True)
+    values = np.asarray(annotation[tuple(voxels[first].T)])
+
+    unique_values, value_inverse = np.unique(values, return_inverse=True)
+    if labels is None:
+        unique_labels = [str(value) for value in unique_values.tolist()]
+    else:
+        unique_labels = [labels[value] for value in unique_values.tolist()]
+
+    areas = np.full(len(positions), outside_label, dtype=object)
+    areas[inside] = np.asarray(unique_labels, dtype=object)[value_inverse][inverse]
+    return areas.astype(str)
@@ -0,0 +1,545 @@
+from __future__ import annotations  # postpone type hint evaluation
+
+import os
+import sqlite3
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, List, Union
+
+import h5py
+import numpy as np
+
+NAMESPACE = "ndx-extracellular-channels"
+
+# neurodata types that are cataloged by `scan_nwb_file`. All of them are stored as HDF5 groups.
+CATALOG_TYPES = ("Probe", "ProbeModel", "ProbeInsertion", "ChannelsTable")
+
+# attributes written by HDMF for bookkeeping that are returned as separate fields of a record (or not at all)
+_BOOKKEEPING_ATTRIBUTES = ("neurodata_type", "namespace", "object_id")
+
+
+def scan_nwb_file(path: str, include_columns: bool = False) -> List[dict]:
+    """
+    Catalog the probe-related objects in an NWB file without building the object graph with NWBHDF5IO.read().
+
+    Only the HDF5 group hierarchy and the attributes of the groups are read. A group is cataloged if its
+    "neurodata_type" attribute is one of ``CATALOG_TYPES`` and its "namespace" attribute is
+    "ndx-extracellular-channels". Soft and external links are not followed, so an object that is linked from
+    several places, e.g., a ProbeModel used by several Probe objects, is cataloged once.
+
+    Parameters
+    ----------
+    path: str
+        Path to the NWB file.
+    include_columns: bool, default: False
+        If True, the columns of each ChannelsTable and of the ContactsTable of each ProbeModel are also read
+        and returned in the "columns" key of the record. Ragged columns are not read.
+
+    Returns
+    -------
+    records: list of dict
+        One record per cataloged object with the keys:
+
+        - "file_path": the path of the NWB file
+        - "object_path": the path of the object within the file, e.g., "/general/devices/probe0"
+        - "neurodata_type": the neurodata type of the object, e.g., "Probe"
+        - "name": the name of the object
+        - "object_id": the object ID of the object
+        - "attributes": dict of the other attributes of the object, e.g., "identifier" for a Probe
+        - "links": dict mapping the name of each link in the group to the path of its target, e.g.,
+          "probe_model" for a Probe or "probe" for a ChannelsTable
+        - "num_rows": the number of rows for a ChannelsTable, or the number of contacts for a ProbeModel,
+          else None
+        - "columns": only if ``include_columns`` is True, a dict mapping column names to lists of values for a
+          ChannelsTable or a ProbeModel, else None
+    """
+    records = []
+    with h5py.File(path, "r") as f:
+        _scan_group(f, str(path), records, include_columns)
+    return records
+
+
+def scan_nwb_files(
+    paths: Iterable[str],
+    max_workers: Union[int, None] = None,
+    skip_errors: bool = False,
+    include_columns: bool = False,
+) -> List[dict]:
+    """
+    Catalog the probe-related objects in many NWB files in parallel using a process pool.
+
+    Parameters
+    ----------
+    paths: iterable of str
+        Paths to the NWB files.
+    max_workers: int, optional
+        Number of worker processes. If None, the number of processors on the machine is used.
+        If 1, the files are scanned in the current process.
+    skip_errors: bool, default: False
+        If True, files that cannot be read are skipped with a warning instead of raising the error.
+    include_columns: bool, default: False
+        If True, the table columns are also read. See ``scan_nwb_file``.
+
+    Returns
+    -------
+    records: list of dict
+        The records of all files, in the order of ``paths``. See ``scan_nwb_file`` for the keys of each record.
+    """
+    paths = [str(path) for path in paths]
+    records = []
+    for path, file_records, error in _scan_nwb_files_iter(paths, max_workers, include_columns):
+        if error is not None:
+            if not skip_errors:
+                raise error
+            warnings.warn(f"Could not scan '{path}': {error}", UserWarning)
+            continue
+        records.extend(file_records)
+    return records
+
+
+def _scan_nwb_files_iter(paths: List[str], max_workers: Union[int, None], include_columns: bool):
+    """Yield (path, records, error) for each path, in order."""
+    scan = partial(_scan_nwb_file_safe, include_columns=include_columns)
+    if max_workers == 1:
+        for path in paths:
+            yield (path, *scan(path))
+        return
+    # scanning a file is fast, so send files to the workers in batches to reduce the overhead per file
+    chunksize = max(1, len(paths) // (4 * (max_workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for path, result in zip(paths, executor.map(scan, paths, chunksize=chunksize)):
+            yield (path, *result)
+
+
+def _scan_nwb_file_safe(path: str, include_columns: bool):
+    # errors are returned instead of raised so that one unreadable file does not end the scan of the other files
+    try:
+        return scan_nwb_file(path, include_columns=include_columns), None
+    except Exception as e:
+        return None, e
+
+
+def _scan_group(group: h5py.Group, file_path: str, records: List[dict], include_columns: bool):
+    for name in group:
+        link = group.get(name, getlink=True)
+        if not isinstance(link, h5py.HardLink):
+            continue
+        child = group[name]
+        if not isinstance(child, h5py.Group):
+            continue
+        if _decode(child.attrs.get("namespace")) == NAMESPACE:
+            neurodata_type = _decode(child.attrs.get("neurodata_type"))
+            if neurodata_type in CATALOG_TYPES:
+                records.append(_make_record(child, neurodata_type, file_path, include_columns))
+        _scan_group(child, file_path, records, include_columns)
+
+
+def _make_record(group: h5py.Group, neurodata_type: str, file_path: str, include_columns: bool) -> dict:
+    attributes = {key: _decode(value) for key, value in group.attrs.items() if key not in _BOOKKEEPING_ATTRIBUTES}
+    links = {}
+    for name in group:
+        link = group.get(name, getlink=True)
+        if isinstance(link, h5py.SoftLink):
+            links[name] = link.path
+        elif isinstance(link, h5py.ExternalLink):
+            links[name] = f"{link.filename}:{link.path}"
+
+    num_rows = None
+    columns = None
+    table = None
+    if neurodata_type == "ChannelsTable":
+        table = group
+    elif neurodata_type == "ProbeModel" and "contacts_table" in group:
+        table = group["contacts_table"]
+    if table is not None:
+        num_rows = len(table["id"])
+        if include_columns:
+            columns = _read_columns(table)
+
+    return {
+        "file_path": file_path,
+        "object_path": group.name,
+        "neurodata_type": neurodata_type,
+        "name": group.name.rsplit("/", 1)[-1],
+        "object_id": _decode(group.attrs.get("object_id")),
+        "attributes": attributes,
+        "links": links,
+        "num_rows": num_rows,
+        "columns": columns,
+    }
+
+
+def _read_columns(table: h5py.Group) -> dict:
+    columns = {}
+    for colname in _decode(table.attrs.get("colnames", [])):
+        if f"{colname}_index" in table or colname not in table:
+            continue
+        dataset = table[colname]
+        if _decode(dataset.attrs.get("neurodata_type")) == "EnumData":
+            # decode the integer indices of an EnumData column using its elements
+            elements = _read_dataset(table.file[dataset.attrs["elements"]])
+            columns[colname] = np.asarray(elements)[dataset[()]].tolist()
+        else:
+            columns[colname] = _read_dataset(dataset)
+    return columns
+
+
+def _read_dataset(dataset: h5py.Dataset) -> list:
+    if h5py.check_string_dtype(dataset.dtype) is not None:
+        return dataset.asstr()[()].tolist()
+    return dataset[()].tolist()
+
+
+def _decode(value):
+    """Convert an HDF5 attribute value to a plain Python value."""
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, np.ndarray):
+        return [_decode(v) for v in value.tolist()] if value.dtype.kind in "OS" else value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+# columns of the ChannelsTable that are stored in the "channels" table of an ArchiveIndex
+_INDEXED_CHANNEL_COLUMNS = (
+    "filter",
+    "estimated_position_ap_in_mm",
+    "estimated_position_ml_in_mm",
+    "estimated_position_dv_in_mm",
+    "estimated_brain_area",
+    "confirmed_position_ap_in_mm",
+    "confirmed_position_ml_in_mm",
+    "confirmed_position_dv_in_mm",
+    "confirmed_brain_area",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    file_path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS probe_models (
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    object_path TEXT NOT NULL,
+    name TEXT,
+    model TEXT,
+    manufacturer TEXT,
+    ndim INTEGER,
+    num_contacts INTEGER
+);
+CREATE TABLE IF NOT EXISTS probes (
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    object_path TEXT NOT NULL,
+    name TEXT,
+    identifier TEXT,
+    probe_model_path TEXT
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    probe_model_path TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    contact_id TEXT,
+    shank_id TEXT,
+    x_in_um REAL,
+    y_in_um REAL,
+    z_in_um REAL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    channels_table_path TEXT NOT NULL,
+    probe_path TEXT,
+    row INTEGER NOT NULL,
+    contact_row INTEGER,
+    filter TEXT,
+    estimated_position_ap_in_mm REAL,
+    estimated_position_ml_in_mm REAL,
+    estimated_position_dv_in_mm REAL,
+    estimated_brain_area TEXT,
+    confirmed_position_ap_in_mm REAL,
+    confirmed_position_ml_in_mm REAL,
+    confirmed_position_dv_in_mm REAL,
+    confirmed_brain_area TEXT
+);
+CREATE INDEX IF NOT EXISTS probes_identifier ON probes(identifier);
+CREATE INDEX IF NOT EXISTS probe_models_model ON probe_models(model);
+CREATE INDEX IF NOT EXISTS channels_estimated_brain_area ON channels(estimated_brain_area);
+CREATE INDEX IF NOT EXISTS channels_confirmed_brain_area ON channels(confirmed_brain_area);
+"""
+
+
+class ArchiveIndex:
+    """
+    Persistent SQLite index of the probes, probe models, contacts and channels in a collection of NWB files.
+
+    The index is filled with ``update``, which reads the files with ``scan_nwb_files`` (without pynwb) and skips
+    files whose modification time and size have not changed since they were last indexed. Queries return the file
+    path and the path of the object within the file, so that the object can be read directly, e.g., with
+    ``NWBHDF5IO(file_path, "r").read().objects`` or ``h5py.File(file_path)[object_path]``.
+
+    Examples
+    --------
+    >>> with ArchiveIndex("probes.sqlite") as index:
+    ...     index.update(glob.glob("/archive/**/*.nwb", recursive=True))
+    ...     files = index.find_files(model="Neuropixels 2.0")
+    ...     channels = index.find_channels(estimated_brain_area="CA1", estimated_position_dv_in_mm=(-3.0, -2.0))
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Parameters
+        ----------
+        db_path: str
+            Path to the SQLite database file. It is created if it does not exist.
+        """
+        self.db_path = str(db_path)
+        self._connection = sqlite3.connect(self.db_path)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def update(self, paths: Iterable[str], max_workers: Union[int, None] = None) -> dict:
+        """
+        Add new or modified NWB files to the index.
+
+        Files whose modification time and size match the indexed values are skipped. Files that cannot be read
+        are skipped with a warning and are not marked as indexed, so they are retried on the next update.
+
+        Parameters
+        ----------
+        paths: iterable of str
+            Paths to the NWB files.
+        max_workers: int, optional
+            Number of worker processes used to scan the files. See ``scan_nwb_files``.
+
+        Returns
+        -------
+        counts: dict
+            The number of files that were "indexed", "skipped" because they were unchanged, and "failed".
+        """
+        counts = {"indexed": 0, "skipped": 0, "failed": 0}
+        stats = {}
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+            except OSError as error:
+                warnings.warn(f"Could not scan '{path}': {error}", UserWarning)
+                counts["failed"] += 1
+                continue
+            row = self._connection.execute("SELECT mtime_ns, size FROM files WHERE file_path = ?", (path,)).fetchone()
+            if row is not None and (row["mtime_ns"], row["size"]) == (stat.st_mtime_ns, stat.st_size):
+                counts["skipped"] += 1
+            else:
+                stats[path] = stat
+
+        for path, records, error in _scan_nwb_files_iter(list(stats), max_workers, include_columns=True):
+            if error is not None:
+                warnings.warn(f"Could not scan '{path}': {error}", UserWarning)
+                counts["failed"] += 1
+                continue
+            with self._connection:
+                self._connection.execute("DELETE FROM files WHERE file_path = ?", (path,))
+                file_id = self._connection.execute(
+                    "INSERT INTO files (file_path, mtime_ns, size) VALUES (?, ?, ?)",
+                    (path, stats[path].st_mtime_ns, stats[path].st_size),
+                ).lastrowid
+                self._insert_records(file_id, records)
+            counts["indexed"] += 1
+        return counts
+
+    def remove(self, paths: Iterable[str]):
+        """Remove NWB files from the index, e.g., after they were deleted from the archive."""
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM files WHERE file_path = ?", [(os.path.abspath(path),) for path in paths]
+            )
+
+    def _insert_records(self, file_id: int, records: List[dict]):
+        contacts_by_model = {}
+        for record in records:
+            if record["neurodata_type"] == "ProbeModel":
+                attributes = record["attributes"]
+                self._connection.execute(
+                    "INSERT INTO probe_models VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        file_id,
+                        record["object_path"],
+                        record["name"],
+                        attributes.get("model"),
+                        attributes.get("manufacturer"),
+                        attributes.get("ndim"),
+                        record["num_rows"],
+                    ),
+                )
+                columns = record["columns"] or {}
+                contacts = _contact_rows(columns, record["num_rows"] or 0)
+                contacts_by_model[record["object_path"]] = contacts
+                self._connection.executemany(
+                    "INSERT INTO contacts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(file_id, record["object_path"], row, *contact) for row, contact in enumerate(contacts)],
+                )
+            elif record["neurodata_type"] == "Probe":
+                self._connection.execute(
+                    "INSERT INTO probes VALUES (?, ?, ?, ?, ?)",
+                    (
+                        file_id,
+                        record["object_path"],
+                        record["name"],
+                        record["attributes"].get("identifier"),
+                        record["links"].get("probe_model"),
+                    ),
+                )
+            elif record["neurodata_type"] == "ChannelsTable":
+                columns = record["columns"] or {}
+                num_rows = record["num_rows"]
+                values = [columns.get(column, [None] * num_rows) for column in _INDEXED_CHANNEL_COLUMNS]
+                contact_rows = columns.get("contact", [None] * num_rows)
+                self._connection.executemany(
+                    f"INSERT INTO channels VALUES ({', '.join(['?'] * (5 + len(_INDEXED_CHANNEL_COLUMNS)))})",
+                    [
+                        (file_id, record["object_path"], record["links"].get("probe"), row, contact_rows[row])
+                        + tuple(_nan_to_none(column[row]) for column in values)
+                        for row in range(num_rows)
+                    ],
+                )
+
+    def find_probes(
+        self,
+        identifier: Union[str, None] = None,
+        model: Union[str, None] = None,
+        manufacturer: Union[str, None] = None,
+    ) -> List[dict]:
+        """
+        Find the Probe objects with the given identifier (serial number), model and/or manufacturer.
+
+        Returns
+        -------
+        probes: list of dict
+            One dict per Probe with the keys "file_path", "object_path", "name", "identifier",
+            "probe_model_path", "model" and "manufacturer".
+        """
+        conditions, parameters = _conditions(
+            {"probes.identifier": identifier, "probe_models.model": model, "probe_models.manufacturer": manufacturer}
+        )
+        rows = self._connection.execute(
+            "SELECT files.file_path, probes.object_path, probes.name, probes.identifier, probes.probe_model_path, "
+            "probe_models.model, probe_models.manufacturer "
+            "FROM probes JOIN files USING (file_id) "
+            "LEFT JOIN probe_models ON probe_models.file_id = probes.file_id "
+            "AND probe_models.object_path = probes.probe_model_path"
+            f"{conditions} ORDER BY files.file_path, probes.object_path",
+            parameters,
+        )
+        return [dict(row) for row in rows]
+
+    def find_files(
+        self,
+        identifier: Union[str, None] = None,
+        model: Union[str, None] = None,
+        manufacturer: Union[str, None] = None,
+    ) -> List[str]:
+        """Find the paths of the NWB files that contain a Probe matching the given arguments. See ``find_probes``."""
+        probes = self.find_probes(identifier=identifier, model=model, manufacturer=manufacturer)
+        return sorted({probe["file_path"] for probe in probes})
+
+    def find_channels(
+        self,
+        estimated_brain_area: Union[str, List[str], None] = None,
+        confirmed_brain_area: Union[str, List[str], None] = None,
+        probe_identifier: Union[str, None] = None,
+        **position_ranges,
+    ) -> List[dict]:
+        """
+        Find the channels (rows of ChannelsTable objects) that match all of the given criteria.
+
+        Parameters
+        ----------
+        estimated_brain_area: str or list of str, optional
+            The estimated brain area(s) of the channels.
+        confirmed_brain_area: str or list of str, optional
+            The confirmed brain area(s) of the channels.
+        probe_identifier: str, optional
+            The identifier (serial number) of the Probe of the ChannelsTable.
+        **position_ranges
+            (min, max) ranges of position columns, e.g., ``estimated_position_dv_in_mm=(-3.0, -2.0)``.
+            Either bound can be None. Bounds are inclusive.
+
+        Returns
+        -------
+        channels: list of dict
+            One dict per channel with the keys "file_path", "channels_table_path", "row", "probe_path",
+            "contact_row", "contact_id", "shank_id" and the indexed ChannelsTable columns.
+        """
+        criteria = {
+            "channels.estimated_brain_area": estimated_brain_area,
+            "channels.confirmed_brain_area": confirmed_brain_area,
+            "probes.identifier": probe_identifier,
+        }
+        conditions, parameters = _conditions(criteria)
+        for column, (low, high) in position_ranges.items():
+            if column not in _INDEXED_CHANNEL_COLUMNS or "_position_" not in column:
+                raise ValueError(f"'{column}' is not an indexed position column of ChannelsTable.")
+            if low is not None:
+                conditions += f" AND channels.{column} >= ?"
+                parameters.append(low)
+            if high is not None:
+                conditions += f" AND channels.{column} <= ?"
+                parameters.append(high)
+        if conditions.startswith(" AND"):
+            conditions = " WHERE" + conditions[len(" AND") :]
+        rows = self._connection.execute(
+            "SELECT files.file_path, channels.channels_table_path, channels.row, channels.probe_path, "
+            "channels.contact_row, contacts.contact_id, contacts.shank_id, "
+            f"{', '.join(f'channels.{column}' for column in _INDEXED_CHANNEL_COLUMNS)} "
+            "FROM channels JOIN files USING (file_id) "
+            "LEFT JOIN probes ON probes.file_id = channels.file_id AND probes.object_path = channels.probe_path "
+            "LEFT JOIN contacts ON contacts.file_id = channels.file_id "
+            "AND contacts.probe_model_path = probes.probe_model_path AND contacts.row = channels.contact_row"
+            f"{conditions} ORDER BY files.file_path, channels.channels_table_path, channels.row",
+            parameters,
+        )
+        return [dict(row) for row in rows]
+
+
+def _conditions(criteria: dict):
+    """Build a SQL WHERE clause and its parameters from a dict of column -> value or list of values."""
+    clauses = []
+    parameters = []
+    for column, value in criteria.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = [value]
+        clauses.append(f"{column} IN ({', '.join(['?'] * len(value))})")
+        parameters.extend(value)
+    conditions = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    return conditions, parameters
+
+
+def _contact_rows(columns: dict, num_rows: int) -> List[tuple]:
+    contact_ids = columns.get("contact_id", [None] * num_rows)
+    shank_ids = columns.get("shank_id", [None] * num_rows)
+    positions = columns.get("relative_position_in_um", [[None, None]] * num_rows)
+    return [(contact_ids[row], shank_ids[row], *(list(positions[row]) + [None])[:3]) for row in range(num_rows)]
+
+
+def _nan_to_none(value):
+    # NaN is used for missing float values in the tables. SQLite stores NaN as NULL anyway, which does not compare
+    # in range queries, so make this explicit.
+    if isinstance(value, float) and value != value:
+        return None
+    return value
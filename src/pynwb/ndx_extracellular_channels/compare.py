@@ -0,0 +1,169 @@
+"""Vectorized comparison of Probe, ProbeModel and ContactsTable objects, e.g., before and after a round trip."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+from typing import TYPE_CHECKING, Iterator, List, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from . import ContactsTable, Probe, ProbeModel
+
+    ProbeLike = Union[Probe, ProbeModel, ContactsTable]
+
+# attributes that describe the probe and are kept by a round trip through probeinterface. Names and descriptions
+# are not compared.
+PROBE_ATTRIBUTES = ("identifier",)
+PROBE_MODEL_ATTRIBUTES = ("model", "manufacturer", "ndim")
+
+
+def probe_equal(a: ProbeLike, b: ProbeLike, rtol: float = 1e-5, atol: float = 1e-8) -> bool:
+    """
+    Check whether two Probe, ProbeModel or ContactsTable objects describe the same probe.
+
+    Stops at the first difference. See ``probe_diff`` for what is compared.
+
+    Parameters
+    ----------
+    a, b: Probe, ProbeModel or ContactsTable
+        The objects to compare. Both must be of the same type.
+    rtol, atol: float
+        Relative and absolute tolerance of the float values, see ``numpy.isclose``.
+
+    Returns
+    -------
+    equal: bool
+    """
+    return next(_iter_differences(a, b, rtol, atol), None) is None
+
+
+def probe_diff(a: ProbeLike, b: ProbeLike, rtol: float = 1e-5, atol: float = 1e-8) -> List[dict]:
+    """
+    Find the differences between two Probe, ProbeModel or ContactsTable objects.
+
+    The "identifier" of a Probe, the "model", "manufacturer", "ndim" and "planar_contour_in_um" of a ProbeModel and
+    all columns of the ContactsTable except references to other tables are compared, but not the names and
+    descriptions of the objects. Each column is read once and compared as a whole: float values with
+    ``numpy.isclose``, where NaN, e.g., a missing "radius_in_um", equals NaN, and other values exactly. Columns whose
+    bytes are identical are not compared element-wise. The plane axes are compared with
+    ``ContactsTable.get_plane_axes``, so a table with ``shared_plane_axes`` equals a table with the same axes in the
+    "plane_axes" column. Text columns stored as EnumData equal text columns with the same values.
+
+    Parameters
+    ----------
+    a, b: Probe, ProbeModel or ContactsTable
+        The objects to compare. Both must be of the same type.
+    rtol, atol: float
+        Relative and absolute tolerance of the float values, see ``numpy.isclose``.
+
+    Returns
+    -------
+    differences: list of dict
+        One dict per difference with the keys "field", e.g., "probe_model.contacts_table.width_in_um", "rows", the
+        sorted array of the rows that differ for a column with the same length in both tables, else None, and
+        "message". The list is empty if the objects are equal.
+    """
+    return list(_iter_differences(a, b, rtol, atol))
+
+
+def _iter_differences(a: ProbeLike, b: ProbeLike, rtol: float, atol: float) -> Iterator[dict]:
+    from . import ContactsTable, Probe, ProbeModel
+
+    if type(a) is not type(b) or not isinstance(a, (Probe, ProbeModel, ContactsTable)):
+        raise ValueError(
+            f"Both objects must be a Probe, a ProbeModel or a ContactsTable, not a {a.__class__.__name__} and a "
+            f"{b.__class__.__name__}."
+        )
+    prefix = ""
+    if isinstance(a, Probe):
+        yield from _attribute_differences(a, b, PROBE_ATTRIBUTES, prefix)
+        a, b, prefix = a.probe_model, b.probe_model, "probe_model."
+    if isinstance(a, ProbeModel):
+        yield from _attribute_differences(a, b, PROBE_MODEL_ATTRIBUTES, prefix)
+        contours = (a.planar_contour_in_um, b.planar_contour_in_um)
+        if (contours[0] is None) != (contours[1] is None):
+            yield _make_difference(f"{prefix}planar_contour_in_um", None, "present in only one of the objects")
+        elif contours[0] is not None and _column_differences(*contours, rtol=rtol, atol=atol) is not None:
+            yield _make_difference(f"{prefix}planar_contour_in_um", None, "the contours differ")
+        a, b, prefix = a.contacts_table, b.contacts_table, f"{prefix}contacts_table."
+    yield from _table_differences(a, b, rtol, atol, prefix)
+
+
+def _attribute_differences(a, b, names, prefix: str) -> Iterator[dict]:
+    for name in names:
+        value_a, value_b = getattr(a, name), getattr(b, name)
+        if value_a != value_b:
+            yield _make_difference(f"{prefix}{name}", None, f"{value_a!r} != {value_b!r}")
+
+
+def _table_differences(a: ContactsTable, b: ContactsTable, rtol: float, atol: float, prefix: str) -> Iterator[dict]:
+    from hdmf.common import DynamicTableRegion
+
+    if len(a) != len(b):
+        # rows cannot be matched, so the columns are not compared
+        yield _make_difference(f"{prefix}num_rows", None, f"{len(a)} != {len(b)}")
+        return
+
+    def column_names(table):
+        names = [name for name in table.colnames if not isinstance(table[name], DynamicTableRegion)]
+        # the plane axes are compared separately, whether they are stored in a column or as shared axes
+        return [name for name in names if name != "plane_axes"]
+
+    names_a, names_b = column_names(a), column_names(b)
+    for name in names_a:
+        if name not in names_b:
+            yield _make_difference(f"{prefix}{name}", None, "column present in only the first table")
+    for name in names_b:
+        if name not in names_a:
+            yield _make_difference(f"{prefix}{name}", None, "column present in only the second table")
+
+    # columns are read one at a time, so that `probe_equal` reads no more columns than needed
+    for name in [name for name in names_a if name in names_b] + ["plane_axes"]:
+        if name == "plane_axes":
+            values_a, values_b = a.get_plane_axes(), b.get_plane_axes()
+            if values_a is None or values_b is None:
+                if values_a is not None or values_b is not None:
+                    yield _make_difference(f"{prefix}{name}", None, "present in only one of the tables")
+                continue
+        else:
+            values_a, values_b = a[name][:], b[name][:]
+        rows = _column_differences(values_a, values_b, rtol=rtol, atol=atol)
+        if rows is not None:
+            yield _make_difference(f"{prefix}{name}", rows, f"{len(rows)} rows differ, e.g., row {rows[0]}")
+
+
+def _column_differences(a, b, rtol: float, atol: float) -> Union[np.ndarray, None]:
+    """Get the sorted rows where two columns differ, or None if they are equal."""
+    a, b = np.asarray(a), np.asarray(b)
+    if a.shape != b.shape:
+        return np.arange(max(len(a), len(b)))
+    if a.dtype == b.dtype and a.dtype.kind in "biufc" and a.tobytes() == b.tobytes():
+        return None
+    if a.dtype.kind in "fc" or b.dtype.kind in "fc":
+        try:
+            equal = np.isclose(a, b, rtol=rtol, atol=atol, equal_nan=True)
+        except TypeError:  # e.g., text compared to float
+            equal = np.zeros(a.shape, dtype=bool)
+    elif a.dtype.kind in "biu" and b.dtype.kind in "biu":
+        equal = a == b
+    else:
+        # text may be read as str or bytes, in numpy or object arrays
+        equal = _as_text(a) == _as_text(b)
+    # a row differs if any of its values differ, e.g., one coordinate of a position
+    equal = equal.all(axis=tuple(range(1, equal.ndim)))
+    rows = np.flatnonzero(~equal)
+    return rows if len(rows) else None
+
+
+def _as_text(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind == "S":
+        return np.char.decode(values, "utf-8")
+    if values.dtype.kind == "O":
+        return np.array([v.decode("utf-8") if isinstance(v, bytes) else str(v) for v in values.ravel()]).reshape(
+            values.shape
+        )
+    return values.astype(str)
+
+
+def _make_difference(field: str, rows: Union[np.ndarray, None], message: str) -> dict:
+    return {"field": field, "rows": rows, "message": message}
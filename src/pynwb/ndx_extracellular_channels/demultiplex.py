@@ -0,0 +1,188 @@
+"""Split an interleaved binary recording of several probes into per-probe data without copying the whole file."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+import os
+from typing import TYPE_CHECKING, Sequence, Union
+
+import numpy as np
+from hdmf.data_utils import GenericDataChunkIterator
+
+if TYPE_CHECKING:
+    from . import ChannelsTable
+
+
+def build_channel_map(
+    channels_table: ChannelsTable, source_channels: Union[dict, Sequence[int], np.ndarray]
+) -> np.ndarray:
+    """
+    Get the column of an interleaved source that holds each channel of a ChannelsTable.
+
+    Parameters
+    ----------
+    channels_table: ChannelsTable
+        The channels, in the order of the columns of the ExtracellularSeries to write.
+    source_channels: dict or sequence of int
+        The column of the source that holds the signal of each contact, either as a map from the "contact_id" of
+        the contact to the column or as a sequence indexed by the row of the contact in its ContactsTable, e.g.,
+        the ``device_channel_indices`` of a probeinterface.Probe.
+
+    Returns
+    -------
+    channel_map: numpy.ndarray
+        The column of the source of each row of the ChannelsTable.
+    """
+    contact_rows = np.asarray(channels_table["contact"].data[:], dtype=np.int64)
+    if isinstance(source_channels, dict):
+        contacts_table = channels_table["contact"].table
+        if "contact_id" not in contacts_table.colnames:
+            raise ValueError(
+                f"{contacts_table.__class__.__name__} '{contacts_table.name}': The table must have a 'contact_id' "
+                "column to map contact IDs to source channels."
+            )
+        contact_ids = contacts_table["contact_id"].data
+        missing = [contact_ids[row] for row in contact_rows if contact_ids[row] not in source_channels]
+        if missing:
+            raise ValueError(f"No source channel was given for the contacts {missing}.")
+        return np.array([source_channels[contact_ids[row]] for row in contact_rows], dtype=np.int64)
+    return np.asarray(source_channels, dtype=np.int64)[contact_rows]
+
+
+def _as_slice(channel_map: np.ndarray) -> Union[slice, None]:
+    """Get the slice that selects the columns of the channel map, or None if they are not evenly spaced."""
+    if len(channel_map) == 0:
+        return None
+    if len(channel_map) == 1:
+        return slice(int(channel_map[0]), int(channel_map[0]) + 1)
+    step = int(channel_map[1] - channel_map[0])
+    if step <= 0 or np.any(np.diff(channel_map) != step):
+        return None
+    return slice(int(channel_map[0]), int(channel_map[-1]) + 1, step)
+
+
+class DemultiplexedDataChunkIterator(GenericDataChunkIterator):
+    """
+    Iterate over buffers of selected columns of a (memory-mapped) interleaved array for writing with HDMF.
+
+    Only one buffer of the selected columns is in memory at a time. Evenly spaced columns are read with a strided
+    slice and other columns with a gather on the rows of the buffer.
+    """
+
+    def __init__(self, data: np.ndarray, channel_map: Sequence[int], **kwargs):
+        """
+        Parameters
+        ----------
+        data: numpy.ndarray
+            The interleaved source with shape (num_times, num_source_channels), e.g., a ``numpy.memmap``.
+        channel_map: sequence of int
+            The columns of the source to write, in order.
+        **kwargs
+            Passed to ``hdmf.data_utils.GenericDataChunkIterator``, e.g., ``buffer_gb`` or ``chunk_shape``.
+        """
+        self.data = data
+        self.channel_map = np.asarray(channel_map, dtype=np.int64)
+        self._channel_slice = _as_slice(self.channel_map)
+        super().__init__(**kwargs)
+
+    def _get_data(self, selection: tuple) -> np.ndarray:
+        time_selection, channel_selection = selection
+        if self._channel_slice is not None:
+            start, stop, step = channel_selection.indices(len(self.channel_map))
+            channel_slice = slice(
+                self._channel_slice.start + start * self._channel_slice.step,
+                self._channel_slice.start + stop * self._channel_slice.step,
+                self._channel_slice.step * step,
+            )
+            return np.array(self.data[time_selection, channel_slice])
+        return self.data[time_selection][:, self.channel_map[channel_selection]]
+
+    def _get_maxshape(self) -> tuple:
+        return (self.data.shape[0], len(self.channel_map))
+
+    def _get_dtype(self) -> np.dtype:
+        return self.data.dtype
+
+
+class InterleavedDemultiplexer:
+    """
+    Split an interleaved binary file, e.g., one int16 buffer that holds several probes and sync channels, into the
+    data of one ExtracellularSeries per probe.
+
+    The file is memory-mapped once. The data of a probe is either a strided view of the file, if its channels are
+    evenly spaced columns of the file, or an ``hdmf.data_utils.GenericDataChunkIterator`` that reads one buffer of
+    the file at a time, which can be passed as the data of an ExtracellularSeries to write it without a full copy.
+
+    Examples
+    --------
+    >>> demux = InterleavedDemultiplexer(
+    ...     "recording.bin",
+    ...     num_channels=385,
+    ...     channel_maps={"ProbeA": build_channel_map(channels_table_a, device_channels_a)},
+    ... )
+    >>> series = ExtracellularSeries(name="ProbeA", data=demux.get_iterator("ProbeA"), ...)
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, os.PathLike],
+        num_channels: int,
+        channel_maps: dict,
+        dtype: Union[str, np.dtype] = "int16",
+        offset: int = 0,
+    ):
+        """
+        Parameters
+        ----------
+        file_path: str or os.PathLike
+            Path of the binary file, with the samples of all channels of a time point stored next to each other.
+        num_channels: int
+            Number of interleaved channels in the file.
+        channel_maps: dict
+            Map from probe (or series) name to the columns of the file that hold its channels, in the order of its
+            ChannelsTable. See ``build_channel_map``.
+        dtype: str or numpy.dtype, default: "int16"
+            The dtype of the samples.
+        offset: int, default: 0
+            Number of header bytes before the first sample.
+        """
+        dtype = np.dtype(dtype)
+        num_bytes = os.path.getsize(file_path) - offset
+        frame_bytes = num_channels * dtype.itemsize
+        if num_bytes % frame_bytes:
+            raise ValueError(
+                f"The size of '{file_path}' ({num_bytes} bytes after the offset) is not a multiple of "
+                f"{num_channels} channels of {dtype}."
+            )
+        self.file_path = file_path
+        self.data = np.memmap(
+            file_path, dtype=dtype, mode="r", offset=offset, shape=(num_bytes // frame_bytes, num_channels)
+        )
+        self.channel_maps = {}
+        for name, channel_map in channel_maps.items():
+            channel_map = np.asarray(channel_map, dtype=np.int64)
+            if len(channel_map) and (channel_map.min() < 0 or channel_map.max() >= num_channels):
+                raise ValueError(f"The channel map of '{name}' has columns outside of the {num_channels} channels.")
+            self.channel_maps[name] = channel_map
+
+    def get_view(self, name: str) -> np.ndarray:
+        """
+        Get the data of a probe as a read-only strided view of the memory-mapped file, without copying.
+
+        The channels of the probe must be evenly spaced, increasing columns of the file. Note that h5py copies
+        non-contiguous arrays before writing them, so use ``get_iterator`` to write the data to an NWB file.
+        """
+        channel_slice = _as_slice(self.channel_maps[name])
+        if channel_slice is None:
+            raise ValueError(
+                f"The channels of '{name}' are not evenly spaced columns of the file, so they cannot be selected with "
+                "a view. Use `get_iterator` instead."
+            )
+        return self.data[:, channel_slice]
+
+    def get_iterator(self, name: str, **kwargs) -> DemultiplexedDataChunkIterator:
+        """
+        Get the data of a probe as an iterator over buffers of the file, to pass as the data of an
+        ExtracellularSeries. ``kwargs`` are passed to ``hdmf.data_utils.GenericDataChunkIterator``, e.g.,
+        ``buffer_gb`` or ``chunk_shape``.
+        """
+        return DemultiplexedDataChunkIterator(self.data, self.channel_maps[name], **kwargs)
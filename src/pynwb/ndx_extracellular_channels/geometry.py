@@ -0,0 +1,386 @@
+from __future__ import annotations  # postpone type hint evaluation
+
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import scipy.sparse
+
+# maximum total size in bytes of the distance results kept by `compute_contact_distances`. Results are keyed on the
+# contact positions, so probes of the same model share an entry, even when they are read from different files.
+DISTANCES_CACHE_MAX_BYTES = 256 * 2**20
+
+_distances_cache = OrderedDict()
+
+
+def compute_contact_distances(
+    positions: np.ndarray,
+    dtype: Union[str, np.dtype] = "float64",
+    max_distance: Union[float, None] = None,
+    block_size: int = 256,
+) -> Union[np.ndarray, scipy.sparse.csr_matrix]:
+    """
+    Compute the Euclidean distances between all pairs of contacts.
+
+    Dense distances are computed in blocks of rows, so the temporary memory scales with ``block_size`` times the
+    number of contacts instead of the square of the number of contacts. Sparse distances are computed only for the
+    pairs of contacts within ``max_distance``, so the time and memory scale with the number of neighbors. Results are
+    cached by the values of
+    ``positions``, ``dtype`` and ``max_distance``, so repeated calls for the same probe model are free. The least
+    recently used results are evicted when the cached results take more than ``DISTANCES_CACHE_MAX_BYTES``, and a
+    larger result is not cached, e.g., a dense float64 matrix of more than 5792 contacts. The returned arrays are
+    read-only because they are shared between calls. See ``clear_distances_cache``.
+
+    Parameters
+    ----------
+    positions: array-like
+        Contact positions with shape (num_contacts, ndim), e.g., ``ContactsTable["relative_position_in_um"]``.
+    dtype: str or numpy.dtype, default: "float64"
+        Floating point type of the distances, e.g., "float32" to halve the memory use.
+    max_distance: float, optional
+        If given, return a sparse CSR matrix (requires scipy) with only the distances less than or equal to
+        ``max_distance``. The distance of each contact to itself (and to any contact at the same position) is stored
+        as an explicit zero, so the sparsity structure gives the neighbors of each contact.
+    block_size: int, default: 256
+        Number of rows of the dense distance matrix computed at once. Sparse distances are computed from the pairs
+        of contacts found with a k-d tree (``scipy.spatial.cKDTree``) instead.
+
+    Returns
+    -------
+    distances: numpy.ndarray or scipy.sparse.csr_matrix
+        Matrix with shape (num_contacts, num_contacts).
+    """
+    positions = np.ascontiguousarray(positions, dtype=np.float64)
+    if positions.ndim != 2:
+        raise ValueError(f"`positions` must have shape (num_contacts, ndim), not {positions.shape}.")
+    dtype = np.dtype(dtype)
+    if dtype.kind != "f":
+        raise ValueError(f"`dtype` must be a floating point type, not '{dtype}'.")
+
+    key = (hashlib.sha1(positions.tobytes()).hexdigest(), positions.shape, dtype.str, max_distance)
+    if key in _distances_cache:
+        _distances_cache.move_to_end(key)
+        return _distances_cache[key]
+
+    if max_distance is None:
+        distances = _dense_distances(positions.astype(dtype), block_size)
+        distances.flags.writeable = False
+    else:
+        distances = _sparse_distances(positions.astype(dtype), max_distance)
+        for array in (distances.data, distances.indices, distances.indptr):
+            array.flags.writeable = False
+
+    num_bytes = _num_bytes(distances)
+    if num_bytes <= DISTANCES_CACHE_MAX_BYTES:
+        _distances_cache[key] = distances
+        while sum(_num_bytes(cached) for cached in _distances_cache.values()) > DISTANCES_CACHE_MAX_BYTES:
+            _distances_cache.popitem(last=False)
+    return distances
+
+
+def clear_distances_cache():
+    """Remove all results cached by ``compute_contact_distances``."""
+    _distances_cache.clear()
+
+
+def _num_bytes(distances) -> int:
+    if isinstance(distances, np.ndarray):
+        return distances.nbytes
+    return distances.data.nbytes + distances.indices.nbytes + distances.indptr.nbytes
+
+
+def _block_distances(positions: np.ndarray, start: int, stop: int) -> np.ndarray:
+    diff = positions[start:stop, np.newaxis, :] - positions[np.newaxis, :, :]
+    return np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+
+
+def _dense_distances(positions: np.ndarray, block_size: int) -> np.ndarray:
+    num_contacts = len(positions)
+    distances = np.empty((num_contacts, num_contacts), dtype=positions.dtype)
+    for start in range(0, num_contacts, block_size):
+        stop = min(start + block_size, num_contacts)
+        distances[start:stop] = _block_distances(positions, start, stop)
+    return distances
+
+
+def _sparse_distances(positions: np.ndarray, max_distance: float) -> scipy.sparse.csr_matrix:
+    try:
+        import scipy.sparse
+        import scipy.spatial
+    except ImportError:
+        raise ImportError("To compute sparse contact distances, install scipy: pip install scipy")
+
+    num_contacts = len(positions)
+    # find the candidate pairs with a k-d tree, so the time scales with the number of neighbors instead of the
+    # square of the number of contacts. The search radius is widened by the rounding error of `dtype` and the
+    # distances are then computed and compared in `dtype`, which gives the same entries as the dense matrix.
+    tree = scipy.spatial.cKDTree(positions.astype(np.float64))
+    radius = max_distance * (1.0 + 4.0 * np.finfo(positions.dtype).eps)
+    pairs = tree.sparse_distance_matrix(tree, radius, output_type="ndarray")
+    rows = pairs["i"].astype(np.int64)
+    cols = pairs["j"].astype(np.int64)
+    diff = positions[rows] - positions[cols]
+    data = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+    keep = data <= max_distance
+    # sort the entries by row, then by column, as required by the CSR format
+    order = np.lexsort((cols[keep], rows[keep]))
+    rows, cols, data = rows[keep][order], cols[keep][order], data[keep][order]
+    indptr = np.zeros(num_contacts + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_contacts), out=indptr[1:])
+    return scipy.sparse.csr_matrix((data, cols, indptr), shape=(num_contacts, num_contacts))
+
+
+def points_in_polygon(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """
+    Test which points lie inside a polygon, for all points at once.
+
+    Uses the even-odd (ray casting) rule, vectorized over the points, with one pass per polygon edge.
+    Only the first two coordinates (x, y) of the points and of the polygon nodes are used.
+
+    Parameters
+    ----------
+    points: array-like
+        Points with shape (num_points, ndim).
+    polygon: array-like
+        Nodes of the polygon with shape (num_nodes, ndim). The first and last nodes are connected to close the polygon.
+
+    Returns
+    -------
+    inside: numpy.ndarray
+        Boolean array with shape (num_points,).
+    """
+    points = np.asarray(points, dtype=np.float64)
+    polygon = np.asarray(polygon, dtype=np.float64)
+    x = points[:, 0]
+    y = points[:, 1]
+    inside = np.zeros(len(points), dtype=bool)
+    for (x1, y1), (x2, y2) in zip(polygon[:, :2], np.roll(polygon[:, :2], -1, axis=0)):
+        if y1 == y2:
+            continue
+        crosses = (y1 > y) != (y2 > y)
+        x_intersect = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < x_intersect)
+    return inside
+
+
+def find_overlapping_contacts(
+    positions: np.ndarray,
+    shape: Union[np.ndarray, None] = None,
+    radius_in_um: Union[np.ndarray, None] = None,
+    width_in_um: Union[np.ndarray, None] = None,
+    height_in_um: Union[np.ndarray, None] = None,
+) -> np.ndarray:
+    """
+    Find the pairs of contacts whose areas overlap.
+
+    Candidate pairs are found with a sweep over the bounding boxes of the contacts along the axis with the largest
+    extent, so only contacts that are close to each other are compared. The candidates are then tested exactly
+    for circles ("circle") and axis-aligned rectangles ("square", "rect" or any other shape with a width/height).
+    Contacts that only touch do not overlap. Missing (NaN) sizes are treated as zero. Only the first two
+    coordinates (x, y) of the positions are used and the plane axes of the contacts are not taken into account.
+
+    Parameters
+    ----------
+    positions: array-like
+        Contact positions in micrometers with shape (num_contacts, ndim).
+    shape: array-like of str, optional
+        Shape of each contact. Contacts with shape "circle" use ``radius_in_um``, other contacts use
+        ``width_in_um`` and ``height_in_um`` (``width_in_um`` if ``height_in_um`` is missing, e.g., for squares).
+    radius_in_um, width_in_um, height_in_um: array-like, optional
+        Size of each contact in micrometers.
+
+    Returns
+    -------
+    pairs: numpy.ndarray
+        Integer array with shape (num_pairs, 2) of the row indices (i, j), i < j, of the overlapping contacts,
+        sorted by i and then j.
+    """
+    positions = np.asarray(positions, dtype=np.float64)[:, :2]
+    num_contacts = len(positions)
+
+    def _size(values):
+        if values is None:
+            return np.zeros(num_contacts)
+        return np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+
+    radius = _size(radius_in_um)
+    width = _size(width_in_um)
+    height = _size(height_in_um) if height_in_um is not None else width
+    height = np.where(height == 0.0, width, height)
+    is_circle = np.zeros(num_contacts, dtype=bool) if shape is None else (np.asarray(shape) == "circle")
+    # half extents of the bounding box of each contact
+    half_extents = np.where(is_circle[:, np.newaxis], radius[:, np.newaxis], np.column_stack([width, height]) / 2)
+
+    # sweep along the axis with the largest extent, e.g., along the shank of a linear probe
+    sweep_axis = int(np.argmax(np.ptp(positions, axis=0))) if num_contacts else 0
+    other_axis = 1 - sweep_axis
+    low = positions[:, sweep_axis] - half_extents[:, sweep_axis]
+    high = positions[:, sweep_axis] + half_extents[:, sweep_axis]
+    order = np.argsort(low, kind="stable")
+    low_sorted = low[order]
+    high_sorted = high[order]
+
+    # for the i-th contact in sweep order, the candidates are the following contacts whose low bound is below its
+    # high bound
+    stop = np.searchsorted(low_sorted, high_sorted, side="left")
+    counts = np.maximum(stop - np.arange(num_contacts) - 1, 0)
+    first = np.repeat(np.arange(num_contacts), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    i = order[first]
+    j = order[first + 1 + offsets]
+
+    delta = np.abs(positions[i] - positions[j])
+    overlap_other = delta[:, other_axis] < half_extents[i, other_axis] + half_extents[j, other_axis]
+    i, j, delta = i[overlap_other], j[overlap_other], delta[overlap_other]
+
+    circle_i = is_circle[i]
+    circle_j = is_circle[j]
+    # two rectangles: the bounding boxes overlap along both axes
+    overlap = np.all(delta < half_extents[i] + half_extents[j], axis=1)
+    # two circles
+    both = circle_i & circle_j
+    overlap[both] = np.hypot(delta[both, 0], delta[both, 1]) < radius[i[both]] + radius[j[both]]
+    # a circle and a rectangle: the distance from the circle center to the rectangle is less than the radius
+    mixed = circle_i != circle_j
+    circle = np.where(circle_i, i, j)[mixed]
+    rect = np.where(circle_i, j, i)[mixed]
+    gap = np.maximum(delta[mixed] - half_extents[rect], 0.0)
+    overlap[mixed] = np.hypot(gap[:, 0], gap[:, 1]) < radius[circle]
+
+    pairs = np.sort(np.column_stack([i[overlap], j[overlap]]), axis=1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def validate_contacts_geometry(contacts_table, planar_contour_in_um: Union[np.ndarray, None] = None):
+    """
+    Check that the contacts of a ContactsTable lie inside the probe contour and do not overlap.
+
+    Parameters
+    ----------
+    contacts_table: ContactsTable
+        The contacts to check.
+    planar_contour_in_um: array-like, optional
+        The contour of the probe, e.g., ``ProbeModel.planar_contour_in_um``. If None, only overlaps are checked.
+
+    Raises
+    ------
+    ValueError
+        If any contact center lies outside the contour or any two contacts overlap. The message lists the rows
+        of the offending contacts.
+    """
+    positions = np.asarray(contacts_table["relative_position_in_um"].data[:], dtype=np.float64)
+    errors = []
+    if planar_contour_in_um is not None and len(positions) > 0:
+        outside = np.flatnonzero(~points_in_polygon(positions, planar_contour_in_um))
+        if len(outside):
+            errors.append(
+                f"{len(outside)} contact(s) lie outside `planar_contour_in_um`: rows {_truncate(outside.tolist())}"
+            )
+
+    columns = {}
+    for colname in ("shape", "radius_in_um", "width_in_um", "height_in_um"):
+        if colname in contacts_table.colnames:
+            columns[colname] = contacts_table[colname][:]
+    pairs = find_overlapping_contacts(positions, **columns)
+    if len(pairs):
+        errors.append(f"{len(pairs)} pair(s) of contacts overlap: rows {_truncate(pairs.tolist())}")
+
+    if errors:
+        raise ValueError(f"{contacts_table.__class__.__name__} '{contacts_table.name}': " + "; ".join(errors) + ".")
+
+
+def _truncate(values: list, max_items: int = 10) -> str:
+    if len(values) <= max_items:
+        return str(values)
+    return str(values[:max_items])[:-1] + ", ...]"
+
+
+def compute_insertion_transform(
+    insertion_position_ap_in_mm: float = 0.0,
+    insertion_position_ml_in_mm: float = 0.0,
+    insertion_position_dv_in_mm: float = 0.0,
+    depth_in_mm: float = 0.0,
+    insertion_angle_yaw_in_deg: float = 0.0,
+    insertion_angle_pitch_in_deg: float = 0.0,
+    insertion_angle_roll_in_deg: float = 0.0,
+) -> np.ndarray:
+    """
+    Compute the rigid transform from probe coordinates to stereotaxic coordinates of a probe insertion.
+
+    Probe coordinates (x, y, z) are the contact positions in micrometers, e.g., ``relative_position_in_um``,
+    measured from the probe tip: x is across the probe, y is along the probe from the tip towards the insertion
+    point and z is normal to the probe plane (0 for 2D probes). Stereotaxic coordinates (AP, ML, DV) are in
+    millimeters, relative to the same zero-point as the insertion position.
+
+    With all angles zero, the probe is inserted straight down (-DV) with its plane parallel to a sagittal slice,
+    i.e., x maps to +AP, y to +DV and z to +ML. The probe is then rotated by yaw (around DV, + is nose rightward),
+    pitch (around the rotated ML axis, + is nose upward) and roll (around the rotated AP axis, + is right side
+    downward), in that order. The tip is at ``depth_in_mm`` from the insertion position along the rotated
+    insertion direction.
+
+    Parameters
+    ----------
+    insertion_position_ap_in_mm, insertion_position_ml_in_mm, insertion_position_dv_in_mm: float
+        Stereotaxic coordinates where the probe was inserted, in millimeters.
+    depth_in_mm: float
+        Depth that the probe was driven along the insertion direction, in millimeters.
+    insertion_angle_yaw_in_deg, insertion_angle_pitch_in_deg, insertion_angle_roll_in_deg: float
+        Angles of the probe, in degrees.
+
+    Returns
+    -------
+    transform: numpy.ndarray
+        Matrix with shape (4, 4) that maps homogeneous probe coordinates in micrometers (x, y, z, 1) to
+        homogeneous stereotaxic coordinates in millimeters (AP, ML, DV, 1).
+    """
+    yaw, pitch, roll = np.deg2rad(
+        [insertion_angle_yaw_in_deg, insertion_angle_pitch_in_deg, insertion_angle_roll_in_deg]
+    )
+    # rotation matrices in (AP, ML, DV) coordinates
+    rotate_yaw = np.array([[np.cos(yaw), -np.sin(yaw), 0.0], [np.sin(yaw), np.cos(yaw), 0.0], [0.0, 0.0, 1.0]])
+    rotate_pitch = np.array(
+        [[np.cos(pitch), 0.0, -np.sin(pitch)], [0.0, 1.0, 0.0], [np.sin(pitch), 0.0, np.cos(pitch)]]
+    )
+    rotate_roll = np.array([[1.0, 0.0, 0.0], [0.0, np.cos(roll), np.sin(roll)], [0.0, -np.sin(roll), np.cos(roll)]])
+    # map probe (x, y, z) to (AP, ML, DV) before rotation
+    probe_to_stereotaxic = np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0], [0.0, 1.0, 0.0]])
+    rotation = rotate_yaw @ rotate_pitch @ rotate_roll @ probe_to_stereotaxic
+
+    insertion_position = np.array(
+        [insertion_position_ap_in_mm, insertion_position_ml_in_mm, insertion_position_dv_in_mm]
+    )
+    # the probe is driven along -y in probe coordinates
+    tip_position = insertion_position + depth_in_mm * (rotation @ np.array([0.0, -1.0, 0.0]))
+
+    transform = np.eye(4)
+    transform[:3, :3] = rotation / 1000.0  # um to mm
+    transform[:3, 3] = tip_position
+    return transform
+
+
+def apply_transform(transform: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    Apply a 4x4 homogeneous transform to an array of 2D or 3D positions with a single matrix multiply.
+
+    Parameters
+    ----------
+    transform: numpy.ndarray
+        Matrix with shape (4, 4), e.g., from ``compute_insertion_transform``.
+    positions: array-like
+        Positions with shape (num_positions, 2) or (num_positions, 3). 2D positions are given z = 0.
+
+    Returns
+    -------
+    transformed: numpy.ndarray
+        Array with shape (num_positions, 3).
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    if positions.ndim != 2 or positions.shape[1] not in (2, 3):
+        raise ValueError(
+            f"`positions` must have shape (num_positions, 2) or (num_positions, 3), not {positions.shape}."
+        )
+    # the z column of the transform is unused for 2D positions since z = 0
+    return positions @ transform[:3, : positions.shape[1]].T + transform[:3, 3]
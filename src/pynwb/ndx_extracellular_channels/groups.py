@@ -0,0 +1,71 @@
+"""Compressed sparse row (CSR) index of the rows of a table grouped by the values of a column."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+from typing import Iterator, Tuple
+
+import numpy as np
+
+
+class GroupIndex:
+    """
+    Index of the rows of a table grouped by the values of a column, stored as in a CSR matrix.
+
+    The rows of the group ``keys[i]`` are ``indices[offsets[i]:offsets[i + 1]]``, in increasing order. The keys are
+    sorted. Getting the rows of a group returns a read-only view of ``indices``, so it takes constant time.
+
+    Examples
+    --------
+    >>> index = channels_table.get_group_index()  # by the shank_id of the contact of each channel
+    >>> for shank_id, rows in index:
+    ...     data_of_shank = data[:, rows]
+    >>> rows_of_shank_1 = index["1"]
+    """
+
+    def __init__(self, values):
+        """
+        Parameters
+        ----------
+        values: array-like
+            The value of the column for each row.
+        """
+        values = np.asarray(values)
+        if values.ndim != 1:
+            raise ValueError(f"The values must be one-dimensional, not an array with shape {values.shape}.")
+        keys, inverse = np.unique(values, return_inverse=True)
+        # a stable sort keeps the rows of each group in increasing order
+        self.indices = np.argsort(inverse, kind="stable")
+        self.offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(inverse, minlength=len(keys)), out=self.offsets[1:])
+        self.keys = keys
+        for array in (self.keys, self.indices, self.offsets):
+            array.flags.writeable = False
+        self._positions = {key: i for i, key in enumerate(keys.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._positions
+
+    def __getitem__(self, key) -> np.ndarray:
+        """Get the sorted rows of the group with the given key."""
+        if key not in self._positions:
+            raise KeyError(f"No group with key {key!r}. Keys are: {self.keys.tolist()}.")
+        return self.get_group(self._positions[key])
+
+    def __iter__(self) -> Iterator[Tuple[object, np.ndarray]]:
+        """Iterate over the (key, rows) pairs of the groups, in the order of the sorted keys."""
+        for i, key in enumerate(self.keys.tolist()):
+            yield key, self.get_group(i)
+
+    def get_group(self, i: int) -> np.ndarray:
+        """Get the sorted rows of the i-th group."""
+        return self.indices[self.offsets[i] : self.offsets[i + 1]]
+
+    def get_sizes(self) -> np.ndarray:
+        """Get the number of rows of each group."""
+        return np.diff(self.offsets)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} groups, {len(self.indices)} rows)"
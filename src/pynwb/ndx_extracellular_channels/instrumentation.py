@@ -0,0 +1,193 @@
+"""Opt-in recording of call counts, wall time, rows and bytes of the I/O and conversion hot paths."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Union
+
+# active OperationRecorder instances and callbacks registered with `add_hook`. Instrumented functions only check
+# whether these lists are empty when instrumentation is disabled.
+_recorders = []
+_hooks = []
+
+
+def instrumented(
+    operation: str,
+    rows: Union[Callable, None] = None,
+    nbytes: Union[Callable, None] = None,
+):
+    """
+    Decorate a function to report an event for each call while instrumentation is enabled.
+
+    Parameters
+    ----------
+    operation: str
+        Name of the operation, e.g., "ChannelsTable.add_row".
+    rows, nbytes: callable, optional
+        Functions of ``(args, kwargs, result)`` that return the number of rows appended and of bytes handled by a
+        call. What the bytes measure depends on the operation, see ``OperationRecorder``. They are only evaluated
+        while instrumentation is enabled.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not (_recorders or _hooks):
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            wall_time = time.perf_counter() - start
+            _emit(
+                dict(
+                    operation=operation,
+                    wall_time=wall_time,
+                    rows=rows(args, kwargs, result) if rows is not None else 0,
+                    bytes=nbytes(args, kwargs, result) if nbytes is not None else 0,
+                )
+            )
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _emit(event: dict):
+    for recorder in list(_recorders):
+        recorder.record(event)
+    for hook in list(_hooks):
+        hook(event)
+
+
+class OperationRecorder:
+    """
+    Aggregates the events of instrumented operations by operation name.
+
+    Create one with ``record_operations``. Each event has the keys "operation", "wall_time" (in seconds), "rows"
+    (rows appended) and "bytes". The bytes of "ExtracellularSeries.__init__" are the size of the ``data`` array in
+    memory, which is 0 for data that is read lazily, e.g., from an HDF5 file, or wrapped in a ``DataIO`` or an
+    iterator. The bytes of "write_nwbfile" are the growth of the file on disk. The other operations report 0 bytes.
+    """
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, event: dict):
+        """Add an event to the totals of its operation."""
+        with self._lock:
+            totals = self._totals.setdefault(event["operation"], dict(count=0, wall_time=0.0, rows=0, bytes=0))
+            totals["count"] += 1
+            totals["wall_time"] += event["wall_time"]
+            totals["rows"] += event["rows"]
+            totals["bytes"] += event["bytes"]
+
+    def report(self) -> dict:
+        """
+        Get the totals of the recorded operations.
+
+        Returns
+        -------
+        report: dict
+            Map from operation name to a dict with the number of calls ("count"), the total "wall_time" in seconds,
+            and the total number of "rows" appended and "bytes" (see above).
+        """
+        with self._lock:
+            return {operation: dict(totals) for operation, totals in self._totals.items()}
+
+
+@contextmanager
+def record_operations() -> Iterator[OperationRecorder]:
+    """
+    Record the instrumented operations called within the context.
+
+    The instrumented operations are ``from_probeinterface``, the construction of ``ContactsTable`` and
+    ``ExtracellularSeries``, ``ContactsTable.add_row``, ``ChannelsTable.add_row`` and ``write_nwbfile``. Outside of
+    a ``record_operations`` context and without hooks, instrumentation costs one check per call.
+
+    Examples
+    --------
+    >>> with record_operations() as recorder:
+    ...     probes = from_probeinterface(probegroup)
+    ...     write_nwbfile("session.nwb", nwbfile)
+    >>> recorder.report()["from_probeinterface"]["wall_time"]
+    """
+    recorder = OperationRecorder()
+    _recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorders.remove(recorder)
+
+
+def add_hook(callback: Callable[[dict], None]):
+    """
+    Call ``callback(event)`` for every call of an instrumented operation, e.g., to forward it to a metrics system.
+
+    See ``OperationRecorder`` for the keys of the event. Remove the hook with ``remove_hook``.
+    """
+    _hooks.append(callback)
+
+
+def remove_hook(callback: Callable[[dict], None]):
+    """Remove a hook added with ``add_hook``."""
+    _hooks.remove(callback)
+
+
+def _file_size(io) -> int:
+    source = getattr(io, "source", None)
+    if source is not None and os.path.exists(source):
+        return os.path.getsize(source)
+    return 0
+
+
+def write_nwbfile(io, container, **kwargs):
+    """
+    Write a container to a path or with an HDMF IO object and record it as the "write_nwbfile" operation.
+
+    If ``io`` is a path, the file is opened with ``NWBHDF5IO(io, "w")`` and closed after writing. An IO object is
+    left open, e.g., for ``MultiStreamBuilder.write_data``, and the caller closes it. The bytes of the event are the
+    growth of the file on disk, measured after flushing the file to disk.
+
+    Parameters
+    ----------
+    io: str, os.PathLike or hdmf.backends.io.HDMFIO
+        The path of the file to write, or the IO object to write with, e.g., ``NWBHDF5IO(path, "w")``.
+    container: hdmf.container.Container
+        The container to write, e.g., an ``NWBFile``.
+    **kwargs
+        Passed to ``io.write``.
+    """
+    if isinstance(io, (str, os.PathLike)):
+        from pynwb import NWBHDF5IO
+
+        with NWBHDF5IO(io, "w") as opened_io:
+            write_nwbfile(opened_io, container, **kwargs)
+        return
+    if not (_recorders or _hooks):
+        io.write(container, **kwargs)
+        return
+    size_before = _file_size(io)
+    start = time.perf_counter()
+    io.write(container, **kwargs)
+    wall_time = time.perf_counter() - start
+    _flush(io)
+    _emit(
+        dict(
+            operation="write_nwbfile",
+            wall_time=wall_time,
+            rows=0,
+            bytes=max(_file_size(io) - size_before, 0),
+        )
+    )
+
+
+def _flush(io):
+    # HDF5IO does not flush its h5py.File until it is closed, so the file on disk is incomplete after `io.write`
+    h5_file = getattr(io, "_file", None)
+    if h5_file is not None:
+        h5_file.flush()
@@ -1,11 +1,13 @@
 from __future__ import annotations  # postpone type hint evaluation
 
 import warnings
-from typing import TYPE_CHECKING, List, Union
+from typing import TYPE_CHECKING, List, Sequence, Union
 
 import ndx_extracellular_channels
 import numpy as np
 
+from .instrumentation import instrumented
+
 if TYPE_CHECKING:
     import probeinterface
 
@@ -18,9 +20,14 @@ unit_map = {
 inverted_unit_map = {v: k for k, v in unit_map.items()}
 
 
+@instrumented(
+    "from_probeinterface",
+    rows=lambda args, kwargs, result: sum(len(probe.probe_model.contacts_table) for probe in result),
+)
 def from_probeinterface(
     probe_or_probegroup: Union[probeinterface.Probe, probeinterface.ProbeGroup],
     name: Union[str, list] = None,
+    compact_plane_axes: bool = False,
 ) -> List[ndx_extracellular_channels.Probe]:
     """
     Construct ndx_extracellular_channels.Probe objects from a probeinterface.Probe or probeinterface.ProbeGroup.
@@ -32,6 +39,9 @@ def from_probeinterface(
     name: str or list, optional
         Name of the Probe. If a ProbeGroup is passed, this can be a list of names.
         If None, an error will be raised if the Probe(s) does not have a name.
+    compact_plane_axes: bool, default: False
+        If True and all contacts of a probe have the same plane axes, store them once in
+        ContactsTable.shared_plane_axes instead of in the per-contact `plane_axes` column.
 
     NOTE: The probeinterface.Probe.device_channel_indices are a property of the data acquisition and not set
     in the ndx_extracellular_channels.Probe object. You can specify this in ChannelsTable.contacts.
@@ -66,11 +76,13 @@ def from_probeinterface(
 
     ndx_probes = []
     for probe, name in zip(probes, names):
-        ndx_probes.append(_single_probe_to_ndx_probe(probe, name))
+        ndx_probes.append(_single_probe_to_ndx_probe(probe, name, compact_plane_axes=compact_plane_axes))
     return ndx_probes
 
 
-def to_probeinterface(ndx_probe: ndx_extracellular_channels.Probe) -> probeinterface.Probe:
+def to_probeinterface(
+    ndx_probe: ndx_extracellular_channels.Probe, columns: Union[Sequence[str], None] = None
+) -> probeinterface.Probe:
     """
     Construct a probeinterface.Probe from a ndx_extracellular_channels.Probe.
 
@@ -87,7 +99,9 @@ def to_probeinterface(ndx_probe: ndx_extracellular_channels.Probe) -> probeinter
     ndx_extracellular_channels.Probe.probe_model.contacts_table["device_channel"] ->
         probeinterface.Probe.device_channel_indices
     ndx_extracellular_channels.Probe.probe_model.contacts_table["shank_id"] -> probeinterface.Probe.shank_ids
-    ndx_extracellular_channels.Probe.probe_model.contacts_table["plane_axes"] -> probeinterface.Probe.contact_plane_axes
+    ndx_extracellular_channels.Probe.probe_model.contacts_table["plane_axes"] or
+        ndx_extracellular_channels.Probe.probe_model.contacts_table.shared_plane_axes ->
+        probeinterface.Probe.contact_plane_axes
     ndx_extracellular_channels.Probe.probe_model.contacts_table["radius_in_um"] ->
         probeinterface.Probe.contact_shapes["radius"]
 
@@ -95,10 +109,17 @@ def to_probeinterface(ndx_probe: ndx_extracellular_channels.Probe) -> probeinter
     from NWB data, use the mapping from channels in the ChannelsTable to contacts in the
     ndx_extracellular_channels.Probe.probe_model.contacts_table (ChannelsTable.contacts).
 
+    Each column of the ContactsTable is read from disk at most once, and only if it is used.
+
     Parameters
     ----------
     ndx_probe: ndx_extracellular_channels.Probe
         ndx_extracellular_channels.Probe to convert to probeinterface.Probe
+    columns: sequence of str, optional
+        Names of the optional ContactsTable columns to read, out of "contact_id", "shank_id", "plane_axes",
+        "shape", "radius_in_um", "width_in_um" and "height_in_um". "relative_position_in_um" is always read. If
+        None, all of these columns that are present are read. If "shape" is not read, the default contact shape of
+        probeinterface is used. The radius, width and height columns can only be read together with "shape".
 
     Returns
     -------
@@ -111,49 +132,36 @@ def to_probeinterface(ndx_probe: ndx_extracellular_channels.Probe) -> probeinter
             "To use the probeinterface conversion functions, install probeinterface: pip install probeinterface"
         )
 
-    positions = []
-    shapes = []
-
-    contact_ids = None
-    shank_ids = None
-    plane_axes = None
-
     possible_shape_keys = ["radius_in_um", "width_in_um", "height_in_um"]
+    optional_columns = ["contact_id", "shank_id", "plane_axes", "shape"] + possible_shape_keys
+    if columns is None:
+        columns = optional_columns
+    unknown = [column for column in columns if column not in optional_columns]
+    if unknown:
+        raise ValueError(f"Columns {unknown} cannot be converted. Supported columns are: {optional_columns}.")
+    shape_columns = [column for column in columns if column in possible_shape_keys]
+    if shape_columns and "shape" not in columns:
+        raise ValueError(f"Columns {shape_columns} are the parameters of the contact shape and require 'shape'.")
     contacts_table = ndx_probe.probe_model.contacts_table
-
-    positions.append(contacts_table["relative_position_in_um"][:])
-    shapes.append(contacts_table["shape"][:])
-    if "contact_id" in contacts_table.colnames:
-        if contact_ids is None:
-            contact_ids = []
-        contact_ids.append(contacts_table["contact_id"][:])
-    if "plane_axes" in contacts_table.colnames:
-        if plane_axes is None:
-            plane_axes = []
-        plane_axes.append(contacts_table["plane_axes"][:])
-    if "shank_id" in contacts_table.colnames:
-        if shank_ids is None:
-            shank_ids = []
-        shank_ids.append(contacts_table["shank_id"][:])
-
-    positions = [item for sublist in positions for item in sublist]
-    shapes = [item for sublist in shapes for item in sublist]
-
-    if contact_ids is not None:
-        contact_ids = [item for sublist in contact_ids for item in sublist]
-    if plane_axes is not None:
-        plane_axes = [item for sublist in plane_axes for item in sublist]
-    if shank_ids is not None:
-        shank_ids = [item for sublist in shank_ids for item in sublist]
-
-    # if there are multiple shape keys, e.g., radius, width, and height
-    # we need to create a list of dicts, one for each contact
-    shape_params = [dict() for _ in range(len(contacts_table))]
-    for i in range(len(contacts_table)):
-        for possible_shape_key in possible_shape_keys:
-            if possible_shape_key in contacts_table.colnames:
-                new_key = possible_shape_key.replace("_in_um", "")
-                shape_params[i][new_key] = contacts_table[possible_shape_key][i]
+    columns = [column for column in columns if column in contacts_table.colnames or column == "plane_axes"]
+
+    contacts = dict(positions=np.asarray(contacts_table["relative_position_in_um"][:]))
+    if "shape" in columns:
+        contacts["shapes"] = np.asarray(contacts_table["shape"][:])
+        # if there are multiple shape keys, e.g., radius, width, and height
+        # we need to create a list of dicts, one for each contact
+        shape_columns = {
+            key.replace("_in_um", ""): np.asarray(contacts_table[key][:]).tolist()
+            for key in possible_shape_keys
+            if key in columns
+        }
+        contacts["shape_params"] = [
+            {key: values[i] for key, values in shape_columns.items()} for i in range(len(contacts_table))
+        ]
+    if "plane_axes" in columns:
+        contacts["plane_axes"] = contacts_table.get_plane_axes()
+    if "shank_id" in columns:
+        contacts["shank_ids"] = np.asarray(contacts_table["shank_id"][:])
 
     probeinterface_probe = probeinterface.Probe(
         ndim=ndx_probe.probe_model.ndim,
@@ -163,18 +171,16 @@ def to_probeinterface(ndx_probe: ndx_extracellular_channels.Probe) -> probeinter
         model_name=ndx_probe.probe_model.name,
         manufacturer=ndx_probe.probe_model.manufacturer,
     )
-    probeinterface_probe.set_contacts(
-        positions=positions, shapes=shapes, shape_params=shape_params, plane_axes=plane_axes, shank_ids=shank_ids
-    )
-    if contact_ids is not None:
-        probeinterface_probe.set_contact_ids(contact_ids=contact_ids)
+    probeinterface_probe.set_contacts(**contacts)
+    if "contact_id" in columns:
+        probeinterface_probe.set_contact_ids(contact_ids=np.asarray(contacts_table["contact_id"][:]))
     probeinterface_probe.set_planar_contour(ndx_probe.probe_model.planar_contour_in_um)
 
     return probeinterface_probe
 
 
 def _single_probe_to_ndx_probe(
-    probe: probeinterface.Probe, name: Union[str, None] = None
+    probe: probeinterface.Probe, name: Union[str, None] = None, compact_plane_axes: bool = False
 ) -> ndx_extracellular_channels.Probe:
     contacts_arr = probe.to_numpy()
 
@@ -192,16 +198,23 @@ def _single_probe_to_ndx_probe(
             if k not in shape_keys:
                 shape_keys.append(k)
 
+    shared_plane_axes = None
+    plane_axes = np.asarray(probe.contact_plane_axes)
+    if compact_plane_axes and len(plane_axes) > 0 and np.all(plane_axes == plane_axes[0]):
+        shared_plane_axes = plane_axes[0]
+
     contacts_table = ndx_extracellular_channels.ContactsTable(
         description="Contacts Table, populated by ProbeInterface",
+        shared_plane_axes=shared_plane_axes,
     )
 
     for index in np.arange(probe.get_contact_count()):
         kwargs = dict(
             relative_position_in_um=probe.contact_positions[index],
-            plane_axes=probe.contact_plane_axes[index],
             shape=contacts_arr["contact_shapes"][index],
         )
+        if shared_plane_axes is None:
+            kwargs["plane_axes"] = plane_axes[index]
         for k in shape_keys:
             kwargs[f"{k}_in_um"] = contacts_arr[k][index] * conversion_factor
         if probe.contact_ids is not None:
@@ -0,0 +1,492 @@
+"""Convert between core ElectricalSeries with the electrodes table and ExtracellularSeries without copying data."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+import os
+from typing import TYPE_CHECKING, Sequence, Union
+
+import h5py
+import numpy as np
+from hdmf.backends.hdf5 import H5DataIO
+from hdmf.common import DynamicTableRegion, VectorData
+
+if TYPE_CHECKING:
+    from pynwb import NWBFile
+    from pynwb.ecephys import ElectricalSeries
+
+    from . import ExtracellularSeries
+
+# ElectricalSeries store volts and ExtracellularSeries store microvolts
+VOLTS_TO_MICROVOLTS = 1e6
+# the electrodes table has +x posterior, +y inferior and +z right; ChannelsTable has + anterior, up and right
+ELECTRODES_AXES = (("x", "ap", -1.0), ("y", "dv", -1.0), ("z", "ml", 1.0))
+# optional columns of the electrodes table that are converted
+ELECTRODES_COLUMNS = ("location", "filtering", "x", "y", "z", "rel_x", "rel_y", "rel_z")
+
+
+def migrate_electrical_series(
+    nwbfile: NWBFile,
+    electrical_series: Union[Sequence[ElectricalSeries], None] = None,
+    position_scale_to_mm: float = 1e-3,
+    name_suffix: str = "_extracellular",
+    columns: Union[Sequence[str], None] = None,
+    link_data: bool = False,
+) -> dict:
+    """
+    Add an ExtracellularSeries, with its ChannelsTable, Probe and ProbeModel, for each ElectricalSeries of an NWBFile.
+
+    Each Device of the electrodes table becomes a Probe whose ContactsTable has one contact per electrode of the
+    device, with "contact_id" set to the electrode ID, "shank_id" to the name of the electrode group and
+    "relative_position_in_um" to the "rel_x", "rel_y" (and "rel_z") columns, or 0 if they are not present. The
+    ChannelsTable of each series has one row per electrode of the series, with "filter" from the "filtering" column,
+    "estimated_brain_area" from the "location" column and "estimated_position_{ap,ml,dv}_in_mm" from the "x" (+ is
+    posterior), "y" (+ is inferior) and "z" (+ is right) columns.
+
+    The ``data`` and ``timestamps`` of the new series are the datasets of the ElectricalSeries, and the factor from
+    volts to microvolts is stored in the "channel_conversion" of the new series. A linked dataset keeps the
+    attributes of its target, i.e., the "unit" (volts) of the ElectricalSeries instead of the fixed unit of an
+    ExtracellularSeries (microvolts), so when the NWBFile was read from an HDF5 file, the data are copied when it is
+    written, unless ``link_data`` is True. ``migrate_nwb_file`` links the data without this mismatch. The timestamps
+    have the same attributes in both series and are always linked. The ElectricalSeries are kept.
+
+    Parameters
+    ----------
+    nwbfile: NWBFile
+        The file to migrate, with an electrodes table.
+    electrical_series: sequence of ElectricalSeries, optional
+        The series to migrate. If None, all ElectricalSeries in the acquisition of the file are migrated.
+    position_scale_to_mm: float, default: 1e-3
+        Factor that converts the "x", "y" and "z" columns of the electrodes table to millimeters. The default
+        assumes micrometers.
+    name_suffix: str, default: "_extracellular"
+        Suffix added to the name of each ElectricalSeries to name its ExtracellularSeries. The ChannelsTable is
+        named after the new series with the suffix "_channels".
+    columns: sequence of str, optional
+        Names of the electrodes table columns to convert, out of "location", "filtering", "x", "y", "z", "rel_x",
+        "rel_y" and "rel_z". Other columns are not read. If None, all of these columns that are present are
+        converted.
+    link_data: bool, default: False
+        If True, data in an HDF5 file are written as links that keep the attributes of the ElectricalSeries data,
+        which must be replaced after writing, as ``migrate_nwb_file`` does. If False, they are copied.
+
+    Returns
+    -------
+    series: dict
+        Map from the name of each migrated ElectricalSeries to its new ExtracellularSeries.
+    """
+    from pynwb.ecephys import ElectricalSeries
+
+    from . import ChannelsTable, ExtracellularSeries
+
+    electrodes = nwbfile.electrodes
+    if electrodes is None:
+        raise ValueError("The NWBFile has no electrodes table.")
+    columns = [column for column in _check_columns(columns) if column in electrodes.colnames]
+    if electrical_series is None:
+        electrical_series = [series for series in nwbfile.acquisition.values() if isinstance(series, ElectricalSeries)]
+
+    probes = {}
+    migrated = {}
+    for series in electrical_series:
+        if series.offset:
+            raise ValueError(
+                f"{series.__class__.__name__} '{series.name}': Cannot link data with a nonzero offset, because the "
+                "offset in volts would be read as microvolts."
+            )
+        rows = np.asarray(series.electrodes.data[:], dtype=np.int64)
+        devices = {electrodes["group"][row].device.name for row in rows}
+        if len(devices) != 1:
+            raise ValueError(
+                f"{series.__class__.__name__} '{series.name}': The electrodes belong to {len(devices)} devices "
+                f"{sorted(devices)}, but an ExtracellularSeries records from a single probe."
+            )
+        device = electrodes["group"][rows[0]].device
+        if device.name not in probes:
+            probes[device.name] = _device_to_probe(nwbfile, device, columns)
+        probe, contact_rows = probes[device.name]
+
+        name = series.name + name_suffix
+        channel_columns = [
+            DynamicTableRegion(
+                name="contact",
+                description="The row in a ContactsTable that represents the contact used as a channel.",
+                data=contact_rows[rows].tolist(),
+                table=probe.probe_model.contacts_table,
+            )
+        ]
+        channel_columns.extend(_electrodes_to_channel_columns(electrodes, rows, position_scale_to_mm, columns))
+        channels_table = ChannelsTable(
+            name=f"{name}_channels",
+            description=f"Channels of ElectricalSeries '{series.name}', migrated from the electrodes table.",
+            probe=probe,
+            id=list(range(len(rows))),
+            columns=channel_columns,
+        )
+        nwbfile.add_acquisition(channels_table)
+
+        channel_conversion = np.full(len(rows), VOLTS_TO_MICROVOLTS)
+        if series.channel_conversion is not None:
+            channel_conversion *= np.asarray(series.channel_conversion[:], dtype=np.float64)
+        if series.timestamps is not None:
+            timing = dict(timestamps=series.timestamps)
+        else:
+            timing = dict(rate=series.rate, starting_time=series.starting_time)
+        migrated[series.name] = ExtracellularSeries(
+            name=name,
+            description=series.description,
+            comments=series.comments,
+            data=_wrap_data(series.data, link_data),
+            conversion=series.conversion,
+            resolution=series.resolution,
+            channel_conversion=channel_conversion,
+            channels=DynamicTableRegion(
+                name="channels",
+                description=f"The channels of ElectricalSeries '{series.name}'.",
+                data=list(range(len(rows))),
+                table=channels_table,
+            ),
+            **timing,
+        )
+        nwbfile.add_acquisition(migrated[series.name])
+    return migrated
+
+
+def _check_columns(columns: Union[Sequence[str], None]) -> list:
+    if columns is None:
+        return list(ELECTRODES_COLUMNS)
+    unknown = [column for column in columns if column not in ELECTRODES_COLUMNS]
+    if unknown:
+        raise ValueError(f"Columns {unknown} cannot be converted. Supported columns are: {list(ELECTRODES_COLUMNS)}.")
+    return list(columns)
+
+
+def _device_to_probe(nwbfile: NWBFile, device, columns: list) -> tuple:
+    """Create the Probe of a device with one contact per electrode of the device.
+
+    Returns the Probe and the contact row of each row of the electrodes table (-1 for electrodes of other devices).
+    """
+    from . import ContactsTable, Probe, ProbeModel
+
+    electrodes = nwbfile.electrodes
+    groups = electrodes["group"].data[:]
+    rows = np.array([row for row, group in enumerate(groups) if group.device is device], dtype=np.int64)
+    contact_rows = np.full(len(electrodes), -1, dtype=np.int64)
+    contact_rows[rows] = np.arange(len(rows))
+
+    num_dims = 3 if "rel_z" in columns else 2
+    positions = np.zeros((len(rows), num_dims))
+    for axis, column in enumerate(("rel_x", "rel_y", "rel_z")[:num_dims]):
+        if column in columns:
+            positions[:, axis] = np.asarray(electrodes[column].data[:], dtype=np.float64)[rows]
+    ids = np.asarray(electrodes.id.data[:])[rows]
+    contacts_table = ContactsTable(
+        description=f"Electrodes of device '{device.name}', migrated from the electrodes table.",
+        id=list(range(len(rows))),
+        columns=[
+            VectorData(
+                name="relative_position_in_um",
+                description="Relative position of the contact in micrometers, relative to `reference`.",
+                data=positions.tolist(),
+            ),
+            VectorData(name="contact_id", description="Unique ID of the contact", data=[str(i) for i in ids]),
+            VectorData(name="shank_id", description="Shank ID of the contact", data=[groups[r].name for r in rows]),
+        ],
+    )
+    probe_model = ProbeModel(
+        name=f"{device.name}_probe_model",
+        model=device.description or device.name,
+        description=device.description,
+        manufacturer=device.manufacturer,
+        ndim=num_dims,
+        contacts_table=contacts_table,
+    )
+    probe = Probe(name=f"{device.name}_probe", probe_model=probe_model)
+    nwbfile.add_device(probe_model)
+    nwbfile.add_device(probe)
+    return probe, contact_rows
+
+
+def _electrodes_to_channel_columns(electrodes, rows: np.ndarray, position_scale_to_mm: float, columns: list) -> list:
+    """Get the ChannelsTable columns of the given rows of the electrodes table."""
+    channel_columns = []
+    if "filtering" in columns:
+        channel_columns.append(
+            VectorData(
+                name="filter",
+                description="The filter used on the raw (wideband) voltage data from this contact.",
+                data=[electrodes["filtering"].data[row] for row in rows],
+            )
+        )
+    for column, axis, sign in ELECTRODES_AXES:
+        if column in columns:
+            values = np.asarray(electrodes[column].data[:], dtype=np.float64)[rows]
+            channel_columns.append(
+                VectorData(
+                    name=f"estimated_position_{axis}_in_mm",
+                    description=f"Estimated {axis.upper()} position of the contact, in millimeters.",
+                    data=(sign * position_scale_to_mm * values).tolist(),
+                )
+            )
+    if "location" in columns:
+        channel_columns.append(
+            VectorData(
+                name="estimated_brain_area",
+                description="The brain area of the estimated contact position.",
+                data=[electrodes["location"].data[row] for row in rows],
+            )
+        )
+    return channel_columns
+
+
+def migrate_nwb_file(path: Union[str, os.PathLike], **kwargs) -> list:
+    """
+    Migrate the ElectricalSeries of an NWB file in place, linking the data of the new ExtracellularSeries to the
+    existing datasets so that only metadata is written.
+
+    The data of each new series is an HDF5 virtual dataset that maps the whole dataset of the ElectricalSeries and
+    has its own "unit" (microvolts) and "conversion" attributes, because a link would share the attributes of the
+    ElectricalSeries data.
+
+    Parameters
+    ----------
+    path: str or os.PathLike
+        Path of the NWB file, which is opened in append mode.
+    **kwargs
+        Passed to ``migrate_electrical_series``, except ``link_data``.
+
+    Returns
+    -------
+    names: list of str
+        Names of the new ExtracellularSeries.
+    """
+    from pynwb import NWBHDF5IO
+
+    with NWBHDF5IO(path, "a") as io:
+        nwbfile = io.read()
+        migrated = migrate_electrical_series(nwbfile, link_data=True, **kwargs)
+        io.write(nwbfile)
+    _replace_data_links(path, migrated.values())
+    return [series.name for series in migrated.values()]
+
+
+def _wrap_data(data, link_data: bool):
+    """Wrap HDF5 data so that they are copied instead of linked when they are written, unless ``link_data``."""
+    if isinstance(data, h5py.Dataset) and not link_data:
+        return H5DataIO(data=data, link_data=False)
+    return data
+
+
+def _replace_data_links(path: Union[str, os.PathLike], series: Sequence) -> None:
+    """Replace the links to the data of series in the acquisition of a file with virtual datasets.
+
+    The attributes of a link are those of its target, so the virtual dataset maps the whole target and gets the
+    "unit", "conversion", "resolution" and "offset" of the series instead.
+    """
+    with h5py.File(path, "a") as f:
+        for timeseries in series:
+            group = f["acquisition"][timeseries.name]
+            link = group.get("data", getlink=True)
+            if not isinstance(link, h5py.SoftLink):
+                continue
+            target = f[link.path]
+            layout = h5py.VirtualLayout(shape=target.shape, dtype=target.dtype)
+            layout[...] = h5py.VirtualSource(".", link.path, shape=target.shape, dtype=target.dtype)
+            attributes = dict(target.attrs)
+            attributes.update(
+                unit=timeseries.unit,
+                conversion=timeseries.conversion,
+                resolution=timeseries.resolution,
+                offset=timeseries.offset,
+            )
+            del group["data"]
+            dataset = group.create_virtual_dataset("data", layout)
+            dataset.attrs.update(attributes)
+
+
+def export_electrical_series(
+    nwbfile: NWBFile,
+    extracellular_series: Union[Sequence[ExtracellularSeries], None] = None,
+    position_scale_from_mm: float = 1e3,
+    name_suffix: str = "_electrical",
+    columns: Union[Sequence[str], None] = None,
+    link_data: bool = False,
+) -> dict:
+    """
+    Add an ElectricalSeries and electrodes table rows for each ExtracellularSeries of an NWBFile, for tools that only
+    read core ElectricalSeries.
+
+    Each shank of a Probe (or the whole Probe if its ContactsTable has no "shank_id" column) becomes an
+    ElectrodeGroup with the Probe as its device. Each channel of a ChannelsTable becomes one row of the electrodes
+    table, with "location" from the "confirmed_brain_area" or "estimated_brain_area" column ("unknown" if neither is
+    present), "filtering" from the "filter" column, "x", "y" and "z" from the confirmed or estimated positions and
+    "rel_x", "rel_y" (and "rel_z") from the "relative_position_in_um" of the contact. Channels tables shared by
+    several series are only added once.
+
+    The ``data`` and ``timestamps`` of the new series are the datasets of the ExtracellularSeries, and the factor from
+    microvolts to volts is stored in the "channel_conversion" of the ElectricalSeries. A linked dataset keeps the
+    attributes of its target, i.e., the "unit" (microvolts) of the ExtracellularSeries instead of the fixed unit of
+    an ElectricalSeries (volts), so when the NWBFile was read from an HDF5 file, the data are copied when it is
+    written, unless ``link_data`` is True. ``export_nwb_file`` links the data without this mismatch. The timestamps
+    are always linked. The ExtracellularSeries are kept.
+
+    Parameters
+    ----------
+    nwbfile: NWBFile
+        The file to export. Rows are appended to its electrodes table, which is created if it does not exist. In
+        append mode, the columns of an existing electrodes table must be resizable.
+    extracellular_series: sequence of ExtracellularSeries, optional
+        The series to export. If None, all ExtracellularSeries in the acquisition of the file are exported.
+    position_scale_from_mm: float, default: 1e3
+        Factor that converts the positions in millimeters to the unit of the "x", "y" and "z" columns. The default
+        is micrometers.
+    name_suffix: str, default: "_electrical"
+        Suffix added to the name of each ExtracellularSeries to name its ElectricalSeries.
+    columns: sequence of str, optional
+        Names of the electrodes table columns to fill, out of "location", "filtering", "x", "y", "z", "rel_x",
+        "rel_y" and "rel_z". Only the ChannelsTable and ContactsTable columns that these are computed from are
+        read. If None, all of these columns are filled if their source columns are present.
+    link_data: bool, default: False
+        If True, data in an HDF5 file are written as links that keep the attributes of the ExtracellularSeries
+        data, which must be replaced after writing, as ``export_nwb_file`` does. If False, they are copied.
+
+    Returns
+    -------
+    series: dict
+        Map from the name of each exported ExtracellularSeries to its new ElectricalSeries.
+    """
+    from pynwb.ecephys import ElectricalSeries
+
+    from . import ExtracellularSeries
+
+    columns = _check_columns(columns)
+    if extracellular_series is None:
+        extracellular_series = [
+            series for series in nwbfile.acquisition.values() if isinstance(series, ExtracellularSeries)
+        ]
+
+    electrode_rows = {}
+    exported = {}
+    for series in extracellular_series:
+        if series.offset:
+            raise ValueError(
+                f"{series.__class__.__name__} '{series.name}': Cannot link data with a nonzero offset, because the "
+                "offset in microvolts would be read as volts."
+            )
+        channels_table = series.channels.table
+        if channels_table.name not in electrode_rows:
+            electrode_rows[channels_table.name] = _channels_to_electrodes(
+                nwbfile, channels_table, position_scale_from_mm, columns
+            )
+        rows = electrode_rows[channels_table.name][np.asarray(series.channels.data[:], dtype=np.int64)]
+
+        channel_conversion = np.full(len(rows), 1.0 / VOLTS_TO_MICROVOLTS)
+        if series.channel_conversion is not None:
+            channel_conversion *= np.asarray(series.channel_conversion[:], dtype=np.float64)
+        if series.timestamps is not None:
+            timing = dict(timestamps=series.timestamps)
+        else:
+            timing = dict(rate=series.rate, starting_time=series.starting_time)
+        exported[series.name] = ElectricalSeries(
+            name=series.name + name_suffix,
+            description=series.description,
+            comments=series.comments,
+            data=_wrap_data(series.data, link_data),
+            conversion=series.conversion,
+            resolution=series.resolution,
+            channel_conversion=channel_conversion,
+            electrodes=nwbfile.create_electrode_table_region(
+                region=rows.tolist(), description=f"The channels of ExtracellularSeries '{series.name}'."
+            ),
+            **timing,
+        )
+        nwbfile.add_acquisition(exported[series.name])
+    return exported
+
+
+def _channels_to_electrodes(
+    nwbfile: NWBFile, channels_table, position_scale_from_mm: float, columns: list
+) -> np.ndarray:
+    """Add one row to the electrodes table per channel of a ChannelsTable and return the rows.
+
+    Each column of the ChannelsTable and ContactsTable is read at most once, and only if it is needed.
+    """
+    probe = channels_table.probe
+    contacts_table = probe.probe_model.contacts_table
+    contacts = np.asarray(channels_table["contact"].data[:], dtype=np.int64)
+    if "shank_id" in contacts_table.colnames:
+        shank_ids = np.asarray(contacts_table["shank_id"][:])[contacts].tolist()
+    else:
+        shank_ids = [None] * len(contacts)
+
+    groups = {}
+    for shank_id in dict.fromkeys(shank_ids):
+        name = probe.name if shank_id is None else f"{probe.name}_shank{shank_id}"
+        if name in nwbfile.electrode_groups:
+            groups[shank_id] = nwbfile.electrode_groups[name]
+        else:
+            groups[shank_id] = nwbfile.create_electrode_group(
+                name=name,
+                description=f"Contacts of Probe '{probe.name}'" + ("" if shank_id is None else f", shank {shank_id}"),
+                location="unknown",
+                device=probe,
+            )
+
+    values = {}
+    if "location" in columns:
+        for column in ("confirmed_brain_area", "estimated_brain_area"):
+            if column in channels_table.colnames:
+                values["location"] = list(channels_table[column][:])
+                break
+    if "filtering" in columns and "filter" in channels_table.colnames:
+        values["filtering"] = list(channels_table["filter"][:])
+    for column, axis, sign in ELECTRODES_AXES:
+        if column not in columns:
+            continue
+        for kind in ("confirmed", "estimated"):
+            if f"{kind}_position_{axis}_in_mm" in channels_table.colnames:
+                positions = np.asarray(channels_table[f"{kind}_position_{axis}_in_mm"][:], dtype=np.float64)
+                values[column] = (sign * position_scale_from_mm * positions).tolist()
+                break
+    relative_columns = [column for column in ("rel_x", "rel_y", "rel_z") if column in columns]
+    if relative_columns:
+        positions = np.asarray(contacts_table["relative_position_in_um"][:], dtype=np.float64)[contacts]
+        for axis, column in enumerate(("rel_x", "rel_y", "rel_z")[: positions.shape[1]]):
+            if column in relative_columns:
+                values[column] = positions[:, axis].tolist()
+
+    first_row = 0 if nwbfile.electrodes is None else len(nwbfile.electrodes)
+    for channel, shank_id in enumerate(shank_ids):
+        row = {column: column_values[channel] for column, column_values in values.items()}
+        row.setdefault("location", "unknown")
+        nwbfile.add_electrode(group=groups[shank_id], **row)
+    return np.arange(first_row, first_row + len(shank_ids))
+
+
+def export_nwb_file(path: Union[str, os.PathLike], **kwargs) -> list:
+    """
+    Add ElectricalSeries views of the ExtracellularSeries of an NWB file in place, linking their data to the existing
+    datasets so that only metadata is written.
+
+    As in ``migrate_nwb_file``, the data of each new series is an HDF5 virtual dataset with its own "unit" (volts)
+    and "conversion" attributes.
+
+    Parameters
+    ----------
+    path: str or os.PathLike
+        Path of the NWB file, which is opened in append mode.
+    **kwargs
+        Passed to ``export_electrical_series``, except ``link_data``.
+
+    Returns
+    -------
+    names: list of str
+        Names of the new ElectricalSeries.
+    """
+    from pynwb import NWBHDF5IO
+
+    with NWBHDF5IO(path, "a") as io:
+        nwbfile = io.read()
+        exported = export_electrical_series(nwbfile, link_data=True, **kwargs)
+        io.write(nwbfile)
+    _replace_data_links(path, exported.values())
+    return [series.name for series in exported.values()]
@@ -0,0 +1,147 @@
+"""A local library of precomputed probe models, stored as the column arrays of their ContactsTable in a .npz file."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+import functools
+import os
+from typing import TYPE_CHECKING, Sequence, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from . import ProbeModel
+
+# the library of common probe models shipped with the package, see scripts/build_probe_library.py
+LIBRARY_PATH = os.path.join(os.path.dirname(__file__), "probe_library.npz")
+
+
+def save_probe_library(path: Union[str, os.PathLike], probe_models: Sequence[ProbeModel]):
+    """
+    Save probe models and the columns of their ContactsTable as arrays in a compressed .npz file.
+
+    The models are keyed by "manufacturer/model", e.g., "IMEC/Neuropixels 1.0". Columns that reference other tables
+    are not saved.
+
+    Parameters
+    ----------
+    path: str or os.PathLike
+        Path of the .npz file to write.
+    probe_models: sequence of ProbeModel
+        The probe models to save, e.g., the ``probe_model`` of the probes returned by ``from_probeinterface``.
+    """
+    from hdmf.common import DynamicTableRegion
+
+    keys = []
+    arrays = {}
+    for probe_model in probe_models:
+        key = f"{probe_model.manufacturer}/{probe_model.model}"
+        if key in keys:
+            raise ValueError(f"The probe model '{key}' is in the library more than once.")
+        keys.append(key)
+        contacts_table = probe_model.contacts_table
+        arrays[f"{key}/ndim"] = np.asarray(probe_model.ndim)
+        arrays[f"{key}/description"] = np.asarray(probe_model.description or "")
+        if probe_model.planar_contour_in_um is not None:
+            arrays[f"{key}/planar_contour_in_um"] = np.asarray(probe_model.planar_contour_in_um, dtype=np.float64)
+        if contacts_table.shared_plane_axes is not None:
+            arrays[f"{key}/shared_plane_axes"] = np.asarray(contacts_table.shared_plane_axes, dtype=np.float64)
+        names = [column.name for column in contacts_table.columns if not isinstance(column, DynamicTableRegion)]
+        arrays[f"{key}/column_names"] = np.asarray(names)
+        arrays[f"{key}/column_descriptions"] = np.asarray([contacts_table[name].description for name in names])
+        for name in names:
+            arrays[f"{key}/columns/{name}"] = np.asarray(contacts_table[name][:])
+    np.savez_compressed(path, models=np.asarray(keys), **arrays)
+
+
+@functools.lru_cache(maxsize=None)
+def load_probe_library(path: Union[str, os.PathLike, None] = None) -> dict:
+    """
+    Load a probe library saved with ``save_probe_library``. The library is read once per path and process.
+
+    Parameters
+    ----------
+    path: str or os.PathLike, optional
+        Path of the .npz file. Defaults to the library shipped with the package.
+
+    Returns
+    -------
+    library: dict
+        Map from "manufacturer/model" to a dict of the arrays of the model. The arrays are read-only.
+    """
+    library = {}
+    with np.load(LIBRARY_PATH if path is None else path) as npz:
+        for key in npz["models"].tolist():
+            prefix = f"{key}/"
+            library[key] = {name[len(prefix) :]: npz[name] for name in npz.files if name.startswith(prefix)}
+    for arrays in library.values():
+        for array in arrays.values():
+            array.flags.writeable = False
+    return library
+
+
+def list_probe_library(path: Union[str, os.PathLike, None] = None) -> list:
+    """Get the "manufacturer/model" keys of the probe models in a library, by default the one shipped with the
+    package."""
+    return list(load_probe_library(path))
+
+
+def probe_model_from_library(
+    model: str, name: Union[str, None] = None, path: Union[str, os.PathLike, None] = None
+) -> ProbeModel:
+    """
+    Create a ProbeModel and its ContactsTable from a probe library, without probeinterface.
+
+    Parameters
+    ----------
+    model: str
+        The "manufacturer/model" key of the model, e.g., "IMEC/Neuropixels 1.0", or only the model name if it is
+        unique in the library. See ``list_probe_library``.
+    name: str, optional
+        Name of the ProbeModel. Defaults to the model name.
+    path: str or os.PathLike, optional
+        Path of the library. Defaults to the library shipped with the package.
+
+    Returns
+    -------
+    probe_model: ProbeModel
+    """
+    from hdmf.common import VectorData
+
+    from . import ContactsTable, ProbeModel
+
+    library = load_probe_library(path)
+    if model in library:
+        key = model
+    else:
+        matches = [key for key in library if key.split("/", 1)[1] == model]
+        if len(matches) != 1:
+            raise ValueError(
+                f"The probe model '{model}' is {'ambiguous' if matches else 'not'} in the library. Use one of "
+                f"{matches or list(library)}."
+            )
+        key = matches[0]
+    arrays = library[key]
+    manufacturer, model_name = key.split("/", 1)
+
+    columns = []
+    for column_name, description in zip(arrays["column_names"].tolist(), arrays["column_descriptions"].tolist()):
+        values = arrays[f"columns/{column_name}"]
+        # text columns are stored as lists, like the columns filled by `add_row`
+        data = values.tolist() if values.dtype.kind == "U" else values.copy()
+        columns.append(VectorData(name=column_name, description=description, data=data))
+    num_contacts = len(arrays[f"columns/{arrays['column_names'][0]}"]) if len(arrays["column_names"]) else 0
+    contacts_table = ContactsTable(
+        description=f"Contacts of {model_name}, from the probe library.",
+        id=list(range(num_contacts)),
+        columns=columns,
+        shared_plane_axes=arrays["shared_plane_axes"].copy() if "shared_plane_axes" in arrays else None,
+    )
+    return ProbeModel(
+        name=name,
+        model=model_name,
+        manufacturer=manufacturer,
+        description=arrays["description"].item() or None,
+        ndim=int(arrays["ndim"]),
+        planar_contour_in_um=arrays["planar_contour_in_um"].copy() if "planar_contour_in_um" in arrays else None,
+        contacts_table=contacts_table,
+    )
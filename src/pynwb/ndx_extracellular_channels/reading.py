@@ -0,0 +1,354 @@
+"""Readers for sequential and repeated access to the data of an ExtracellularSeries."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Union
+
+import numpy as np
+
+
+class BlockPrefetcher:
+    """
+    Iterator over consecutive time blocks of a 2D dataset that reads upcoming blocks in a background thread.
+
+    While the caller processes the current block, up to ``prefetch_depth`` following blocks are read into a small
+    pool of reused buffers, so reading and computing overlap. Each iteration yields ``(start, block)``, where
+    ``block`` is ``data[start : start + len(block)]``. The block is a view into a reused buffer that is only valid
+    until the next iteration; copy it to keep it.
+
+    The time spent reading each block (in the background thread) and waiting for it (in the caller) are recorded in
+    ``timings``. If the caller waits for most blocks, reading is the bottleneck and a larger ``block_size`` or
+    ``prefetch_depth`` may help; if the wait times are near zero, computing is the bottleneck.
+
+    Examples
+    --------
+    >>> with BlockPrefetcher(series.data, block_size=30000, prefetch_depth=2) as blocks:
+    ...     for start, block in blocks:
+    ...         filtered[start : start + len(block)] = scipy.signal.sosfilt(sos, block, axis=0)
+    >>> blocks.summary()
+    """
+
+    def __init__(
+        self,
+        data,
+        block_size: int = 30000,
+        prefetch_depth: int = 1,
+        start: int = 0,
+        stop: Union[int, None] = None,
+    ):
+        """
+        Parameters
+        ----------
+        data: numpy.ndarray or h5py.Dataset
+            Data with shape (num_times, num_channels), e.g., ``ExtracellularSeries.data``.
+        block_size: int, default: 30000
+            Number of time points per block.
+        prefetch_depth: int, default: 1
+            Number of blocks read ahead of the block being processed.
+        start, stop: int, optional
+            Range of time points to iterate over. Defaults to all time points.
+        """
+        if block_size < 1:
+            raise ValueError(f"`block_size` must be positive, not {block_size}.")
+        if prefetch_depth < 1:
+            raise ValueError(f"`prefetch_depth` must be positive, not {prefetch_depth}.")
+        self.data = data
+        self.block_size = block_size
+        self.prefetch_depth = prefetch_depth
+        self.start = start
+        self.stop = len(data) if stop is None else min(stop, len(data))
+        # one dict with "start", "stop", "read_time" and "wait_time" (in seconds) per block that was yielded
+        self.timings = []
+
+        # one buffer for the block held by the caller and one for each prefetched block
+        self._free_buffers = queue.Queue()
+        for _ in range(prefetch_depth + 1):
+            self._free_buffers.put(np.empty((block_size,) + tuple(data.shape[1:]), dtype=data.dtype))
+        self._ready_blocks = queue.Queue()
+        self._held_buffer = None
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._read_blocks, daemon=True)
+        self._thread.start()
+
+    def _read_blocks(self):
+        try:
+            for block_start in range(self.start, self.stop, self.block_size):
+                block_stop = min(block_start + self.block_size, self.stop)
+                buffer = self._free_buffers.get()
+                if self._closed.is_set():
+                    return
+                read_start = time.perf_counter()
+                if hasattr(self.data, "read_direct"):
+                    # read HDF5 data directly into the buffer without a temporary array
+                    self.data.read_direct(
+                        buffer, source_sel=np.s_[block_start:block_stop], dest_sel=np.s_[: block_stop - block_start]
+                    )
+                else:
+                    buffer[: block_stop - block_start] = self.data[block_start:block_stop]
+                read_time = time.perf_counter() - read_start
+                self._ready_blocks.put((block_start, block_stop, buffer, read_time))
+            self._ready_blocks.put(None)
+        except BaseException as e:
+            self._ready_blocks.put(e)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._held_buffer is not None:
+            self._free_buffers.put(self._held_buffer)
+            self._held_buffer = None
+        if self._closed.is_set():
+            raise StopIteration
+        wait_start = time.perf_counter()
+        item = self._ready_blocks.get()
+        wait_time = time.perf_counter() - wait_start
+        if item is None:
+            self.close()
+            raise StopIteration
+        if isinstance(item, BaseException):
+            self.close()
+            raise item
+        block_start, block_stop, buffer, read_time = item
+        self._held_buffer = buffer
+        self.timings.append(dict(start=block_start, stop=block_stop, read_time=read_time, wait_time=wait_time))
+        return block_start, buffer[: block_stop - block_start]
+
+    def summary(self) -> dict:
+        """
+        Summarize the timings of the blocks that were yielded.
+
+        Returns
+        -------
+        summary: dict
+            The number of blocks ("num_blocks"), the total time spent reading ("read_time") and waiting for blocks
+            ("wait_time") in seconds, and the fraction of the read time that was hidden behind the caller's
+            processing ("overlap", between 0 and 1).
+        """
+        read_time = sum(timing["read_time"] for timing in self.timings)
+        wait_time = sum(timing["wait_time"] for timing in self.timings)
+        overlap = 1.0 - min(wait_time / read_time, 1.0) if read_time > 0 else 1.0
+        return dict(num_blocks=len(self.timings), read_time=read_time, wait_time=wait_time, overlap=overlap)
+
+    def close(self):
+        """Stop the background thread. Iteration stops at the next call."""
+        self._closed.set()
+        # unblock the background thread if it is waiting for a free buffer
+        self._free_buffers.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# default size of a ChunkCache, in bytes
+DEFAULT_CACHE_BYTES = 256 * 1024**2
+# chunk shape used by CachedDataset for data that is not chunked, e.g., contiguous HDF5 datasets
+DEFAULT_CHUNK_FRAMES = 32768
+
+
+class ChunkCache:
+    """
+    Least-recently-used cache of decoded (decompressed) chunks of datasets, bounded by the number of bytes.
+
+    Chunks are keyed on the dataset and the chunk index, so one cache can be shared by the ``CachedDataset`` of many
+    series. The cache is thread-safe. Unlike the chunk cache of HDF5, which belongs to one open dataset and holds
+    1 MiB by default, this cache is shared by all datasets and file handles that use it, within a single budget.
+
+    ``hits`` and ``misses`` count the chunk lookups that were and were not served from the cache.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Parameters
+        ----------
+        max_bytes: int, default: 256 MiB
+            Maximum total size of the cached chunks. The least recently used chunks are evicted beyond it.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.num_bytes = 0
+        self._chunks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def get(self, key, read_chunk):
+        """
+        Get a chunk from the cache, reading and caching it with ``read_chunk()`` if it is not cached.
+
+        Parameters
+        ----------
+        key: hashable
+            Key of the chunk, e.g., (dataset key, chunk index).
+        read_chunk: callable
+            Function without arguments that returns the chunk as a numpy.ndarray.
+
+        Returns
+        -------
+        chunk: numpy.ndarray
+            The chunk. It is read-only because it is shared between callers.
+        """
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk is not None:
+                self._chunks.move_to_end(key)
+                self.hits += 1
+                return chunk
+            self.misses += 1
+        # read outside of the lock so that other threads can use the cache meanwhile
+        chunk = np.asarray(read_chunk())
+        chunk.flags.writeable = False
+        with self._lock:
+            if key not in self._chunks and chunk.nbytes <= self.max_bytes:
+                self._chunks[key] = chunk
+                self.num_bytes += chunk.nbytes
+                while self.num_bytes > self.max_bytes:
+                    _, evicted = self._chunks.popitem(last=False)
+                    self.num_bytes -= evicted.nbytes
+                    self.evictions += 1
+        return chunk
+
+    def discard(self, key_prefix: tuple):
+        """Remove the chunks whose key starts with ``key_prefix``, e.g., all chunks of a dataset."""
+        with self._lock:
+            for key in [key for key in self._chunks if key[: len(key_prefix)] == key_prefix]:
+                self.num_bytes -= self._chunks.pop(key).nbytes
+
+    def clear(self):
+        """Remove all chunks from the cache. The counters are not reset."""
+        with self._lock:
+            self._chunks.clear()
+            self.num_bytes = 0
+
+    def summary(self) -> dict:
+        """
+        Summarize the use of the cache.
+
+        Returns
+        -------
+        summary: dict
+            The number of "hits", "misses" and "evictions", the "hit_rate" (between 0 and 1), and the number of
+            cached chunks ("num_chunks") and bytes ("num_bytes").
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                hit_rate=self.hits / lookups if lookups else 0.0,
+                num_chunks=len(self._chunks),
+                num_bytes=self.num_bytes,
+            )
+
+
+class CachedDataset:
+    """
+    Read-only view of a 2D dataset that serves reads from whole chunks kept in a ``ChunkCache``.
+
+    Indexing with ``[time, channels]`` reads the chunks that overlap the requested time points and channels, through
+    the cache, and assembles the result. Time must be indexed with an int or a slice with step 1; channels can be
+    indexed with anything numpy supports. Repeated or overlapping windows, e.g., from a trace viewer, are then served
+    from memory.
+    """
+
+    def __init__(self, data, cache: Union[ChunkCache, None] = None, chunk_shape: Union[tuple, None] = None):
+        """
+        Parameters
+        ----------
+        data: h5py.Dataset or numpy.ndarray
+            Data with shape (num_times, num_channels), e.g., ``ExtracellularSeries.data``.
+        cache: ChunkCache, optional
+            The cache to use. If None, a new cache with the default size is created.
+        chunk_shape: tuple of int, optional
+            Shape of the cached chunks. Defaults to the chunk shape of the HDF5 dataset, or to blocks of 32768 time
+            points of all channels if the data is not chunked.
+        """
+        self.data = data
+        self.cache = ChunkCache() if cache is None else cache
+        if chunk_shape is None:
+            chunk_shape = getattr(data, "chunks", None) or (DEFAULT_CHUNK_FRAMES, data.shape[1])
+        self.chunk_shape = tuple(chunk_shape)
+        self.shape = tuple(data.shape)
+        self.dtype = data.dtype
+        if hasattr(data, "file") and hasattr(data, "name"):
+            # HDF5 datasets opened more than once share their cached chunks, until the file is modified
+            self._key = (data.file.filename, _modification_time(data.file.filename), data.name, self.chunk_shape)
+        else:
+            try:
+                # the id of an array can be reused once it is freed, so its chunks are removed then
+                weakref.finalize(data, self.cache.discard, (id(data),))
+                self._key = (id(data), self.chunk_shape)
+            except TypeError:
+                # data that cannot be weakly referenced does not share its chunks with other views
+                self._key = (object(), self.chunk_shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _read_chunk(self, time_index: int, channel_index: int) -> np.ndarray:
+        time_start = time_index * self.chunk_shape[0]
+        channel_start = channel_index * self.chunk_shape[1]
+        return self.data[
+            time_start : min(time_start + self.chunk_shape[0], self.shape[0]),
+            channel_start : min(channel_start + self.chunk_shape[1], self.shape[1]),
+        ]
+
+    def __getitem__(self, key):
+        time_key, channel_key = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(time_key, (int, np.integer)):
+            time_index = int(time_key) + self.shape[0] if time_key < 0 else int(time_key)
+            return self[time_index : time_index + 1, channel_key][0]
+        if not isinstance(time_key, slice) or time_key.step not in (None, 1):
+            raise ValueError("CachedDataset only supports an int or a slice with step 1 for the time axis.")
+        time_start, time_stop, _ = time_key.indices(self.shape[0])
+        time_stop = max(time_stop, time_start)
+
+        # the smallest contiguous range of channels that contains the requested channels
+        channel_range = np.arange(self.shape[1])[channel_key]
+        if channel_range.size == 0 or time_stop == time_start:
+            return np.empty((time_stop - time_start,) + channel_range.shape, dtype=self.dtype)
+        channel_start, channel_stop = int(channel_range.min()), int(channel_range.max()) + 1
+
+        out = np.empty((time_stop - time_start, channel_stop - channel_start), dtype=self.dtype)
+        chunk_frames, chunk_channels = self.chunk_shape
+        for time_index in range(time_start // chunk_frames, -(-time_stop // chunk_frames)):
+            chunk_time_start = time_index * chunk_frames
+            for channel_index in range(channel_start // chunk_channels, -(-channel_stop // chunk_channels)):
+                chunk_channel_start = channel_index * chunk_channels
+                chunk = self.cache.get(
+                    self._key + (time_index, channel_index),
+                    lambda t=time_index, c=channel_index: self._read_chunk(t, c),
+                )
+                # overlap of the chunk with the requested range, in absolute coordinates
+                t0 = max(time_start, chunk_time_start)
+                t1 = min(time_stop, chunk_time_start + len(chunk))
+                c0 = max(channel_start, chunk_channel_start)
+                c1 = min(channel_stop, chunk_channel_start + chunk.shape[1])
+                out[t0 - time_start : t1 - time_start, c0 - channel_start : c1 - channel_start] = chunk[
+                    t0 - chunk_time_start : t1 - chunk_time_start, c0 - chunk_channel_start : c1 - chunk_channel_start
+                ]
+        if isinstance(channel_key, slice) and channel_key.step in (None, 1):
+            return out
+        return out[:, channel_range - channel_start]
+
+
+def _modification_time(path: str) -> Union[int, None]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        # e.g., an in-memory HDF5 file
+        return None
@@ -0,0 +1,137 @@
+"""Extract waveform snippets around many time points of an ExtracellularSeries with few, large reads."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+import os
+from typing import TYPE_CHECKING, Sequence, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from . import ExtracellularSeries
+
+# maximum number of time points of a single merged read when the data is not chunked
+DEFAULT_MAX_READ_FRAMES = 65536
+
+
+def extract_snippets(
+    series: ExtracellularSeries,
+    frames: Sequence[int],
+    num_frames_before: int,
+    num_frames_after: int,
+    channels: Union[Sequence[int], None] = None,
+    convert: bool = True,
+    dtype: Union[str, np.dtype, None] = None,
+    out: Union[np.ndarray, str, os.PathLike, None] = None,
+    max_gap: Union[int, None] = None,
+    max_read_frames: Union[int, None] = None,
+) -> np.ndarray:
+    """
+    Extract snippets of ``num_frames_before + num_frames_after`` time points around each of many frames.
+
+    Instead of reading the data once per snippet, the windows are sorted and windows that overlap or are at most
+    ``max_gap`` time points apart are merged into a single read. For chunked (HDF5) data, reads are aligned to the
+    chunk boundaries along time and nearby windows are merged by default if they fall into the same or adjacent
+    chunks, so every chunk is read and decompressed at most once. The snippets are gathered from each read into a
+    preallocated output array and converted to microvolts in place.
+
+    Parameters
+    ----------
+    series: ExtracellularSeries
+        The series to read from.
+    frames: sequence of int
+        Time indices of the snippets, e.g., spike times multiplied by the sampling rate. The order is arbitrary
+        and frames may repeat.
+    num_frames_before, num_frames_after: int
+        Number of time points before and from each frame, so snippet i is ``data[frames[i] - num_frames_before :
+        frames[i] + num_frames_after]``. All windows must be inside the data.
+    channels: sequence of int, optional
+        Indices of the channels of the series (columns of ``data``) to extract. If None, all channels are extracted.
+        If empty, an array with no channels is returned without reading the data.
+    convert: bool, default: True
+        Whether to convert the data to microvolts (see ``ExtracellularSeries.get_conversion_factors``).
+    dtype: str or numpy.dtype, optional
+        The dtype of the output. Defaults to float32 if ``convert`` is True and the dtype of the data otherwise.
+    out: numpy.ndarray, str or os.PathLike, optional
+        Preallocated output array with shape (num_frames, num_frames_before + num_frames_after, num_channels),
+        e.g., a ``numpy.memmap``, or the path of a .npy file to create as a memory-mapped output.
+    max_gap: int, optional
+        Maximum number of time points between two windows that are merged into a single read. Defaults to the
+        chunk length along time for chunked data and to 0 otherwise.
+    max_read_frames: int, optional
+        Maximum number of time points of a merged read, which bounds the temporary memory. Defaults to the larger of
+        65536 and the chunk length along time. Single windows longer than this are still read at once.
+
+    Returns
+    -------
+    snippets: numpy.ndarray
+        Array with shape (num_frames, num_frames_before + num_frames_after, num_channels), in the order of
+        ``frames``.
+    """
+    data = series.data if hasattr(series.data, "shape") else np.asarray(series.data)
+    num_times, num_series_channels = data.shape
+    frames = np.asarray(frames, dtype=np.int64).reshape(-1)
+    window = num_frames_before + num_frames_after
+    if window <= 0:
+        raise ValueError("`num_frames_before + num_frames_after` must be positive.")
+    starts = frames - num_frames_before
+    if len(frames) and (starts.min() < 0 or starts.max() + window > num_times):
+        raise ValueError(
+            f"{series.__class__.__name__} '{series.name}': The windows around some frames extend beyond the data "
+            f"(0 to {num_times} time points)."
+        )
+
+    channels = np.arange(num_series_channels) if channels is None else np.asarray(channels, dtype=np.int64)
+    if dtype is None:
+        dtype = np.float32 if convert else data.dtype
+    if convert and np.dtype(dtype).kind != "f":
+        raise ValueError(f"`dtype` must be a floating point type to convert the data to microvolts, not '{dtype}'.")
+    shape = (len(frames), window, len(channels))
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif not isinstance(out, np.ndarray):
+        out = np.lib.format.open_memmap(os.fspath(out), mode="w+", dtype=dtype, shape=shape)
+    elif out.shape != shape:
+        raise ValueError(f"`out` must have shape {shape}, not {out.shape}.")
+
+    if len(frames) and len(channels):
+        chunk_frames = data.chunks[0] if getattr(data, "chunks", None) else 1
+        if max_gap is None:
+            max_gap = chunk_frames if chunk_frames > 1 else 0
+        if max_read_frames is None:
+            max_read_frames = max(DEFAULT_MAX_READ_FRAMES, chunk_frames)
+        # read the smallest contiguous range of channels and select the requested channels in memory
+        channel_slice = slice(int(channels.min()), int(channels.max()) + 1)
+        local_channels = channels - channel_slice.start
+
+        order = np.argsort(starts, kind="stable")
+        sorted_starts = starts[order]
+        for first, last, read_start, read_stop in _merge_windows(
+            sorted_starts, window, max_gap, max_read_frames, chunk_frames, num_times
+        ):
+            block = np.asarray(data[read_start:read_stop, channel_slice])[:, local_channels]
+            offsets = sorted_starts[first:last] - read_start
+            out[order[first:last]] = block[offsets[:, np.newaxis] + np.arange(window)]
+
+    if convert:
+        out *= series.get_conversion_factors()[channels].astype(out.dtype)
+        out += np.asarray(series.offset, dtype=out.dtype)
+    return out
+
+
+def _merge_windows(
+    sorted_starts: np.ndarray, window: int, max_gap: int, max_read_frames: int, chunk_frames: int, num_times: int
+):
+    """Yield (first, last, read_start, read_stop) of merged reads, where windows first to last - 1 are in the read."""
+    # a new read starts where the gap to the previous window is too large
+    gaps = sorted_starts[1:] - (sorted_starts[:-1] + window)
+    breaks = np.flatnonzero(gaps > max_gap) + 1
+    for first, last in zip(np.concatenate([[0], breaks]), np.concatenate([breaks, [len(sorted_starts)]])):
+        # split reads that are too long
+        while first < last:
+            limit = sorted_starts[first] + max(max_read_frames, window) - window
+            stop = first + max(int(np.searchsorted(sorted_starts[first:last], limit, side="right")), 1)
+            read_start = sorted_starts[first] // chunk_frames * chunk_frames
+            read_stop = min(-(-(sorted_starts[stop - 1] + window) // chunk_frames) * chunk_frames, num_times)
+            yield first, stop, int(read_start), int(read_stop)
+            first = stop
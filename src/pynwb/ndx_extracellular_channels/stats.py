@@ -0,0 +1,155 @@
+"""Per-channel summary statistics of an ExtracellularSeries computed in a single streaming pass."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from typing import TYPE_CHECKING, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from . import ExtracellularSeries
+
+# scale factor from the median absolute deviation to the standard deviation of normally distributed noise
+MAD_TO_STD = 1.4826
+
+STATS_COLUMNS = (
+    "mean_in_uv",
+    "rms_in_uv",
+    "std_in_uv",
+    "mad_noise_in_uv",
+    "min_in_uv",
+    "max_in_uv",
+    "num_saturated",
+)
+
+
+def compute_channel_stats(
+    series: ExtracellularSeries,
+    block_size: int = 30000,
+    max_workers: Union[int, None] = None,
+    saturation_range: Union[tuple, None] = None,
+    column_prefix: Union[str, None] = None,
+) -> pd.DataFrame:
+    """
+    Compute summary statistics of every channel of an ExtracellularSeries without loading all of its data.
+
+    The data is read in blocks of ``block_size`` time points by a pool of threads, so reading and decompressing a
+    block overlaps with the computations on other blocks. The partial results of the blocks are merged in order
+    with numerically stable pairwise updates of the mean and variance (Chan et al.), so the result does not depend
+    on the number of threads.
+
+    The MAD noise is the median over blocks of the median absolute deviation of each block, scaled by 1.4826 to
+    estimate the standard deviation of the noise. It is robust to spikes and slow drifts, but is not the exact
+    median absolute deviation of the whole recording.
+
+    Parameters
+    ----------
+    series: ExtracellularSeries
+        The series to summarize.
+    block_size: int, default: 30000
+        Number of time points read at once.
+    max_workers: int, optional
+        Number of threads. If None, the default of ``concurrent.futures.ThreadPoolExecutor`` is used.
+    saturation_range: tuple of (float, float), optional
+        Raw (unconverted) values at or beyond which a sample is counted as saturated. If None, the limits of the
+        dtype are used for integer data and no samples are counted for floating point data.
+    column_prefix: str, optional
+        If given, add the statistics as columns named ``column_prefix + stat`` (e.g., "ap_rms_in_uv") to the
+        ChannelsTable of the series. Rows of the table that are not channels of the series are set to NaN
+        (-1 for "num_saturated").
+
+    Returns
+    -------
+    stats: pandas.DataFrame
+        Table with the columns "mean_in_uv", "rms_in_uv", "std_in_uv", "mad_noise_in_uv", "min_in_uv",
+        "max_in_uv" and "num_saturated", in microvolts, with one row per channel of the series, indexed by the row
+        of the channel in the ChannelsTable.
+    """
+    import pandas as pd
+
+    data = series.data if hasattr(series.data, "shape") else np.asarray(series.data)
+    num_times, num_channels = data.shape
+    if num_times == 0:
+        raise ValueError(f"{series.__class__.__name__} '{series.name}': Cannot compute statistics of empty data.")
+    if block_size < 1:
+        raise ValueError(f"`block_size` must be positive, not {block_size}.")
+    if saturation_range is None and np.issubdtype(data.dtype, np.integer):
+        saturation_range = (np.iinfo(data.dtype).min, np.iinfo(data.dtype).max)
+    gains = series.get_conversion_factors()
+    offset = series.offset
+
+    def _block_stats(start):
+        raw = np.asarray(data[start : start + block_size])
+        block = raw * gains + offset
+        mean = block.mean(axis=0)
+        median = np.median(block, axis=0)
+        if saturation_range is None:
+            num_saturated = np.zeros(num_channels, dtype=np.int64)
+        else:
+            num_saturated = np.count_nonzero((raw <= saturation_range[0]) | (raw >= saturation_range[1]), axis=0)
+        return dict(
+            count=len(block),
+            mean=mean,
+            m2=((block - mean) ** 2).sum(axis=0),
+            min=block.min(axis=0),
+            max=block.max(axis=0),
+            num_saturated=num_saturated,
+            mads=[np.median(np.abs(block - median), axis=0)],
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # map returns the results in order, so the reduction is deterministic
+        total = reduce(_merge_stats, executor.map(_block_stats, range(0, num_times, block_size)))
+
+    variance = total["m2"] / total["count"]
+    stats = pd.DataFrame(
+        {
+            "mean_in_uv": total["mean"],
+            "rms_in_uv": np.sqrt(variance + total["mean"] ** 2),
+            "std_in_uv": np.sqrt(variance),
+            "mad_noise_in_uv": MAD_TO_STD * np.median(total["mads"], axis=0),
+            "min_in_uv": total["min"],
+            "max_in_uv": total["max"],
+            "num_saturated": total["num_saturated"],
+        },
+        index=pd.Index(np.asarray(series.channels.data[:]), name="channel"),
+    )
+    if column_prefix is not None:
+        _add_stats_columns(series, stats, column_prefix)
+    return stats
+
+
+def _merge_stats(a: dict, b: dict) -> dict:
+    count = a["count"] + b["count"]
+    delta = b["mean"] - a["mean"]
+    return dict(
+        count=count,
+        mean=a["mean"] + delta * (b["count"] / count),
+        m2=a["m2"] + b["m2"] + delta**2 * (a["count"] * b["count"] / count),
+        min=np.minimum(a["min"], b["min"]),
+        max=np.maximum(a["max"], b["max"]),
+        num_saturated=a["num_saturated"] + b["num_saturated"],
+        mads=a["mads"] + b["mads"],
+    )
+
+
+def _add_stats_columns(series: ExtracellularSeries, stats: pd.DataFrame, column_prefix: str):
+    channels_table = series.channels.table
+    existing = [column_prefix + name for name in STATS_COLUMNS if column_prefix + name in channels_table.colnames]
+    if existing:
+        raise ValueError(
+            f"{channels_table.__class__.__name__} '{channels_table.name}': Columns {existing} already exist."
+        )
+    for name in STATS_COLUMNS:
+        fill_value = -1 if name == "num_saturated" else np.nan
+        values = np.full(len(channels_table), fill_value, dtype=stats[name].dtype)
+        values[stats.index.to_numpy()] = stats[name].to_numpy()
+        channels_table.add_column(
+            name=column_prefix + name,
+            description=f"'{name}' of the channel in ExtracellularSeries '{series.name}'.",
+            data=values.tolist(),
+        )
@@ -0,0 +1,188 @@
+"""Build several data streams recorded from the same contacts, e.g., AP and LF bands, and write them in one pass."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+from typing import TYPE_CHECKING, Sequence, Union
+
+import numpy as np
+from hdmf.backends.hdf5 import H5DataIO
+from hdmf.common import DynamicTableRegion, VectorData
+
+if TYPE_CHECKING:
+    from pynwb import NWBFile
+
+    from . import Probe
+
+
+class MultiStreamBuilder:
+    """
+    Build the ChannelsTable and ExtracellularSeries of several streams that share one Probe and one set of contacts.
+
+    The contacts are resolved once and the ChannelsTable of every stream is built column-wise. The data of all
+    streams is then written in a single pass over a source array that holds the channels of all streams, e.g., an
+    interleaved acquisition buffer, so every block of the source is read once.
+
+    Examples
+    --------
+    >>> builder = MultiStreamBuilder(
+    ...     probe,
+    ...     contacts=contact_ids,
+    ...     streams={
+    ...         "AP": dict(source_channels=np.arange(0, 768, 2), filter="High-pass filter at 300 Hz."),
+    ...         "LF": dict(source_channels=np.arange(1, 768, 2), filter="Low-pass filter at 1000 Hz."),
+    ...     },
+    ... )
+    >>> builder.add_to_nwbfile(nwbfile, source, rate=30000.0)
+    >>> with NWBHDF5IO("session.nwb", "w") as io:
+    ...     io.write(nwbfile)
+    ...     builder.write_data(source)
+    """
+
+    def __init__(self, probe: Probe, contacts: Sequence[Union[int, str]], streams: dict):
+        """
+        Parameters
+        ----------
+        probe: Probe
+            The probe of all streams.
+        contacts: sequence of int or str
+            The contacts of the channels, as rows of the ContactsTable of the probe model or as values of its
+            "contact_id" column. Every stream has one channel per contact, in this order.
+        streams: dict
+            Map from stream name, e.g., "AP", to a dict with the key "source_channels", the columns of the source
+            that hold the channels of the stream (one per contact), and optionally "filter", the filter description
+            of the stream, and "description", the description of its ChannelsTable.
+        """
+        from . import ChannelsTable
+
+        contacts_table = probe.probe_model.contacts_table
+        if len(contacts) and all(isinstance(contact, str) for contact in contacts):
+            contact_rows = contacts_table.rows_for_contact_ids(contacts)
+        else:
+            contact_rows = np.asarray(contacts, dtype=np.int64)
+
+        self.probe = probe
+        self.streams = {}
+        self.channels_tables = {}
+        self.series = {}
+        for name, stream in streams.items():
+            source_channels = np.asarray(stream["source_channels"], dtype=np.int64)
+            if len(source_channels) != len(contact_rows):
+                raise ValueError(
+                    f"Stream '{name}' has {len(source_channels)} source channels but there are {len(contact_rows)} "
+                    "contacts."
+                )
+            columns = [
+                DynamicTableRegion(
+                    name="contact",
+                    description="The row in a ContactsTable that represents the contact used as a channel.",
+                    data=contact_rows.tolist(),
+                    table=contacts_table,
+                )
+            ]
+            if stream.get("filter") is not None:
+                columns.append(
+                    VectorData(
+                        name="filter",
+                        description="The filter used on the raw (wideband) voltage data from this contact.",
+                        data=[stream["filter"]] * len(contact_rows),
+                    )
+                )
+            self.channels_tables[name] = ChannelsTable(
+                name=f"{name}_channels",
+                description=stream.get("description", f"Channels of the {name} stream."),
+                probe=probe,
+                id=list(range(len(contact_rows))),
+                columns=columns,
+            )
+            self.streams[name] = source_channels
+
+    def add_to_nwbfile(
+        self,
+        nwbfile: NWBFile,
+        source: np.ndarray,
+        rate: float,
+        starting_time: float = 0.0,
+        conversion: float = 1.0,
+        chunks: Union[tuple, None] = None,
+        compression: Union[str, None] = None,
+    ) -> dict:
+        """
+        Add the ChannelsTable and an ExtracellularSeries of every stream to the acquisition of an NWBFile.
+
+        The data of the series is not copied: each series gets an empty dataset of the shape and dtype of its stream
+        that is filled by ``write_data`` after the file is written.
+
+        Parameters
+        ----------
+        nwbfile: NWBFile
+            The file to add the streams to.
+        source: numpy.ndarray or h5py.Dataset
+            The source data with shape (num_times, num_source_channels). Only its shape and dtype are used here.
+        rate: float
+            Sampling rate of the source, in Hz.
+        starting_time: float, default: 0.0
+            Time of the first sample, in seconds.
+        conversion: float, default: 1.0
+            Factor that converts the source values to microvolts.
+        chunks, compression: optional
+            Chunk shape and compression of the datasets, see ``hdmf.backends.hdf5.H5DataIO``.
+
+        Returns
+        -------
+        series: dict
+            Map from stream name to its ExtracellularSeries.
+        """
+        from . import ExtracellularSeries
+
+        num_times = source.shape[0]
+        for name, source_channels in self.streams.items():
+            channels_table = self.channels_tables[name]
+            nwbfile.add_acquisition(channels_table)
+            self.series[name] = ExtracellularSeries(
+                name=name,
+                data=H5DataIO(
+                    shape=(num_times, len(source_channels)),
+                    dtype=source.dtype,
+                    chunks=chunks,
+                    compression=compression,
+                ),
+                rate=rate,
+                starting_time=starting_time,
+                conversion=conversion,
+                channels=DynamicTableRegion(
+                    name="channels",
+                    description=f"The channels of the {name} stream.",
+                    data=list(range(len(channels_table))),
+                    table=channels_table,
+                ),
+            )
+            nwbfile.add_acquisition(self.series[name])
+        return dict(self.series)
+
+    def write_data(self, source: np.ndarray, block_size: int = 30000):
+        """
+        Fill the datasets of all streams in a single pass over the source.
+
+        Call this after the NWBFile was written with ``io.write`` and before the IO object is closed. Each block of
+        ``block_size`` time points of the source is read once and its columns are written to every stream.
+
+        Parameters
+        ----------
+        source: numpy.ndarray or h5py.Dataset
+            The source data with shape (num_times, num_source_channels), e.g., a ``numpy.memmap`` of an interleaved
+            binary file.
+        block_size: int, default: 30000
+            Number of time points read at once.
+        """
+        datasets = {}
+        for name, series in self.series.items():
+            if series.data.dataset is None:
+                raise ValueError(
+                    f"{series.__class__.__name__} '{series.name}': The file must be written with `io.write` before "
+                    "`write_data` is called."
+                )
+            datasets[name] = series.data.dataset
+        for start in range(0, source.shape[0], block_size):
+            block = np.asarray(source[start : start + block_size])
+            for name, source_channels in self.streams.items():
+                datasets[name][start : start + len(block)] = block[:, source_channels]
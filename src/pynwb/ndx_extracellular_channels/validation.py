@@ -0,0 +1,238 @@
+"""Batch validation of NWB files against the ndx-extracellular-channels namespace and the invariants of its types."""
+
+from __future__ import annotations  # postpone type hint evaluation
+
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Union
+
+import h5py
+import numpy as np
+
+from .catalog import NAMESPACE, _decode
+
+
+def validate_nwb_file(path: str) -> dict:
+    """
+    Validate an NWB file against the ndx-extracellular-channels namespace and check the invariants of its types.
+
+    The file is validated against the namespace loaded by this package (which includes the NWB core namespace), not
+    against the namespaces cached in the file. In addition, the following invariants, which are enforced by the
+    constructors of the classes but not by the schema, are checked by reading only the shapes of the datasets and
+    the "contact" and "reference_contact" columns:
+
+    - "channels": the second dimension of the data of each ExtracellularSeries matches the length of its
+      ``channels`` region. If the first dimension does, the data is reported as transposed.
+    - "channel_conversion": the second dimension of the data matches the length of ``channel_conversion``.
+    - "unit": the "unit" attribute of the data of each ExtracellularSeries is the unit fixed by the schema
+      (microvolts), which the schema validation does not check, and its "conversion" is a finite, nonzero number.
+      For example, a dataset linked from an ElectricalSeries keeps the unit in volts.
+    - "contact" and "reference_contact": the columns of each ChannelsTable reference the ContactsTable of the
+      ProbeModel of its Probe and all values are rows of that table.
+
+    Parameters
+    ----------
+    path: str
+        Path to the NWB file.
+
+    Returns
+    -------
+    report: dict
+        A report with the keys:
+
+        - "file_path": the path of the NWB file
+        - "valid": True if no errors were found
+        - "errors": list of dicts with the keys "check" (e.g., "schema", "channels" or "read"), "object_path"
+          (the path of the invalid object within the file, or None) and "message"
+    """
+    from pynwb import NWBHDF5IO
+
+    errors = []
+    try:
+        # the namespaces cached in the file are not loaded, so each file is validated against the same namespace
+        with NWBHDF5IO(str(path), "r", load_namespaces=False) as io:
+            for error in _get_validator().validate(io.read_builder()):
+                errors.append(_make_error("schema", error.location, str(error)))
+        with h5py.File(path, "r") as f:
+            _check_group(f, errors)
+    except Exception as e:
+        errors.append(_make_error("read", None, f"{e.__class__.__name__}: {e}"))
+    return {"file_path": str(path), "valid": not errors, "errors": errors}
+
+
+def validate_nwb_files(
+    paths: Iterable[str], max_workers: Union[int, None] = None, stop_on_error: bool = False
+) -> List[dict]:
+    """
+    Validate many NWB files in parallel using a process pool. See ``validate_nwb_file``.
+
+    The namespace is loaded once per worker process.
+
+    Parameters
+    ----------
+    paths: iterable of str
+        Paths to the NWB files.
+    max_workers: int, optional
+        Number of worker processes. If None, the number of processors on the machine is used.
+        If 1, the files are validated in the current process.
+    stop_on_error: bool, default: False
+        If True, stop at the first invalid file, in the order of ``paths``. The files after it that were not yet
+        validated are skipped.
+
+    Returns
+    -------
+    reports: list of dict
+        The reports of the validated files, in the order of ``paths``. If ``stop_on_error`` is True, the last report
+        is the first invalid file, if any.
+    """
+    paths = [str(path) for path in paths]
+    reports = []
+    if max_workers == 1:
+        for path in paths:
+            reports.append(validate_nwb_file(path))
+            if stop_on_error and not reports[-1]["valid"]:
+                break
+        return reports
+
+    # validating a file is slower than scanning it, so send smaller batches to the workers than `scan_nwb_files`
+    # to keep them busy and to skip more files when stopping early
+    chunksize = max(1, len(paths) // (16 * (max_workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_get_validator) as executor:
+        futures = [
+            executor.submit(_validate_nwb_files_batch, paths[start : start + chunksize])
+            for start in range(0, len(paths), chunksize)
+        ]
+        for future in futures:
+            for report in future.result():
+                reports.append(report)
+                if stop_on_error and not report["valid"]:
+                    # batches that were not started are cancelled, the running ones are waited for
+                    for pending in futures:
+                        pending.cancel()
+                    return reports
+    return reports
+
+
+def _validate_nwb_files_batch(paths: List[str]) -> List[dict]:
+    return [validate_nwb_file(path) for path in paths]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_validator():
+    """Get the validator of the namespace. It is created once per process."""
+    from hdmf.validate import ValidatorMap
+    from pynwb import get_type_map
+
+    return ValidatorMap(get_type_map().namespace_catalog.get_namespace(NAMESPACE))
+
+
+def _make_error(check: str, object_path: Union[str, None], message: str) -> dict:
+    return {"check": check, "object_path": object_path, "message": message}
+
+
+def _check_group(group: h5py.Group, errors: List[dict]):
+    for name in group:
+        # objects are checked where they are defined, not where they are linked
+        if not isinstance(group.get(name, getlink=True), h5py.HardLink):
+            continue
+        child = group[name]
+        if not isinstance(child, h5py.Group):
+            continue
+        if _decode(child.attrs.get("namespace")) == NAMESPACE:
+            neurodata_type = _decode(child.attrs.get("neurodata_type"))
+            if neurodata_type == "ExtracellularSeries":
+                _check_extracellular_series(child, errors)
+            elif neurodata_type == "ChannelsTable":
+                _check_channels_table(child, errors)
+        _check_group(child, errors)
+
+
+def _check_extracellular_series(group: h5py.Group, errors: List[dict]):
+    if "data" not in group or "channels" not in group:
+        return  # reported by the schema validation
+    _check_unit(group, errors)
+    data_shape = group["data"].shape
+    if len(data_shape) < 2:
+        return
+    channels_length = len(group["channels"])
+    if data_shape[1] != channels_length:
+        message = (
+            f"The length of the second dimension of `data` ({data_shape[1]}) does not match the length of "
+            f"`channels` ({channels_length})."
+        )
+        if data_shape[0] == channels_length:
+            message += " `data` is oriented incorrectly and should be transposed."
+        errors.append(_make_error("channels", group.name, message))
+    if "channel_conversion" in group and data_shape[1] != len(group["channel_conversion"]):
+        errors.append(
+            _make_error(
+                "channel_conversion",
+                group.name,
+                f"The length of the second dimension of `data` ({data_shape[1]}) does not match the length of "
+                f"`channel_conversion` ({len(group['channel_conversion'])}).",
+            )
+        )
+
+
+def _check_unit(group: h5py.Group, errors: List[dict]):
+    attrs = group["data"].attrs
+    object_path = f"{group.name}/data"
+    unit = _decode(attrs.get("unit"))
+    conversion = float(attrs.get("conversion", 1.0))
+    fixed_unit = _get_fixed_unit()
+    if unit is not None and unit != fixed_unit:
+        errors.append(
+            _make_error(
+                "unit",
+                object_path,
+                f"The unit of `data` is '{unit}' (conversion {conversion}) instead of '{fixed_unit}', the unit of an "
+                "ExtracellularSeries.",
+            )
+        )
+    if not np.isfinite(conversion) or conversion == 0:
+        errors.append(
+            _make_error("unit", object_path, f"The conversion of `data` ({conversion}) is not finite and nonzero.")
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _get_fixed_unit() -> str:
+    """Get the unit of the data of an ExtracellularSeries, which is fixed by the schema."""
+    from pynwb import get_type_map
+
+    spec = get_type_map().namespace_catalog.get_spec(NAMESPACE, "ExtracellularSeries")
+    return spec.get_dataset("data").get_attribute("unit").value
+
+
+def _check_channels_table(group: h5py.Group, errors: List[dict]):
+    try:
+        contacts_table = group["probe"]["probe_model"]["contacts_table"]
+    except KeyError:
+        return  # reported by the schema validation
+    num_contacts = len(contacts_table["id"])
+    for colname in ("contact", "reference_contact"):
+        if colname not in group:
+            continue
+        column = group[colname]
+        target = column.attrs.get("table")
+        if isinstance(target, h5py.Reference) and group.file[target] != contacts_table:
+            errors.append(
+                _make_error(
+                    colname,
+                    column.name,
+                    f"`{colname}` references '{group.file[target].name}' instead of the ContactsTable of the probe "
+                    f"('{contacts_table.name}').",
+                )
+            )
+        values = np.asarray(column[()])
+        invalid = (values < 0) | (values >= num_contacts)
+        if invalid.any():
+            errors.append(
+                _make_error(
+                    colname,
+                    column.name,
+                    f"{int(invalid.sum())} values of `{colname}` are not rows of the ContactsTable of the probe "
+                    f"({num_contacts} rows), e.g., {int(values[invalid][0])} at row {int(np.flatnonzero(invalid)[0])}.",
+                )
+            )
@@ -0,0 +1,127 @@
+"""Factories of test objects and a test case with a temporary directory, shared by the test modules."""
+
+import datetime
+import pathlib
+import tempfile
+
+import probeinterface
+from hdmf.common import DynamicTableRegion
+from ndx_extracellular_channels import (
+    ChannelsTable,
+    ContactsTable,
+    ExtracellularSeries,
+    Probe,
+    ProbeModel,
+)
+from pynwb.testing import TestCase
+
+from pynwb import NWBFile
+
+
+class TempDirTestCase(TestCase):
+    """TestCase with a temporary directory, ``self.tmp_path``, that is removed after each test."""
+
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.tmp_path = pathlib.Path(temp_dir.name)
+
+
+def create_test_nwbfile(identifier="Test"):
+    return NWBFile(
+        session_description="Test",
+        identifier=identifier,
+        session_start_time=datetime.datetime.now(datetime.timezone.utc),
+    )
+
+
+def create_test_probeinterface_probe():
+    """Create a probeinterface Probe with two shanks of two columns of four contacts."""
+    probe = probeinterface.generate_multi_shank(num_shank=2, num_columns=2, num_contact_per_column=4)
+    probe.name = "probe"
+    probe.serial_number = "0123"
+    probe.manufacturer = "Test"
+    probe.model_name = "Two Shank"
+    probe.set_contact_ids([f"c{i}" for i in range(probe.get_contact_count())])
+    return probe
+
+
+def create_test_probe_model(
+    num_contacts=3,
+    positions=None,
+    model="Neuropixels 1.0",
+    name=None,
+    enum_columns=None,
+    **columns,
+):
+    """Create a ProbeModel with contacts 20 um apart along the y axis, unless ``positions`` are given.
+
+    The other keyword arguments are the values of other columns of the ContactsTable, one per contact.
+    """
+    if positions is None:
+        positions = [[0.0, 20.0 * i] for i in range(num_contacts)]
+    ct = ContactsTable(
+        description="Test contacts table",
+        enum_columns=enum_columns,
+    )
+    for i, position in enumerate(positions):
+        ct.add_row(relative_position_in_um=position, **{column: values[i] for column, values in columns.items()})
+
+    return ProbeModel(
+        name=name or model,
+        model=model,
+        description="A neuropixels probe",
+        manufacturer="IMEC",
+        planar_contour_in_um=[[-10.0, -10.0], [10.0, -10.0], [10.0, 10.0], [-10.0, 10.0]],
+        contacts_table=ct,
+    )
+
+
+def create_test_probe(name="Neuropixels Probe 1", identifier="28948291", probe_insertion=None, **kwargs):
+    """Create a Probe. The keyword arguments are passed to ``create_test_probe_model``."""
+    return Probe(
+        name=name,
+        identifier=identifier,
+        probe_model=create_test_probe_model(**kwargs),  # TODO rename as model?
+        probe_insertion=probe_insertion,
+    )
+
+
+def create_test_channels_table(probe, contacts, name="ChannelsTable", **columns):
+    """Create a ChannelsTable with one channel per contact.
+
+    The other keyword arguments are the values of other columns of the ChannelsTable, one per channel.
+    """
+    ct = ChannelsTable(
+        name=name,
+        description="Test channels table",
+        probe=probe,
+    )
+    for i, contact in enumerate(contacts):
+        ct.add_row(contact=contact, **{column: values[i] for column, values in columns.items()})
+    return ct
+
+
+def create_test_series(data, channel_rows=None, num_channels=None, **kwargs):
+    """Create an ExtracellularSeries with a channel on each contact of a new probe.
+
+    The probe has ``num_channels`` contacts, by default one per column of ``data``, and ``channel_rows`` selects
+    the channels of the series. The other keyword arguments are passed to ExtracellularSeries.
+    """
+    if num_channels is None:
+        num_channels = data.shape[1]
+    if channel_rows is None:
+        channel_rows = list(range(data.shape[1]))
+    probe = create_test_probe(num_contacts=num_channels)
+    channels_table = create_test_channels_table(probe, range(num_channels))
+    channels = DynamicTableRegion(
+        name="channels", data=channel_rows, description="the channels of the series", table=channels_table
+    )
+    return ExtracellularSeries(
+        name="ExtracellularSeries",
+        data=data,
+        rate=30000.0,
+        channels=channels,
+        **kwargs,
+    )
@@ -0,0 +1,112 @@
+"""Tests for looking up brain areas in an annotation volume."""
+
+import numpy as np
+import numpy.testing as npt
+from ndx_extracellular_channels import ProbeInsertion, lookup_brain_areas
+from ndx_extracellular_channels.atlas import load_annotation_volume
+
+from .helpers import TempDirTestCase, create_test_channels_table, create_test_probe
+
+
+def _make_annotation():
+    # 10 x 20 x 30 voxels of 0.1 mm with value AP index + 100 * DV index
+    ap, _, dv = np.meshgrid(np.arange(10), np.arange(20), np.arange(30), indexing="ij")
+    return (ap + 100 * dv).astype(np.int32)
+
+
+def _brute_force_lookup(positions, annotation, voxel_size, origin):
+    areas = []
+    for position in positions:
+        index = tuple(int(i) for i in np.rint((np.asarray(position) - origin) / voxel_size))
+        if all(0 <= i < n for i, n in zip(index, annotation.shape)):
+            areas.append(str(annotation[index]))
+        else:
+            areas.append("outside atlas")
+    return areas
+
+
+class TestLookupBrainAreas(TempDirTestCase):
+    """Test looking up brain areas in annotation volumes in memory and in .npy and .nrrd files."""
+
+    def test_lookup_brain_areas(self):
+        annotation = _make_annotation()
+        rng = np.random.default_rng(0)
+        positions = rng.uniform([-0.5, -1.0, -3.5], [1.5, 1.0, 0.5], size=(200, 3))
+        voxel_size = np.array([0.1, 0.1, -0.1])
+        origin = np.array([0.0, -1.0, 0.0])
+
+        areas = lookup_brain_areas(positions, annotation, voxel_size, origin)
+        assert "outside atlas" in areas
+        npt.assert_array_equal(areas, _brute_force_lookup(positions, annotation, voxel_size, origin))
+
+        # Fortran-ordered volumes are gathered in memory order too
+        areas_f = lookup_brain_areas(positions, np.asfortranarray(annotation), voxel_size, origin)
+        npt.assert_array_equal(areas_f, areas)
+
+        labels = {value: f"area {value}" for value in np.unique(annotation).tolist()}
+        areas = lookup_brain_areas(positions[:3], annotation, voxel_size, origin, labels=labels, outside_label="")
+        expected = _brute_force_lookup(positions[:3], annotation, voxel_size, origin)
+        npt.assert_array_equal(areas, ["" if a == "outside atlas" else f"area {a}" for a in expected])
+
+    def test_lookup_brain_areas_npy(self):
+        annotation = _make_annotation()
+        path = self.tmp_path / "annotation.npy"
+        np.save(path, annotation)
+        assert isinstance(load_annotation_volume(path), np.memmap)
+
+        positions = [[0.2, 0.0, -0.5], [0.9, 1.0, -2.9], [5.0, 0.0, 0.0]]
+        # with a positive DV voxel size, the positions below the origin are outside the volume
+        areas = lookup_brain_areas(positions, str(path), 0.1, origin_in_mm=[0.0, 0.0, 0.0])
+        npt.assert_array_equal(areas, ["outside atlas"] * 3)
+        areas = lookup_brain_areas(positions, path, [0.1, 0.1, -0.1])
+        npt.assert_array_equal(areas, ["502", "2909", "outside atlas"])
+
+        # a volume stored as (AP, DV, ML), like the Allen CCF, is passed as a transposed memory-mapped view
+        path = self.tmp_path / "annotation_ap_dv_ml.npy"
+        np.save(path, annotation.transpose(0, 2, 1))
+        volume = load_annotation_volume(path).transpose(0, 2, 1)
+        assert not volume.flags.c_contiguous and not volume.flags.f_contiguous
+        areas = lookup_brain_areas(positions, volume, [0.1, 0.1, -0.1])
+        npt.assert_array_equal(areas, ["502", "2909", "outside atlas"])
+
+    def test_lookup_brain_areas_nrrd(self):
+        try:
+            import nrrd
+        except ImportError:
+            self.skipTest("pynrrd is not installed")
+        annotation = _make_annotation()
+        path = self.tmp_path / "annotation.nrrd"
+        nrrd.write(str(path), annotation, header={"encoding": "raw"})
+        volume = load_annotation_volume(path)
+        assert isinstance(volume, np.memmap)
+        npt.assert_array_equal(volume, annotation)
+
+        positions = [[0.2, 0.0, -0.5], [0.9, 1.0, -2.9]]
+        npt.assert_array_equal(lookup_brain_areas(positions, path, [0.1, 0.1, -0.1]), ["502", "2909"])
+
+    def test_channels_table_add_estimated_brain_areas(self):
+        probe = create_test_probe(
+            positions=[[0.0, 100.0 * i] for i in range(4)],
+            probe_insertion=ProbeInsertion(
+                insertion_position_ap_in_mm=0.0,
+                insertion_position_ml_in_mm=0.0,
+                insertion_position_dv_in_mm=0.0,
+                depth_in_mm=1.0,
+            ),
+        )
+        channels_table = create_test_channels_table(probe, range(4))
+
+        with self.assertRaisesRegex(ValueError, "are required to look up the brain areas"):
+            channels_table.add_estimated_brain_areas(annotation=_make_annotation(), voxel_size_in_mm=0.1)
+
+        # the channels are at DV = -1.0, -0.9, -0.8, -0.7 mm
+        channels_table.add_estimated_positions()
+        labels = {value: "CA1" if value < 900 else "DG" for value in np.unique(_make_annotation()).tolist()}
+        channels_table.add_estimated_brain_areas(
+            annotation=_make_annotation(), voxel_size_in_mm=[0.1, 0.1, -0.1], labels=labels, enum=True
+        )
+        npt.assert_array_equal(channels_table["estimated_brain_area"][:], ["DG", "DG", "CA1", "CA1"])
+        npt.assert_array_equal(channels_table["estimated_brain_area"].data, [1, 1, 0, 0])
+
+        with self.assertRaisesRegex(ValueError, "Column 'estimated_brain_area' already exists"):
+            channels_table.add_estimated_brain_areas(annotation=_make_annotation(), voxel_size_in_mm=0.1)
@@ -0,0 +1,164 @@
+"""Tests for cataloging probe metadata in NWB files without reading them with pynwb."""
+
+from ndx_extracellular_channels import (
+    ArchiveIndex,
+    ProbeInsertion,
+    scan_nwb_file,
+    scan_nwb_files,
+)
+
+import pynwb
+
+from .helpers import TempDirTestCase, create_test_channels_table, create_test_nwbfile, create_test_probe
+
+
+def _write_test_file(path, serial_number, model="Neuropixels 1.0"):
+    nwbfile = create_test_nwbfile(identifier=serial_number)
+    probe = create_test_probe(
+        name="probe0",
+        identifier=serial_number,
+        probe_insertion=ProbeInsertion(depth_in_mm=3.0),
+        num_contacts=4,
+        model=model,
+        contact_id=[f"e{i}" for i in range(4)],
+    )
+    nwbfile.add_device(probe.probe_model)
+    nwbfile.add_device(probe)
+    nwbfile.add_acquisition(
+        create_test_channels_table(
+            probe, [0, 2], estimated_brain_area=["CA1", "CA3"], estimated_position_dv_in_mm=[-2.5, -2.1]
+        )
+    )
+
+    with pynwb.NWBHDF5IO(str(path), "w") as io:
+        io.write(nwbfile)
+
+
+class TestScanNWBFiles(TempDirTestCase):
+    """Test scanning the probe metadata of NWB files with h5py."""
+
+    def test_scan_nwb_file(self):
+        path = self.tmp_path / "session.nwb"
+        _write_test_file(path, "0123")
+
+        records = {record["neurodata_type"]: record for record in scan_nwb_file(path)}
+        assert set(records) == {"Probe", "ProbeModel", "ProbeInsertion", "ChannelsTable"}
+
+        probe = records["Probe"]
+        assert probe["file_path"] == str(path)
+        assert probe["object_path"] == "/general/devices/probe0"
+        assert probe["name"] == "probe0"
+        assert probe["attributes"]["identifier"] == "0123"
+        assert probe["links"] == {"probe_model": "/general/devices/Neuropixels 1.0"}
+        assert probe["num_rows"] is None
+
+        probe_model = records["ProbeModel"]
+        assert probe_model["attributes"]["model"] == "Neuropixels 1.0"
+        assert probe_model["attributes"]["manufacturer"] == "IMEC"
+        assert probe_model["num_rows"] == 4
+
+        assert records["ProbeInsertion"]["object_path"] == "/general/devices/probe0/probe_insertion"
+        assert records["ProbeInsertion"]["attributes"]["depth_in_mm"] == 3.0
+
+        channels_table = records["ChannelsTable"]
+        assert channels_table["links"] == {"probe": "/general/devices/probe0"}
+        assert channels_table["num_rows"] == 2
+        assert set(channels_table["attributes"]["colnames"]) == {
+            "contact",
+            "estimated_brain_area",
+            "estimated_position_dv_in_mm",
+        }
+        assert channels_table["columns"] is None
+
+        records = {record["neurodata_type"]: record for record in scan_nwb_file(path, include_columns=True)}
+        assert records["ChannelsTable"]["columns"] == {
+            "contact": [0, 2],
+            "estimated_brain_area": ["CA1", "CA3"],
+            "estimated_position_dv_in_mm": [-2.5, -2.1],
+        }
+        assert records["ProbeModel"]["columns"]["contact_id"] == ["e0", "e1", "e2", "e3"]
+        assert records["ProbeModel"]["columns"]["relative_position_in_um"][3] == [0.0, 60.0]
+
+    def test_scan_nwb_files(self):
+        paths = [self.tmp_path / "session0.nwb", self.tmp_path / "session1.nwb"]
+        _write_test_file(paths[0], "0123")
+        _write_test_file(paths[1], "4567")
+
+        for max_workers in (1, 2):
+            with self.subTest(max_workers=max_workers):
+                records = scan_nwb_files(paths, max_workers=max_workers)
+                probes = [record for record in records if record["neurodata_type"] == "Probe"]
+                assert [probe["file_path"] for probe in probes] == [str(path) for path in paths]
+                assert [probe["attributes"]["identifier"] for probe in probes] == ["0123", "4567"]
+
+    def test_scan_nwb_files_skip_errors(self):
+        path = self.tmp_path / "session.nwb"
+        _write_test_file(path, "0123")
+        bad_path = self.tmp_path / "not_an_nwb_file.nwb"
+        bad_path.write_text("not an HDF5 file")
+
+        with self.assertRaises(OSError):
+            scan_nwb_files([path, bad_path], max_workers=1)
+
+        with self.assertWarnsRegex(UserWarning, "Could not scan"):
+            records = scan_nwb_files([path, bad_path], max_workers=1, skip_errors=True)
+        assert len(records) == 4
+
+
+class TestArchiveIndex(TempDirTestCase):
+    """Test indexing and querying a collection of NWB files."""
+
+    def test_archive_index(self):
+        paths = [str(self.tmp_path / "session0.nwb"), str(self.tmp_path / "session1.nwb")]
+        _write_test_file(paths[0], "0123")
+        _write_test_file(paths[1], "4567", model="Neuropixels 2.0")
+
+        with ArchiveIndex(self.tmp_path / "index.sqlite") as index:
+            assert index.update(paths, max_workers=1) == {"indexed": 2, "skipped": 0, "failed": 0}
+
+            probes = index.find_probes(identifier="4567")
+            assert probes == [
+                {
+                    "file_path": paths[1],
+                    "object_path": "/general/devices/probe0",
+                    "name": "probe0",
+                    "identifier": "4567",
+                    "probe_model_path": "/general/devices/Neuropixels 2.0",
+                    "model": "Neuropixels 2.0",
+                    "manufacturer": "IMEC",
+                }
+            ]
+            assert index.find_files(model="Neuropixels 1.0") == [paths[0]]
+            assert index.find_files(manufacturer="IMEC") == paths
+            assert index.find_files(identifier="9999") == []
+
+            channels = index.find_channels(estimated_brain_area="CA1", estimated_position_dv_in_mm=(-3.0, -2.0))
+            assert [(channel["file_path"], channel["row"]) for channel in channels] == [(paths[0], 0), (paths[1], 0)]
+            assert channels[0]["channels_table_path"] == "/acquisition/ChannelsTable"
+            assert channels[0]["contact_id"] == "e0"
+            assert channels[0]["estimated_position_dv_in_mm"] == -2.5
+
+            channels = index.find_channels(
+                estimated_brain_area=["CA1", "CA3"], probe_identifier="0123", estimated_position_dv_in_mm=(-2.2, None)
+            )
+            assert [(channel["row"], channel["contact_id"]) for channel in channels] == [(1, "e2")]
+
+            with self.assertRaisesRegex(ValueError, "'contact' is not an indexed position column"):
+                index.find_channels(contact=(0, 1))
+
+        # unchanged files are skipped; modified files are re-indexed
+        _write_test_file(paths[1], "8901")
+        with ArchiveIndex(self.tmp_path / "index.sqlite") as index:
+            assert index.update(paths, max_workers=1) == {"indexed": 1, "skipped": 1, "failed": 0}
+            assert index.find_files(identifier="4567") == []
+            assert index.find_files(identifier="8901") == [paths[1]]
+            assert len(index.find_channels()) == 4
+
+            index.remove([paths[0]])
+            assert index.find_files() == [paths[1]]
+            assert len(index.find_channels()) == 2
+
+            # missing files are counted as failed instead of aborting the update
+            with self.assertWarnsRegex(UserWarning, "Could not scan"):
+                counts = index.update([str(self.tmp_path / "missing.nwb"), paths[1]], max_workers=1)
+            assert counts == {"indexed": 0, "skipped": 1, "failed": 1}
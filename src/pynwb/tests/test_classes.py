@@ -1,18 +1,19 @@
 """Unit and integration tests for the ndx_extracellular_channels types."""
 
 import numpy as np
-from hdmf.common import DynamicTableRegion
+from hdmf.common import DynamicTableRegion, EnumData, VectorData
 from ndx_extracellular_channels import (
     ChannelsTable,
     ContactsTable,
     ExtracellularSeries,
+    GroupIndex,
     Probe,
     ProbeInsertion,
     ProbeModel,
 )
 from pynwb.testing import NWBH5IOFlexMixin, TestCase
 
-from pynwb import NWBFile
+from pynwb import NWBFile, NWBHDF5IO
 
 
 class TestContactsTable(TestCase):
@@ -69,6 +70,144 @@ class TestContactsTable(TestCase):
         assert ct["radius_in_um"].data == [10.0, np.nan]
         assert ct["width_in_um"].data == [np.nan, 10.0]
 
+    def test_rows_for_contact_ids(self):
+        """Test looking up rows by contact ID and that the cached index is reset when a row is added."""
+        ct = ContactsTable(
+            description="Test contacts table",
+        )
+        for i in range(4):
+            ct.add_row(relative_position_in_um=[0.0, 20.0 * i], contact_id=f"e{i}")
+
+        np.testing.assert_array_equal(ct.rows_for_contact_ids(["e3", "e0", "e2"]), [3, 0, 2])
+        assert ct.rows_for_contact_ids([]).shape == (0,)
+
+        ct.add_row(relative_position_in_um=[0.0, 80.0], contact_id="s0e12")
+        np.testing.assert_array_equal(ct.rows_for_contact_ids(["s0e12"]), [4])
+
+        msg = "ContactsTable 'contacts_table': The following contact IDs were not found in the table: ['e9']."
+        with self.assertRaisesWith(ValueError, msg):
+            ct.rows_for_contact_ids(["e1", "e9"])
+
+    def test_rows_for_contact_ids_duplicate(self):
+        ct = ContactsTable(
+            description="Test contacts table",
+        )
+        ct.add_row(relative_position_in_um=[0.0, 0.0], contact_id="e0")
+        ct.add_row(relative_position_in_um=[0.0, 20.0], contact_id="e0")
+
+        msg = "ContactsTable 'contacts_table': The values of 'contact_id' are not unique."
+        with self.assertRaisesWith(ValueError, msg):
+            ct.rows_for_contact_ids(["e0"])
+
+    def test_rows_for_contact_ids_no_column(self):
+        ct = ContactsTable(
+            description="Test contacts table",
+        )
+        ct.add_row(relative_position_in_um=[0.0, 0.0])
+
+        msg = "ContactsTable 'contacts_table': The table has no 'contact_id' column."
+        with self.assertRaisesWith(ValueError, msg):
+            ct.rows_for_contact_ids(["e0"])
+
+    def test_constructor_enum_columns(self):
+        """Test that text columns can be stored as EnumData columns."""
+        ct = ContactsTable(
+            description="Test contacts table",
+            enum_columns=["shape", "shank_id"],
+        )
+        ct.add_row(relative_position_in_um=[10.0, 10.0], shape="circle", shank_id="shank0")
+        ct.add_row(relative_position_in_um=[20.0, 10.0], shape="square", shank_id="shank0")
+        ct.add_row(relative_position_in_um=[30.0, 10.0], shape="circle", shank_id="shank1")
+
+        assert isinstance(ct["shape"], EnumData)
+        assert ct["shape"].data == [0, 1, 0]
+        assert ct["shape"].elements.data == ["circle", "square"]
+        np.testing.assert_array_equal(ct["shape"][:], ["circle", "square", "circle"])
+        np.testing.assert_array_equal(ct["shank_id"][:], ["shank0", "shank0", "shank1"])
+
+    def test_constructor_enum_columns_unsupported(self):
+        msg = (
+            "ContactsTable 'contacts_table': Column 'contact_id' cannot be stored as EnumData. "
+            "Supported columns are: ['shape', 'shank_id']."
+        )
+        with self.assertRaisesWith(ValueError, msg):
+            ContactsTable(
+                description="Test contacts table",
+                enum_columns=["contact_id"],
+            )
+
+    def test_shared_plane_axes(self):
+        """Test that plane axes shared by all contacts are returned as a broadcast view."""
+        ct = ContactsTable(
+            description="Test contacts table",
+            shared_plane_axes=[[1.0, 0.0], [0.0, 1.0]],
+        )
+        ct.add_row(relative_position_in_um=[10.0, 10.0])
+        ct.add_row(relative_position_in_um=[20.0, 10.0])
+
+        assert "plane_axes" not in ct.colnames
+        plane_axes = ct.get_plane_axes()
+        np.testing.assert_array_equal(plane_axes, [[[1.0, 0.0], [0.0, 1.0]], [[1.0, 0.0], [0.0, 1.0]]])
+        assert plane_axes.strides[0] == 0
+        assert not plane_axes.flags.writeable
+
+        msg = "ContactsTable 'contacts_table': Cannot add a row with `plane_axes` to a table with `shared_plane_axes`."
+        with self.assertRaisesWith(ValueError, msg):
+            ct.add_row(relative_position_in_um=[30.0, 10.0], plane_axes=[[1.0, 0.0], [0.0, 1.0]])
+
+    def test_get_plane_axes(self):
+        ct = ContactsTable(
+            description="Test contacts table",
+        )
+        ct.add_row(relative_position_in_um=[10.0, 10.0])
+        assert ct.get_plane_axes() is None
+
+        ct = ContactsTable(
+            description="Test contacts table",
+        )
+        ct.add_row(relative_position_in_um=[10.0, 10.0], plane_axes=[[0.0, 1.0], [1.0, 0.0]])
+        np.testing.assert_array_equal(ct.get_plane_axes(), [[[0.0, 1.0], [1.0, 0.0]]])
+
+    def test_shared_plane_axes_and_column(self):
+        msg = (
+            "ContactsTable 'contacts_table': `shared_plane_axes` and the `plane_axes` column cannot both be specified."
+        )
+        with self.assertRaisesWith(ValueError, msg):
+            ContactsTable(
+                description="Test contacts table",
+                shared_plane_axes=[[1.0, 0.0], [0.0, 1.0]],
+                columns=[
+                    VectorData(name="relative_position_in_um", description="positions", data=[[10.0, 10.0]]),
+                    VectorData(name="plane_axes", description="plane axes", data=[[[1.0, 0.0], [0.0, 1.0]]]),
+                ],
+            )
+
+    def test_set_float_precision(self):
+        ct = ContactsTable(
+            description="Test contacts table",
+        )
+        ct.add_row(relative_position_in_um=[10.0, 10.1], plane_axes=[[1.0, 0.0], [0.0, 1.0]], radius_in_um=5.0)
+        ct.add_row(relative_position_in_um=[20.0, 3840.3], plane_axes=[[0.6, 0.8], [-0.8, 0.6]], radius_in_um=5.0)
+        ct.set_float_precision()
+        for name in ("relative_position_in_um", "plane_axes", "radius_in_um"):
+            assert ct[name].data.dtype == np.float32
+        np.testing.assert_allclose(ct["relative_position_in_um"].data, [[10.0, 10.1], [20.0, 3840.3]], atol=1e-3)
+
+    def test_set_float_precision_error(self):
+        ct = ContactsTable(
+            description="Test contacts table",
+        )
+        ct.add_row(relative_position_in_um=[10.0, 10.1], radius_in_um=5.0)
+        ct.add_row(relative_position_in_um=[20.0, 3840.3], radius_in_um=5.0)
+        msg = (
+            "ContactsTable 'contacts_table': Storing column 'relative_position_in_um' as float32 would change values "
+            "by up to 4.88281e-05 um, which exceeds `max_error_in_um` (1e-05 um)."
+        )
+        with self.assertRaisesWith(ValueError, msg):
+            ct.set_float_precision(max_error_in_um=1e-5)
+        # the table is unchanged
+        assert ct["radius_in_um"].data == [5.0, 5.0]
+
 
 class TestContactsTableRoundTrip(NWBH5IOFlexMixin, TestCase):
     """Simple roundtrip test for a ContactsTable."""
@@ -113,6 +252,85 @@ class TestContactsTableRoundTrip(NWBH5IOFlexMixin, TestCase):
         return nwbfile.acquisition["ContactsTable"]
 
 
+class TestContactsTableEnumColumnsRoundTrip(NWBH5IOFlexMixin, TestCase):
+    """Roundtrip test for a ContactsTable with EnumData columns."""
+
+    def getContainerType(self):
+        return "ContactsTable"
+
+    def addContainer(self):
+        ct = ContactsTable(
+            name="ContactsTable",
+            description="Test contacts table",
+            enum_columns=["shape", "shank_id"],
+        )
+        ct.add_row(relative_position_in_um=[10.0, 10.0], shape="circle", shank_id="shank0")
+        ct.add_row(relative_position_in_um=[20.0, 10.0], shape="square", shank_id="shank0")
+        ct.add_row(relative_position_in_um=[30.0, 10.0], shape="circle", shank_id="shank1")
+        self.nwbfile.add_acquisition(ct)
+
+    def getContainer(self, nwbfile: NWBFile):
+        return nwbfile.acquisition["ContactsTable"]
+
+    def test_read_decoded(self):
+        """Test that the EnumData columns are written as integers and decoded on read."""
+        with NWBHDF5IO(self.filename, mode="w") as io:
+            io.write(self.nwbfile)
+        with NWBHDF5IO(self.filename, mode="r") as io:
+            ct = io.read().acquisition["ContactsTable"]
+            assert isinstance(ct["shape"], EnumData)
+            assert ct["shape"].data.dtype == np.uint8
+            np.testing.assert_array_equal(ct["shape"][:], ["circle", "square", "circle"])
+            np.testing.assert_array_equal(ct["shank_id"][[2, 0]], ["shank1", "shank0"])
+            assert ct.to_dataframe()["shape"].tolist() == ["circle", "square", "circle"]
+
+
+class TestContactsTableSharedPlaneAxesRoundTrip(NWBH5IOFlexMixin, TestCase):
+    """Roundtrip test for a ContactsTable with shared_plane_axes."""
+
+    def getContainerType(self):
+        return "ContactsTable"
+
+    def addContainer(self):
+        ct = ContactsTable(
+            name="ContactsTable",
+            description="Test contacts table",
+            shared_plane_axes=[[1 / np.sqrt(2), 1 / np.sqrt(2)], [-1 / np.sqrt(2), 1 / np.sqrt(2)]],
+        )
+        ct.add_row(relative_position_in_um=[10.0, 10.0])
+        ct.add_row(relative_position_in_um=[20.0, 10.0])
+        self.nwbfile.add_acquisition(ct)
+
+    def getContainer(self, nwbfile: NWBFile):
+        return nwbfile.acquisition["ContactsTable"]
+
+
+class TestContactsTableFloat32RoundTrip(NWBH5IOFlexMixin, TestCase):
+    """Roundtrip test for a ContactsTable with float columns stored as float32."""
+
+    def getContainerType(self):
+        return "ContactsTable"
+
+    def addContainer(self):
+        ct = ContactsTable(
+            name="ContactsTable",
+            description="Test contacts table",
+        )
+        ct.add_row(relative_position_in_um=[10.0, 10.0], plane_axes=[[1.0, 0.0], [0.0, 1.0]], width_in_um=12.0)
+        ct.add_row(relative_position_in_um=[20.0, 10.0], plane_axes=[[0.6, 0.8], [-0.8, 0.6]], width_in_um=12.0)
+        ct.set_float_precision()
+        self.nwbfile.add_acquisition(ct)
+
+    def getContainer(self, nwbfile: NWBFile):
+        return nwbfile.acquisition["ContactsTable"]
+
+    def test_read_float32(self):
+        read_ct = self.roundtripContainer()
+        for name in ("relative_position_in_um", "plane_axes", "width_in_um"):
+            assert read_ct[name].data.dtype == np.float32
+            assert read_ct[name].data[:].dtype == np.float32
+
+
 class TestProbeModel(TestCase):
     """Simple unit test for creating a ProbeModel."""
 
@@ -475,6 +693,23 @@ class TestChannelsTable(TestCase):
         assert ct.probe is probe
         assert len(ct) == 0
 
+    def test_set_float_precision(self):
+        probe = _create_test_probe()
+
+        ct = ChannelsTable(
+            description="Test channels table",
+            probe=probe,
+        )
+        ct.add_row(contact=0, estimated_position_ap_in_mm=-1.5, estimated_position_dv_in_mm=-3.123456)
+        ct.add_row(contact=1, estimated_position_ap_in_mm=-1.5, estimated_position_dv_in_mm=-3.143456)
+
+        # the rounding error of float32 at 3 mm is about 1e-4 um
+        with self.assertRaisesRegex(ValueError, "Storing column 'estimated_position_dv_in_mm' as float32"):
+            ct.set_float_precision(max_error_in_um=1e-6)
+        ct.set_float_precision()
+        assert ct["estimated_position_ap_in_mm"].data.dtype == np.float32
+        np.testing.assert_allclose(ct["estimated_position_dv_in_mm"].data, [-3.123456, -3.143456], atol=1e-6)
+
     def test_constructor_add_row_minimal(self):
         """Test that the constructor for ChannelsTable sets values as expected."""
         probe = _create_test_probe()
@@ -506,6 +741,28 @@ class TestChannelsTable(TestCase):
         assert ct["reference_contact"].data == [1, 0]
         assert ct["reference_contact"].table is probe.probe_model.contacts_table
 
+    def test_add_row_by_contact_id(self):
+        """Test that contacts can be referenced by the values of ContactsTable.contact_id."""
+        probe = _create_test_probe()
+        probe.probe_model.contacts_table.add_column(
+            name="contact_id",
+            description="Unique ID of the contact",
+            data=["e0", "e1", "e2"],
+        )
+
+        ct = ChannelsTable(
+            description="Test channels table",
+            probe=probe,
+        )
+        ct.add_row(contact="e2", reference_contact="e0")
+        row = dict(contact="e1", reference_contact="e0")
+        ct.add_row(row)
+        ct.add_row(contact=0, reference_contact=1)
+
+        assert row == dict(contact="e1", reference_contact="e0")  # the row passed as a dict is not modified
+        assert ct["contact"].data == [2, 1, 0]
+        assert ct["reference_contact"].data == [0, 0, 1]
+
     def test_constructor_add_row(self):
         """Test that the constructor for ChannelsTable sets values as expected."""
         probe = _create_test_probe()
@@ -570,6 +827,84 @@ class TestChannelsTable(TestCase):
         assert ct["confirmed_position_dv_in_mm"].data == [-9.5, -9.3]
         assert ct["confirmed_brain_area"].data == ["CA3", "CA3"]
 
+    def _create_channels_table_for_selection(self):
+        contacts_table = ContactsTable(description="Test contacts table", enum_columns=["shank_id"])
+        for shank in range(2):
+            for i in range(4):
+                contacts_table.add_row(relative_position_in_um=[250.0 * shank, 500.0 * i], shank_id=str(shank))
+        probe = Probe(name="Probe", probe_model=ProbeModel(model="Test Probe", contacts_table=contacts_table))
+
+        ct = ChannelsTable(description="Test channels table", probe=probe)
+        for contact, area in zip((7, 0, 5, 6, 2, 1), ("CA1", "CA3", "CA1", "DG", "CA1", "CA3")):
+            ct.add_row(contact=contact, estimated_position_dv_in_mm=-2.0 - 0.5 * contact, estimated_brain_area=area)
+        return ct
+
+    def test_select_channels(self):
+        ct = self._create_channels_table_for_selection()
+
+        np.testing.assert_array_equal(ct.select_channels(), np.arange(6))
+        np.testing.assert_array_equal(ct.select_channels(shank_ids=[1]), [0, 2, 3])
+        np.testing.assert_array_equal(
+            ct.select_channels(shank_ids={"1"}, contact_position_bounds=[None, (500.0, 1200.0)]), [2, 3]
+        )
+        np.testing.assert_array_equal(ct.select_channels(contact_position_bounds=[(0.0, 0.0)]), [1, 4, 5])
+        np.testing.assert_array_equal(ct.select_channels(brain_areas=["CA1", "DG"]), [0, 2, 3, 4])
+        np.testing.assert_array_equal(ct.select_channels(estimated_position_bounds={"dv": (-3.0, -2.0)}), [1, 4, 5])
+        np.testing.assert_array_equal(
+            ct.select_channels(brain_areas=["CA1"], mask=[True, True, False, True, True, True]), [0, 4]
+        )
+
+        region = ct.select_channels(shank_ids=["0"], brain_areas=["CA3"], region_name="channels")
+        assert isinstance(region, DynamicTableRegion)
+        assert region.name == "channels"
+        assert region.table is ct
+        assert region.data == [1, 5]
+        assert region.description == "Channels selected by shank_ids, brain_areas."
+
+    def test_select_channels_errors(self):
+        ct = self._create_channels_table_for_selection()
+
+        with self.assertRaisesRegex(ValueError, "`mask` must be a boolean array with one value per row"):
+            ct.select_channels(mask=[True, False])
+        with self.assertRaisesRegex(ValueError, "`contact_position_bounds` has 3 axes"):
+            ct.select_channels(contact_position_bounds=[None, None, (0.0, 1.0)])
+        with self.assertRaisesRegex(ValueError, "Column 'estimated_position_ap_in_mm' does not exist"):
+            ct.select_channels(estimated_position_bounds={"ap": (0.0, 1.0)})
+        with self.assertRaisesRegex(ValueError, "Column 'confirmed_brain_area' does not exist"):
+            ct.select_channels(brain_areas=["CA1"], brain_area_column="confirmed_brain_area")
+
+    def test_get_group_index(self):
+        """Test grouping channels by shank and by a column, and that the cached index is reset when a row or column is
+        added."""
+        ct = self._create_channels_table_for_selection()
+
+        index = ct.get_group_index()
+        assert isinstance(index, GroupIndex)
+        assert ct.get_group_index("shank_id") is index
+        np.testing.assert_array_equal(index.keys, ["0", "1"])
+        np.testing.assert_array_equal(index.offsets, [0, 3, 6])
+        np.testing.assert_array_equal(index.indices, [1, 4, 5, 0, 2, 3])
+        assert [(key, rows.tolist()) for key, rows in index] == [("0", [1, 4, 5]), ("1", [0, 2, 3])]
+        np.testing.assert_array_equal(index["1"], [0, 2, 3])
+        np.testing.assert_array_equal(index.get_sizes(), [3, 3])
+
+        areas = ct.get_group_index(by="estimated_brain_area")
+        assert dict((key, rows.tolist()) for key, rows in areas) == {"CA1": [0, 2, 4], "CA3": [1, 5], "DG": [3]}
+
+        ct.add_row(contact=3, estimated_position_dv_in_mm=-3.5, estimated_brain_area="CA1")
+        index = ct.get_group_index()
+        np.testing.assert_array_equal(index["0"], [1, 4, 5, 6])
+        np.testing.assert_array_equal(ct.get_group_index(by="estimated_brain_area")["CA1"], [0, 2, 4, 6])
+
+        with self.assertRaisesRegex(KeyError, "No group with key '2'"):
+            index["2"]
+        with self.assertRaisesRegex(ValueError, "Column 'stream' does not exist in the table or in the ContactsTable"):
+            ct.get_group_index(by="stream")
+
+        # a column added to the table takes precedence over the column of the ContactsTable with the same name
+        ct.add_column(name="shank_id", description="Shank of each channel", data=["a", "a", "b", "b", "a", "b", "b"])
+        assert dict((key, rows.tolist()) for key, rows in ct.get_group_index()) == {"a": [0, 1, 4], "b": [2, 3, 5, 6]}
+
 
 class TestChannelsTableRoundTrip(NWBH5IOFlexMixin, TestCase):
     """Simple roundtrip test for a ChannelsTable."""
@@ -627,6 +962,31 @@ class TestChannelsTableRoundTrip(NWBH5IOFlexMixin, TestCase):
         return nwbfile.acquisition["Neuropixels1ChannelsTable"]
 
 
+class TestChannelsTableEnumColumnsRoundTrip(NWBH5IOFlexMixin, TestCase):
+    """Roundtrip test for a ChannelsTable with EnumData columns."""
+
+    def getContainerType(self):
+        return "ChannelsTable"
+
+    def addContainer(self):
+        probe = _create_test_probe()
+        self.nwbfile.add_device(probe.probe_model)
+        self.nwbfile.add_device(probe)
+
+        ct = ChannelsTable(
+            description="Test channels table",
+            probe=probe,
+            enum_columns=["filter", "estimated_brain_area"],
+        )
+        ct.add_row(contact=0, filter="High-pass at 300 Hz", estimated_brain_area="CA1")
+        ct.add_row(contact=1, filter="High-pass at 300 Hz", estimated_brain_area="CA3")
+        ct.add_row(contact=2, filter="High-pass at 300 Hz", estimated_brain_area="CA1")
+        self.nwbfile.add_acquisition(ct)
+
+    def getContainer(self, nwbfile: NWBFile):
+        return nwbfile.acquisition["ChannelsTable"]
+
+
 class TestExtracellularSeries(TestCase):
     """Simple unit test for creating an ExtracellularSeries."""
 
@@ -0,0 +1,147 @@
+"""Tests for reading only the needed columns of ContactsTable and ChannelsTable."""
+
+import numpy as np
+import numpy.testing as npt
+from ndx_extracellular_channels import (
+    ExtracellularSeries,
+    export_electrical_series,
+    to_probeinterface,
+)
+from pynwb.testing import TestCase
+
+from pynwb import NWBHDF5IO
+
+from .helpers import (
+    TempDirTestCase,
+    create_test_channels_table,
+    create_test_nwbfile,
+    create_test_probe,
+)
+
+
+class _Unreadable:
+    """Column data that fails the test when it is read."""
+
+    def __init__(self, length):
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, key):
+        raise AssertionError("An unused column was read.")
+
+
+def _create_probe(enum_columns=None):
+    return create_test_probe(
+        positions=[[10.0 * (i % 2), 20.0 * i] for i in range(4)],
+        enum_columns=enum_columns,
+        contact_id=[f"e{i}" for i in range(4)],
+        shank_id=[str(i // 2) for i in range(4)],
+        shape=["square"] * 4,
+        width_in_um=[12.0] * 4,
+        plane_axes=[[[1.0, 0.0], [0.0, 1.0]]] * 4,
+    )
+
+
+def _create_channels_table(probe):
+    channels_table = create_test_channels_table(probe, [], name="channels")
+    channels_table.add_column(name="adc_gain", description="A custom column")
+    for contact in (3, 0, 2):
+        channels_table.add_row(
+            contact=contact,
+            filter="High-pass filter at 300 Hz.",
+            estimated_position_ap_in_mm=1.0,
+            estimated_brain_area=f"CA{contact}",
+            adc_gain=0.195,
+        )
+    return channels_table
+
+
+def _make_unreadable(table, names):
+    for name in names:
+        table[name].transform(lambda data: _Unreadable(len(data)))
+
+
+class TestReadColumns(TestCase):
+    """Test that only the requested columns are read."""
+
+    def test_to_dataframe_columns(self):
+        probe = _create_probe()
+        contacts_table = probe.probe_model.contacts_table
+        _make_unreadable(contacts_table, ["contact_id", "shank_id", "shape", "plane_axes"])
+        df = contacts_table.to_dataframe(columns=["relative_position_in_um", "width_in_um"])
+        assert df.columns.tolist() == ["relative_position_in_um", "width_in_um"]
+        with self.assertRaisesRegex(ValueError, "do not exist"):
+            contacts_table.to_dataframe(columns=["radius_in_um"])
+
+        channels_table = _create_channels_table(_create_probe())
+        _make_unreadable(channels_table, ["contact", "adc_gain"])
+        df = channels_table.to_dataframe(columns=["filter", "estimated_brain_area"])
+        assert df["estimated_brain_area"].tolist() == ["CA3", "CA0", "CA2"]
+        assert df.columns.tolist() == ["filter", "estimated_brain_area"]
+
+    def test_to_probeinterface_columns(self):
+        probe = _create_probe()
+        _make_unreadable(probe.probe_model.contacts_table, ["shank_id", "shape", "width_in_um", "plane_axes"])
+        pi_probe = to_probeinterface(probe, columns=["contact_id"])
+        npt.assert_array_equal(pi_probe.contact_positions, [[0.0, 0.0], [10.0, 20.0], [0.0, 40.0], [10.0, 60.0]])
+        npt.assert_array_equal(pi_probe.contact_ids, ["e0", "e1", "e2", "e3"])
+        assert np.all(pi_probe.shank_ids == "")
+
+        pi_probe = to_probeinterface(_create_probe())
+        npt.assert_array_equal(pi_probe.shank_ids, ["0", "0", "1", "1"])
+        assert pi_probe.contact_shapes.tolist() == ["square"] * 4
+        assert pi_probe.contact_shape_params[0] == {"width": 12.0}
+
+        with self.assertRaisesRegex(ValueError, "cannot be converted"):
+            to_probeinterface(probe, columns=["filter"])
+        with self.assertRaisesRegex(ValueError, r"Columns \['width_in_um'\] are the parameters of the contact shape"):
+            to_probeinterface(probe, columns=["width_in_um"])
+
+    def test_export_electrical_series_columns(self):
+        nwbfile = create_test_nwbfile()
+        probe = _create_probe()
+        nwbfile.add_device(probe.probe_model)
+        nwbfile.add_device(probe)
+        channels_table = _create_channels_table(probe)
+        nwbfile.add_acquisition(channels_table)
+        nwbfile.add_acquisition(
+            ExtracellularSeries(
+                name="ExtracellularSeries",
+                data=np.zeros((10, 3), dtype=np.int16),
+                channels=channels_table.create_region(name="channels", region=[0, 1, 2], description="All channels"),
+                rate=30000.0,
+            )
+        )
+        _make_unreadable(channels_table, ["filter", "estimated_brain_area", "adc_gain"])
+        _make_unreadable(probe.probe_model.contacts_table, ["relative_position_in_um", "contact_id", "plane_axes"])
+        export_electrical_series(nwbfile, columns=["x"])
+        assert nwbfile.electrodes.colnames == ("location", "group", "group_name", "x")
+        npt.assert_allclose(nwbfile.electrodes["x"].data, [-1000.0] * 3)
+        assert nwbfile.electrodes["location"].data == ["unknown"] * 3
+
+
+class TestReadEnumColumns(TempDirTestCase):
+    """Test reading EnumData columns from a file."""
+
+    def test_enum_columns_to_dataframe(self):
+        nwbfile = create_test_nwbfile()
+        probe = _create_probe(enum_columns=["shape", "shank_id"])
+        nwbfile.add_device(probe.probe_model)
+        nwbfile.add_device(probe)
+        path = self.tmp_path / "enum.nwb"
+        with NWBHDF5IO(path, "w") as io:
+            io.write(nwbfile)
+
+        with NWBHDF5IO(path, "r") as io:
+            contacts_table = io.read().devices["Neuropixels 1.0"].contacts_table
+            # the indices and elements of an EnumData column are read when a value is first accessed
+            shank_id = contacts_table["shank_id"]
+            assert shank_id.data._array is None and shank_id.elements.data._array is None
+            assert len(shank_id) == 4
+            assert shank_id.data._array is None
+            assert contacts_table["shank_id"][[3, 0]].tolist() == ["1", "0"]
+            assert isinstance(shank_id.data._array, np.ndarray)
+            assert contacts_table["shank_id"][2] == "1"
+            assert contacts_table.to_dataframe(columns=["shape"])["shape"].tolist() == ["square"] * 4
@@ -0,0 +1,101 @@
+"""Tests for comparing probes."""
+
+import numpy as np
+import numpy.testing as npt
+from ndx_extracellular_channels import (
+    ContactsTable,
+    from_probeinterface,
+    probe_diff,
+    probe_equal,
+    to_probeinterface,
+)
+
+from pynwb import NWBHDF5IO
+
+from .helpers import TempDirTestCase, create_test_nwbfile, create_test_probeinterface_probe
+
+
+def _create_probeinterface_probe():
+    probe = create_test_probeinterface_probe()
+    # mixed shapes, so that the table has both "radius_in_um" and "width_in_um" columns
+    probe.contact_shapes[::2] = "square"
+    for i in range(0, probe.get_contact_count(), 2):
+        probe.contact_shape_params[i] = {"width": 10.0}
+    return probe
+
+
+class TestProbeCompare(TempDirTestCase):
+    """Test comparing probes, probe models and contacts tables column by column."""
+
+    def test_round_trip(self):
+        pi_probe = _create_probeinterface_probe()
+        ndx_probe = from_probeinterface(pi_probe)[0]
+
+        nwbfile = create_test_nwbfile()
+        nwbfile.add_device(ndx_probe.probe_model)
+        nwbfile.add_device(ndx_probe)
+        path = self.tmp_path / "compare.nwb"
+        with NWBHDF5IO(path, "w") as io:
+            io.write(nwbfile)
+        with NWBHDF5IO(path, "r") as io:
+            read_probe = io.read().devices["probe"]
+            assert probe_equal(ndx_probe, read_probe)
+            assert probe_diff(ndx_probe, read_probe) == []
+            round_trip = from_probeinterface(to_probeinterface(read_probe))[0]
+            assert probe_equal(ndx_probe, round_trip)
+
+        # shared plane axes equal the same axes stored per contact
+        compact = from_probeinterface(pi_probe, compact_plane_axes=True)[0]
+        assert probe_equal(ndx_probe.probe_model, compact.probe_model)
+
+    def test_probe_diff(self):
+        pi_probe = _create_probeinterface_probe()
+        a = from_probeinterface(pi_probe)[0]
+
+        pi_probe.serial_number = "4567"
+        pi_probe.contact_shape_params[0] = {"width": 12.0}
+        pi_probe.set_planar_contour(pi_probe.probe_planar_contour + 1.0)
+        b = from_probeinterface(pi_probe)[0]
+        positions = b.probe_model.contacts_table["relative_position_in_um"].data
+        for row in (3, 9):
+            positions[row] = positions[row] + [0.0, 1.0]
+
+        assert not probe_equal(a, b)
+        differences = {difference["field"]: difference for difference in probe_diff(a, b)}
+        assert list(differences) == [
+            "identifier",
+            "probe_model.planar_contour_in_um",
+            "probe_model.contacts_table.relative_position_in_um",
+            "probe_model.contacts_table.width_in_um",
+        ]
+        assert differences["identifier"]["message"] == "'0123' != '4567'"
+        npt.assert_array_equal(differences["probe_model.contacts_table.relative_position_in_um"]["rows"], [3, 9])
+        npt.assert_array_equal(differences["probe_model.contacts_table.width_in_um"]["rows"], [0])
+
+        # differences within the tolerance are ignored
+        assert probe_equal(a.probe_model.contacts_table, b.probe_model.contacts_table, atol=12.0)
+        assert not probe_equal(a.probe_model.contacts_table, b.probe_model.contacts_table, atol=1.0)
+
+    def test_probe_diff_tables(self):
+        a = ContactsTable(description="Test contacts table")
+        b = ContactsTable(description="Test contacts table", enum_columns=["shape"])
+        for table in (a, b):
+            for i in range(3):
+                # missing radii are NaN, which equals NaN
+                table.add_row(
+                    relative_position_in_um=[0.0, 20.0 * i], shape="circle", radius_in_um=[5.0, np.nan][i % 2]
+                )
+        assert probe_equal(a, b)
+
+        b.add_row(relative_position_in_um=[0.0, 60.0], shape="circle", radius_in_um=np.nan)
+        assert probe_diff(a, b) == [{"field": "num_rows", "rows": None, "message": "3 != 4"}]
+
+        a.add_column(name="contact_id", description="Contact IDs", data=["e0", "e1", "e2"])
+        a.add_row(relative_position_in_um=[0.0, 60.0], shape="square", radius_in_um=5.0, contact_id="e3")
+        differences = probe_diff(a, b)
+        assert [difference["field"] for difference in differences] == ["contact_id", "shape", "radius_in_um"]
+        npt.assert_array_equal(differences[1]["rows"], [3])
+        npt.assert_array_equal(differences[2]["rows"], [3])
+
+        with self.assertRaisesRegex(ValueError, "Both objects must be"):
+            probe_equal(a, b.parent)
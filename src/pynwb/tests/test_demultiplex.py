@@ -0,0 +1,120 @@
+"""Tests for splitting an interleaved binary file into per-probe data."""
+
+import numpy as np
+import numpy.testing as npt
+from ndx_extracellular_channels import (
+    DemultiplexedDataChunkIterator,
+    ExtracellularSeries,
+    InterleavedDemultiplexer,
+    build_channel_map,
+)
+
+from pynwb import NWBHDF5IO
+
+from .helpers import (
+    TempDirTestCase,
+    create_test_channels_table,
+    create_test_nwbfile,
+    create_test_probe,
+)
+
+
+def _create_probe(name, num_contacts=4):
+    return create_test_probe(
+        name=name,
+        model=f"{name} model",
+        num_contacts=num_contacts,
+        contact_id=[f"e{i}" for i in range(num_contacts)],
+    )
+
+
+def _create_channels_table(probe, contacts):
+    return create_test_channels_table(probe, contacts, name=f"{probe.name}_channels")
+
+
+class TestInterleavedDemultiplexer(TempDirTestCase):
+    """Test splitting an interleaved binary file with a header into the data of two probes."""
+
+    def setUp(self):
+        super().setUp()
+        # 9 interleaved channels: probe A on even columns 0-6, probe B on 1, 5, 3, and a sync channel in column 8
+        self.data = np.arange(500 * 9, dtype=np.int16).reshape(500, 9)
+        self.path = self.tmp_path / "recording.bin"
+        header = b"\x00" * 16
+        self.path.write_bytes(header + self.data.tobytes())
+
+    def test_build_channel_map(self):
+        probe = _create_probe("ProbeA")
+        channels_table = _create_channels_table(probe, [2, 0, 3])
+        npt.assert_array_equal(build_channel_map(channels_table, [10, 11, 12, 13]), [12, 10, 13])
+        npt.assert_array_equal(build_channel_map(channels_table, {"e0": 5, "e2": 7, "e3": 1}), [7, 5, 1])
+        with self.assertRaisesRegex(ValueError, "No source channel"):
+            build_channel_map(channels_table, {"e0": 5})
+
+    def test_view_and_iterator(self):
+        demux = InterleavedDemultiplexer(
+            self.path, num_channels=9, channel_maps={"ProbeA": [0, 2, 4, 6], "ProbeB": [1, 5, 3]}, offset=16
+        )
+        assert demux.data.shape == (500, 9)
+
+        view = demux.get_view("ProbeA")
+        npt.assert_array_equal(view, self.data[:, [0, 2, 4, 6]])
+        assert np.shares_memory(view, demux.data)
+        with self.assertRaisesRegex(ValueError, "not evenly spaced"):
+            demux.get_view("ProbeB")
+
+        for name, columns in (("ProbeA", [0, 2, 4, 6]), ("ProbeB", [1, 5, 3])):
+            iterator = demux.get_iterator(name, buffer_shape=(128, 2), chunk_shape=(64, 1))
+            assert isinstance(iterator, DemultiplexedDataChunkIterator)
+            assert iterator.maxshape == (500, len(columns))
+            out = np.zeros((500, len(columns)), dtype=np.int16)
+            for chunk in iterator:
+                assert chunk.data.shape[0] <= 128
+                out[chunk.selection] = chunk.data
+            npt.assert_array_equal(out, self.data[:, columns])
+
+    def test_invalid_file(self):
+        with self.assertRaisesRegex(ValueError, "not a multiple"):
+            InterleavedDemultiplexer(self.path, num_channels=9, channel_maps={})
+        with self.assertRaisesRegex(ValueError, "outside of the 9 channels"):
+            InterleavedDemultiplexer(self.path, num_channels=9, channel_maps={"ProbeA": [0, 9]}, offset=16)
+
+    def test_write_demultiplexed(self):
+        probes = [_create_probe("ProbeA"), _create_probe("ProbeB", num_contacts=3)]
+        channels_tables = [
+            _create_channels_table(probes[0], [0, 1, 2, 3]),
+            _create_channels_table(probes[1], [0, 1, 2]),
+        ]
+        demux = InterleavedDemultiplexer(
+            self.path,
+            num_channels=9,
+            channel_maps={
+                "ProbeA": build_channel_map(channels_tables[0], [0, 2, 4, 6]),
+                "ProbeB": build_channel_map(channels_tables[1], {"e0": 1, "e1": 5, "e2": 3}),
+            },
+            offset=16,
+        )
+
+        nwbfile = create_test_nwbfile()
+        for probe, channels_table in zip(probes, channels_tables):
+            nwbfile.add_device(probe.probe_model)
+            nwbfile.add_device(probe)
+            nwbfile.add_acquisition(channels_table)
+            nwbfile.add_acquisition(
+                ExtracellularSeries(
+                    name=probe.name,
+                    data=demux.get_iterator(probe.name, buffer_shape=(200, len(channels_table)), chunk_shape=(100, 1)),
+                    rate=30000.0,
+                    channels=channels_table.create_region(
+                        name="channels", region=list(range(len(channels_table))), description="All channels"
+                    ),
+                )
+            )
+        out_path = self.tmp_path / "demultiplexed.nwb"
+        with NWBHDF5IO(out_path, "w") as io:
+            io.write(nwbfile)
+
+        with NWBHDF5IO(out_path, "r") as io:
+            read_nwbfile = io.read()
+            npt.assert_array_equal(read_nwbfile.acquisition["ProbeA"].data[:], self.data[:, [0, 2, 4, 6]])
+            npt.assert_array_equal(read_nwbfile.acquisition["ProbeB"].data[:], self.data[:, [1, 5, 3]])
@@ -16,7 +16,7 @@ from ndx_extracellular_channels import (
 from pynwb import NWBHDF5IO, NWBFile
 
 
-def test_all_classes():
+def test_all_classes(tmp_path):
 
     # initialize an NWBFile object
     nwbfile = NWBFile(
@@ -144,7 +144,7 @@ def test_all_classes():
     nwbfile.add_acquisition(es)
 
     # write the NWBFile to disk
-    path = "test_extracellular_channels.nwb"
+    path = tmp_path / "test_extracellular_channels.nwb"
     with NWBHDF5IO(path, mode="w") as io:
         io.write(nwbfile)
 
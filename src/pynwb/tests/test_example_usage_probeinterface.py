@@ -9,7 +9,7 @@ import probeinterface
 import pynwb
 
 
-def test_from_probeinterface():
+def test_from_probeinterface(tmp_path):
 
     # following the probeinterface tutorial, create a few probes
     n = 24
@@ -80,11 +80,11 @@ def test_from_probeinterface():
         nwbfile.add_device(ndx_probe.probe_model)
         nwbfile.add_device(ndx_probe)
 
-    with pynwb.NWBHDF5IO("test_probeinterface.nwb", "w") as io:
+    with pynwb.NWBHDF5IO(tmp_path / "test_probeinterface.nwb", "w") as io:
         io.write(nwbfile)
 
     # read the file and check the content
-    with pynwb.NWBHDF5IO("test_probeinterface.nwb", "r") as io:
+    with pynwb.NWBHDF5IO(tmp_path / "test_probeinterface.nwb", "r") as io:
         nwbfile = io.read()
         assert set(nwbfile.devices.keys()) == {
             "probe0",
@@ -164,7 +164,7 @@ def test_from_probeinterface():
         )
 
 
-def test_to_probeinterface():
+def test_to_probeinterface(tmp_path):
 
     # create a NWB file with a few probes
     nwbfile = pynwb.NWBFile(
@@ -306,11 +306,11 @@ def test_to_probeinterface():
     nwbfile.add_device(probe_model0)
     nwbfile.add_device(probe0)
 
-    with pynwb.NWBHDF5IO("test_probeinterface.nwb", "w") as io:
+    with pynwb.NWBHDF5IO(tmp_path / "test_probeinterface.nwb", "w") as io:
         io.write(nwbfile)
 
     # read the file and test whether the read probe can be converted back to probeinterface correctly
-    with pynwb.NWBHDF5IO("test_probeinterface.nwb", "r") as io:
+    with pynwb.NWBHDF5IO(tmp_path / "test_probeinterface.nwb", "r") as io:
         nwbfile = io.read()
         read_probe = nwbfile.devices["probe0"]
         pi_probe = ndx_extracellular_channels.to_probeinterface(read_probe)
@@ -323,3 +323,26 @@ def test_to_probeinterface():
         npt.assert_array_equal(pi_probe.contact_positions, probe_model0.contacts_table.relative_position_in_um)
         npt.assert_array_equal(pi_probe.to_numpy()["radius"], 5.0)
         npt.assert_array_equal(pi_probe.contact_shapes, "circle")
+
+
+def test_from_probeinterface_compact_plane_axes():
+    probe = probeinterface.generate_dummy_probe(elec_shapes="circle")
+    probe.name = "probe0"
+    probe.model_name = "Dummy Neuropixels 1.0"
+
+    ndx_probe = ndx_extracellular_channels.from_probeinterface(probe, compact_plane_axes=True)[0]
+    contacts_table = ndx_probe.probe_model.contacts_table
+    assert "plane_axes" not in contacts_table.colnames
+    npt.assert_array_equal(contacts_table.shared_plane_axes, probe.contact_plane_axes[0])
+
+    pi_probe = ndx_extracellular_channels.to_probeinterface(ndx_probe)
+    npt.assert_array_equal(pi_probe.contact_plane_axes, probe.contact_plane_axes)
+
+    # contacts with different plane axes are stored per contact
+    thetas = np.zeros(probe.get_contact_count())
+    thetas[:2] = 45.0
+    probe.rotate_contacts(thetas)
+    ndx_probe = ndx_extracellular_channels.from_probeinterface(probe, compact_plane_axes=True)[0]
+    contacts_table = ndx_probe.probe_model.contacts_table
+    assert contacts_table.shared_plane_axes is None
+    npt.assert_array_equal(contacts_table.get_plane_axes(), probe.contact_plane_axes)
@@ -0,0 +1,283 @@
+"""Tests for the probe geometry functions."""
+
+import re
+
+import numpy as np
+import numpy.testing as npt
+from ndx_extracellular_channels import (
+    ContactsTable,
+    ProbeInsertion,
+    ProbeModel,
+    clear_distances_cache,
+    compute_contact_distances,
+    compute_insertion_transform,
+    geometry,
+)
+from ndx_extracellular_channels.geometry import (
+    apply_transform,
+    find_overlapping_contacts,
+    points_in_polygon,
+)
+from pynwb.testing import TestCase
+
+from .helpers import create_test_channels_table, create_test_probe, create_test_probe_model
+
+
+def _create_probe_model(num_contacts=40):
+    return create_test_probe_model(positions=[[16.0 * (i % 2), 20.0 * (i // 2)] for i in range(num_contacts)])
+
+
+def _brute_force_distances(positions):
+    positions = np.asarray(positions)
+    return np.array([[np.linalg.norm(a - b) for b in positions] for a in positions])
+
+
+def _brute_force_overlaps(positions, shape, radius, width, height):
+    pairs = []
+    for i in range(len(positions)):
+        for j in range(i + 1, len(positions)):
+            dx, dy = np.abs(positions[i] - positions[j])
+            if shape[i] == "circle" and shape[j] == "circle":
+                overlap = np.hypot(dx, dy) < radius[i] + radius[j]
+            elif shape[i] != "circle" and shape[j] != "circle":
+                overlap = dx < (width[i] + width[j]) / 2 and dy < (height[i] + height[j]) / 2
+            else:
+                c, r = (i, j) if shape[i] == "circle" else (j, i)
+                gap = np.maximum([dx - width[r] / 2, dy - height[r] / 2], 0.0)
+                overlap = np.hypot(*gap) < radius[c]
+            if overlap:
+                pairs.append((i, j))
+    return np.array(pairs, dtype=int).reshape(-1, 2)
+
+
+def _create_contacts_table(positions):
+    ct = ContactsTable(description="Test contacts table")
+    for position in positions:
+        ct.add_row(relative_position_in_um=position, shape="circle", radius_in_um=5.0)
+    return ct
+
+
+def _rotation(axis, angle_in_deg):
+    # rotation around one of the (AP, ML, DV) axes that turns the lower of the other two axes towards the higher
+    c, s = np.cos(np.deg2rad(angle_in_deg)), np.sin(np.deg2rad(angle_in_deg))
+    i, j = [k for k in range(3) if k != axis]
+    rotation = np.eye(3)
+    rotation[i, i], rotation[i, j], rotation[j, i], rotation[j, j] = c, -s, s, c
+    return rotation
+
+
+class TestContactDistances(TestCase):
+    """Test computing the distances between contacts, dense or sparse, and caching them."""
+
+    def test_compute_contact_distances_dense(self):
+        clear_distances_cache()
+        probe_model = _create_probe_model()
+        expected = _brute_force_distances(probe_model.contacts_table["relative_position_in_um"].data)
+
+        distances = probe_model.get_contact_distances(block_size=7)
+        assert distances.dtype == np.float64
+        npt.assert_allclose(distances, expected)
+        assert not distances.flags.writeable
+
+        distances32 = probe_model.get_contact_distances(dtype="float32")
+        assert distances32.dtype == np.float32
+        npt.assert_allclose(distances32, expected, rtol=1e-6)
+
+    def test_compute_contact_distances_sparse(self):
+        try:
+            import scipy.sparse as scipy_sparse
+        except ImportError:
+            self.skipTest("scipy is not installed")
+        clear_distances_cache()
+        probe_model = _create_probe_model()
+        expected = _brute_force_distances(probe_model.contacts_table["relative_position_in_um"].data)
+
+        distances = probe_model.get_contact_distances(max_distance=30.0, block_size=7, dtype="float32")
+        assert scipy_sparse.isspmatrix_csr(distances)
+        assert distances.dtype == np.float32
+        # the distance of each contact to itself is stored as an explicit zero
+        assert distances.nnz == np.count_nonzero(expected <= 30.0)
+        npt.assert_array_equal(distances.indptr, np.concatenate([[0], np.cumsum((expected <= 30.0).sum(axis=1))]))
+        npt.assert_allclose(distances.toarray(), np.where(expected <= 30.0, expected, 0.0), rtol=1e-6)
+        # the cached arrays are shared between calls
+        for array in (distances.data, distances.indices, distances.indptr):
+            assert not array.flags.writeable
+
+        # contacts at exactly `max_distance` are included, as in the dense matrix
+        dense = probe_model.get_contact_distances()
+        distances = probe_model.get_contact_distances(max_distance=20.0)
+        npt.assert_array_equal(distances.indptr, np.concatenate([[0], np.cumsum((dense <= 20.0).sum(axis=1))]))
+        npt.assert_array_equal(distances.toarray(), np.where(dense <= 20.0, dense, 0.0))
+
+    def test_compute_contact_distances_cache(self):
+        clear_distances_cache()
+        probe_model1 = _create_probe_model()
+        probe_model2 = _create_probe_model()
+
+        # probe models with the same contact positions share the cached result
+        distances1 = probe_model1.get_contact_distances()
+        distances2 = probe_model2.get_contact_distances()
+        assert distances1 is distances2
+        assert probe_model1.get_contact_distances(dtype="float32") is not distances1
+
+        probe_model3 = _create_probe_model(num_contacts=10)
+        assert probe_model3.get_contact_distances().shape == (10, 10)
+
+    def test_compute_contact_distances_cache_max_bytes(self):
+        clear_distances_cache()
+        # room for two dense float64 matrices of 40 contacts
+        self.addCleanup(setattr, geometry, "DISTANCES_CACHE_MAX_BYTES", geometry.DISTANCES_CACHE_MAX_BYTES)
+        geometry.DISTANCES_CACHE_MAX_BYTES = 2 * 40 * 40 * 8
+        probe_model = _create_probe_model()
+
+        distances64 = probe_model.get_contact_distances()
+        distances32 = probe_model.get_contact_distances(dtype="float32")
+        # adding a third matrix evicts the least recently used one
+        _create_probe_model(num_contacts=41).get_contact_distances()
+        assert probe_model.get_contact_distances(dtype="float32") is distances32
+        assert probe_model.get_contact_distances() is not distances64
+
+        # a result larger than the cache is not cached
+        probe_model = _create_probe_model(num_contacts=60)
+        assert probe_model.get_contact_distances() is not probe_model.get_contact_distances()
+        clear_distances_cache()
+        assert len(geometry._distances_cache) == 0
+
+    def test_compute_contact_distances_invalid(self):
+        with self.assertRaisesRegex(ValueError, "must have shape"):
+            compute_contact_distances([1.0, 2.0])
+        with self.assertRaisesRegex(ValueError, "must be a floating point type"):
+            compute_contact_distances([[1.0, 2.0]], dtype="int32")
+
+
+class TestContactsGeometry(TestCase):
+    """Test the vectorized checks that contacts lie inside the contour and do not overlap."""
+
+    def test_points_in_polygon(self):
+        # a concave "U" shape
+        polygon = np.array([[0, 0], [30, 0], [30, 30], [20, 30], [20, 10], [10, 10], [10, 30], [0, 30]])
+        points = np.array([[5, 5], [15, 5], [15, 20], [25, 25], [35, 5], [-1, 15], [5, 29]])
+        npt.assert_array_equal(points_in_polygon(points, polygon), [True, True, False, True, False, False, True])
+
+    def test_find_overlapping_contacts(self):
+        rng = np.random.default_rng(0)
+        num_contacts = 300
+        positions = rng.uniform(0, 200, size=(num_contacts, 2))
+        shape = rng.choice(["circle", "square", "rect"], size=num_contacts)
+        radius = np.where(shape == "circle", rng.uniform(1, 6, num_contacts), np.nan)
+        width = np.where(shape != "circle", rng.uniform(1, 12, num_contacts), np.nan)
+        height = np.where(shape == "rect", rng.uniform(1, 12, num_contacts), np.where(shape == "square", width, np.nan))
+
+        pairs = find_overlapping_contacts(positions, shape, radius, width, height)
+        expected = _brute_force_overlaps(positions, shape, radius, width, height)
+        assert len(expected) > 0
+        npt.assert_array_equal(pairs, expected)
+
+    def test_find_overlapping_contacts_touching(self):
+        # contacts that only touch do not overlap
+        positions = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+        pairs = find_overlapping_contacts(positions, ["circle"] * 3, radius_in_um=[5.0, 5.0, 5.0])
+        assert pairs.shape == (0, 2)
+
+    def test_probe_model_check_geometry(self):
+        contour = [[-10.0, -10.0], [30.0, -10.0], [30.0, 100.0], [-10.0, 100.0]]
+        ct = _create_contacts_table([[0.0, 0.0], [0.0, 20.0], [20.0, 0.0]])
+        probe_model = ProbeModel(
+            model="Test Probe", contacts_table=ct, planar_contour_in_um=contour, check_geometry=True
+        )
+        probe_model.validate_geometry()
+
+        ct = _create_contacts_table([[0.0, 0.0], [0.0, 8.0], [50.0, 0.0]])
+        msg = (
+            "ContactsTable 'contacts_table': 1 contact(s) lie outside `planar_contour_in_um`: rows [2]; "
+            "1 pair(s) of contacts overlap: rows [[0, 1]]."
+        )
+        with self.assertRaisesRegex(ValueError, re.escape(msg)):
+            ProbeModel(model="Test Probe", contacts_table=ct, planar_contour_in_um=contour, check_geometry=True)
+
+        # the check is opt-in
+        probe_model = ProbeModel(model="Test Probe", contacts_table=ct, planar_contour_in_um=contour)
+        with self.assertRaisesRegex(ValueError, re.escape(msg)):
+            probe_model.validate_geometry()
+
+
+class TestInsertionTransform(TestCase):
+    """Test the rigid transform of a probe insertion and the estimated positions of channels."""
+
+    def test_compute_insertion_transform(self):
+        # no rotation: the tip is straight below the insertion point, x maps to AP and y to DV
+        transform = compute_insertion_transform(
+            insertion_position_ap_in_mm=1.0, insertion_position_ml_in_mm=-2.0, depth_in_mm=3.0
+        )
+        npt.assert_allclose(
+            apply_transform(transform, [[0.0, 0.0], [100.0, 500.0]]), [[1.0, -2.0, -3.0], [1.1, -2.0, -2.5]]
+        )
+
+        # + yaw turns the probe plane towards +ML, + pitch tilts the probe plane upward, + roll moves +ML downward
+        kwargs = dict(
+            insertion_angle_yaw_in_deg=30.0, insertion_angle_pitch_in_deg=20.0, insertion_angle_roll_in_deg=10.0
+        )
+        transform = compute_insertion_transform(depth_in_mm=2.0, **kwargs)
+        rotation = _rotation(2, 30.0) @ _rotation(1, 20.0) @ _rotation(0, -10.0)
+        npt.assert_allclose(transform[:3, :3] * 1000, rotation @ [[1, 0, 0], [0, 0, 1], [0, 1, 0]], atol=1e-12)
+        npt.assert_allclose(transform[:3, 3], -2.0 * rotation[:, 2])
+        # rigid transform: distances are preserved (up to the unit conversion)
+        positions = np.random.default_rng(0).uniform(0, 1000, size=(20, 3))
+        transformed = apply_transform(transform, positions)
+        npt.assert_allclose(
+            _brute_force_distances(transformed) * 1000, _brute_force_distances(positions), rtol=1e-9, atol=1e-9
+        )
+
+    def test_channels_table_add_estimated_positions(self):
+        probe_insertion = ProbeInsertion(
+            insertion_position_ap_in_mm=1.0,
+            insertion_position_ml_in_mm=-2.0,
+            depth_in_mm=3.0,
+            insertion_angle_yaw_in_deg=45.0,
+        )
+        probe = create_test_probe(
+            positions=[[16.0 * (i % 2), 20.0 * (i // 2)] for i in range(10)], probe_insertion=probe_insertion
+        )
+        probe_model = probe.probe_model
+        channels_table = create_test_channels_table(probe, [4, 0, 9])
+
+        # the insertion position and depth are required, the angles default to zero
+        msg = "ProbeInsertion 'probe_insertion': Cannot compute the transform without ['insertion_position_dv_in_mm']."
+        with self.assertRaisesRegex(ValueError, re.escape(msg)):
+            channels_table.add_estimated_positions()
+        assert "estimated_position_ap_in_mm" not in channels_table.colnames
+        probe_insertion.insertion_position_dv_in_mm = 0.0
+
+        transform = probe_insertion.get_transform()
+        assert probe_insertion.get_transform() is transform
+        assert not transform.flags.writeable
+
+        channels_table.add_estimated_positions()
+        positions = probe_model.contacts_table["relative_position_in_um"].data
+        expected = apply_transform(transform, [positions[4], positions[0], positions[9]])
+        npt.assert_allclose(channels_table["estimated_position_ap_in_mm"].data, expected[:, 0])
+        npt.assert_allclose(channels_table["estimated_position_ml_in_mm"].data, expected[:, 1])
+        npt.assert_allclose(channels_table["estimated_position_dv_in_mm"].data, expected[:, 2])
+
+        # setting an angle that was missing updates the transform
+        probe_insertion.insertion_angle_pitch_in_deg = 10.0
+        npt.assert_allclose(
+            probe_insertion.get_transform(),
+            compute_insertion_transform(
+                insertion_position_ap_in_mm=1.0,
+                insertion_position_ml_in_mm=-2.0,
+                insertion_position_dv_in_mm=0.0,
+                depth_in_mm=3.0,
+                insertion_angle_yaw_in_deg=45.0,
+                insertion_angle_pitch_in_deg=10.0,
+            ),
+        )
+        assert not np.allclose(probe_insertion.get_transform(), transform)
+
+        msg = "ChannelsTable 'ChannelsTable': Columns ['estimated_position_ap_in_mm', 'estimated_position_ml_in_mm', "
+        with self.assertRaisesRegex(ValueError, re.escape(msg)):
+            channels_table.add_estimated_positions()
+
+        channels_table = create_test_channels_table(create_test_probe(), [])
+        with self.assertRaisesRegex(ValueError, "The probe has no `probe_insertion`"):
+            channels_table.add_estimated_positions()
@@ -0,0 +1,100 @@
+"""Tests for the opt-in instrumentation of the I/O and conversion hot paths."""
+
+import os
+
+import numpy as np
+import numpy.testing as npt
+from hdmf.common import DynamicTableRegion
+from ndx_extracellular_channels import (
+    ExtracellularSeries,
+    MultiStreamBuilder,
+    add_hook,
+    from_probeinterface,
+    record_operations,
+    remove_hook,
+    write_nwbfile,
+)
+
+from pynwb import NWBHDF5IO
+
+from .helpers import (
+    TempDirTestCase,
+    create_test_channels_table,
+    create_test_nwbfile,
+    create_test_probe,
+    create_test_probeinterface_probe,
+)
+
+
+def _build_nwbfile():
+    probe = create_test_probeinterface_probe()
+    ndx_probe = from_probeinterface(probe)[0]
+
+    channels_table = create_test_channels_table(ndx_probe, range(4))
+    channels = DynamicTableRegion(name="channels", data=[0, 1, 2, 3], description="channels", table=channels_table)
+    series = ExtracellularSeries(name="Series", data=np.zeros((100, 4)), rate=30000.0, channels=channels)
+
+    nwbfile = create_test_nwbfile()
+    nwbfile.add_device(ndx_probe.probe_model)
+    nwbfile.add_device(ndx_probe)
+    nwbfile.add_acquisition(channels_table)
+    nwbfile.add_acquisition(series)
+    return nwbfile, len(probe.contact_ids)
+
+
+class TestInstrumentation(TempDirTestCase):
+    """Test recording the instrumented operations and forwarding them to hooks."""
+
+    def test_record_operations(self):
+        with record_operations() as recorder:
+            nwbfile, num_contacts = _build_nwbfile()
+            write_nwbfile(self.tmp_path / "test.nwb", nwbfile)
+        report = recorder.report()
+
+        assert report["from_probeinterface"]["count"] == 1
+        assert report["from_probeinterface"]["rows"] == num_contacts
+        assert report["ContactsTable.__init__"]["count"] == 1
+        assert report["ChannelsTable.add_row"]["count"] == 4
+        assert report["ChannelsTable.add_row"]["rows"] == 4
+        assert report["ExtracellularSeries.__init__"]["bytes"] == 100 * 4 * 8
+        assert report["write_nwbfile"]["count"] == 1
+        # the file is flushed after writing, so its growth since it was opened is measured on the complete file
+        assert 100 * 4 * 8 < report["write_nwbfile"]["bytes"] <= os.path.getsize(self.tmp_path / "test.nwb")
+        assert all(totals["wall_time"] >= 0.0 for totals in report.values())
+
+    def test_write_nwbfile_io(self):
+        # an IO object is left open, so data can be written to its datasets after the file is written
+        probe = create_test_probe(num_contacts=2)
+        builder = MultiStreamBuilder(probe, contacts=[0, 1], streams={"AP": dict(source_channels=[0, 1])})
+        nwbfile = create_test_nwbfile()
+        nwbfile.add_device(probe.probe_model)
+        nwbfile.add_device(probe)
+        source = np.arange(20, dtype=np.int16).reshape(10, 2)
+        builder.add_to_nwbfile(nwbfile, source, rate=30000.0)
+        path = self.tmp_path / "streams.nwb"
+        with record_operations() as recorder:
+            with NWBHDF5IO(path, "w") as io:
+                write_nwbfile(io, nwbfile)
+                builder.write_data(source)
+                size = os.path.getsize(path)
+        assert 0 < recorder.report()["write_nwbfile"]["bytes"] <= size
+
+        with NWBHDF5IO(path, "r") as io:
+            npt.assert_array_equal(io.read().acquisition["AP"].data[:], source)
+
+    def test_hooks(self):
+        events = []
+        add_hook(events.append)
+        try:
+            _build_nwbfile()
+        finally:
+            remove_hook(events.append)
+        operations = [event["operation"] for event in events]
+        assert operations.count("ChannelsTable.add_row") == 4
+        assert operations[-1] == "ExtracellularSeries.__init__"
+        assert set(events[0]) == {"operation", "wall_time", "rows", "bytes"}
+
+        # nothing is recorded when instrumentation is disabled
+        events.clear()
+        _build_nwbfile()
+        assert events == []
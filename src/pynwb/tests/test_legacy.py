@@ -0,0 +1,286 @@
+"""Tests for converting between ElectricalSeries and ExtracellularSeries."""
+
+import h5py
+import numpy as np
+import numpy.testing as npt
+from ndx_extracellular_channels import (
+    ExtracellularSeries,
+    export_electrical_series,
+    export_nwb_file,
+    migrate_electrical_series,
+    migrate_nwb_file,
+)
+
+from pynwb import NWBHDF5IO
+from pynwb.ecephys import ElectricalSeries
+
+from .helpers import TempDirTestCase, create_test_channels_table, create_test_nwbfile, create_test_probe
+
+
+def _create_electrodes_nwbfile(num_devices=1):
+    nwbfile = create_test_nwbfile()
+    nwbfile.add_electrode_column(name="rel_x", description="x coordinate in electrode group")
+    nwbfile.add_electrode_column(name="rel_y", description="y coordinate in electrode group")
+    for d in range(num_devices):
+        device = nwbfile.create_device(name=f"device{d}", description="Neuropixels 1.0", manufacturer="IMEC")
+        for shank in range(2):
+            group = nwbfile.create_electrode_group(
+                name=f"device{d}_shank{shank}", description="A shank", location="brain", device=device
+            )
+            for i in range(3):
+                nwbfile.add_electrode(
+                    group=group,
+                    location=f"CA{i + 1}",
+                    filtering="High-pass filter at 300 Hz.",
+                    x=100.0 * i,
+                    y=2000.0,
+                    z=-500.0,
+                    rel_x=250.0 * shank,
+                    rel_y=20.0 * i,
+                )
+    return nwbfile
+
+
+def _add_electrical_series(nwbfile, name, rows, data, **kwargs):
+    series = ElectricalSeries(
+        name=name,
+        data=data,
+        electrodes=nwbfile.create_electrode_table_region(region=rows, description="Electrodes"),
+        **kwargs,
+    )
+    nwbfile.add_acquisition(series)
+    return series
+
+
+def _create_extracellular_nwbfile(data, **kwargs):
+    nwbfile = create_test_nwbfile()
+    probe = create_test_probe(
+        name="Probe",
+        positions=[[10.0 * (i % 2), 20.0 * i] for i in range(4)],
+        shank_id=[str(i // 2) for i in range(4)],
+    )
+    nwbfile.add_device(probe.probe_model)
+    nwbfile.add_device(probe)
+    contacts = (3, 0, 2)
+    channels_table = create_test_channels_table(
+        probe,
+        contacts,
+        name="channels",
+        filter=["High-pass filter at 300 Hz."] * 3,
+        estimated_position_ap_in_mm=[1.0] * 3,
+        estimated_position_ml_in_mm=[-0.5] * 3,
+        estimated_position_dv_in_mm=[-2.0 - 0.1 * contact for contact in contacts],
+        estimated_brain_area=[f"CA{contact}" for contact in contacts],
+    )
+    nwbfile.add_acquisition(channels_table)
+    nwbfile.add_acquisition(
+        ExtracellularSeries(
+            name="ExtracellularSeries",
+            data=data,
+            channels=channels_table.create_region(name="channels", region=[0, 1, 2], description="All channels"),
+            conversion=0.195,
+            **kwargs,
+        )
+    )
+    return nwbfile
+
+
+class TestMigrateElectricalSeries(TempDirTestCase):
+    """Test converting ElectricalSeries and the electrodes table into ExtracellularSeries."""
+
+    def test_migrate_electrical_series(self):
+        nwbfile = _create_electrodes_nwbfile()
+        data = np.arange(40, dtype=np.int16).reshape(10, 4)
+        _add_electrical_series(nwbfile, "ElectricalSeries", [4, 0, 1, 3], data, rate=30000.0, conversion=1e-6 * 0.195)
+
+        migrated = migrate_electrical_series(nwbfile)
+        series = migrated["ElectricalSeries"]
+        assert isinstance(series, ExtracellularSeries)
+        assert series.name == "ElectricalSeries_extracellular"
+        assert series.data is data
+        assert series.rate == 30000.0
+        npt.assert_allclose(series.get_conversion_factors(), [0.195] * 4)
+
+        probe = nwbfile.devices["device0_probe"]
+        contacts_table = probe.probe_model.contacts_table
+        assert len(contacts_table) == 6
+        assert contacts_table["contact_id"].data == ["0", "1", "2", "3", "4", "5"]
+        assert contacts_table["shank_id"].data[3] == "device0_shank1"
+        npt.assert_array_equal(contacts_table["relative_position_in_um"].data[4], [250.0, 20.0])
+        assert probe.probe_model.manufacturer == "IMEC"
+
+        channels_table = series.channels.table
+        assert channels_table.name == "ElectricalSeries_extracellular_channels"
+        assert channels_table.probe is probe
+        npt.assert_array_equal(channels_table["contact"].data, [4, 0, 1, 3])
+        assert channels_table["estimated_brain_area"].data == ["CA2", "CA1", "CA2", "CA1"]
+        npt.assert_allclose(channels_table["estimated_position_ap_in_mm"].data, [-0.1, 0.0, -0.1, 0.0])
+        npt.assert_allclose(channels_table["estimated_position_dv_in_mm"].data, [-2.0] * 4)
+        npt.assert_allclose(channels_table["estimated_position_ml_in_mm"].data, [-0.5] * 4)
+        assert channels_table["filter"].data == ["High-pass filter at 300 Hz."] * 4
+
+    def test_migrate_multiple_devices(self):
+        nwbfile = _create_electrodes_nwbfile(num_devices=2)
+        _add_electrical_series(nwbfile, "A", [0, 1], np.zeros((10, 2)), rate=1000.0)
+        _add_electrical_series(nwbfile, "B", [6, 8], np.zeros((10, 2)), rate=1000.0)
+        migrated = migrate_electrical_series(nwbfile)
+        assert migrated["A"].channels.table.probe.name == "device0_probe"
+        assert migrated["B"].channels.table.probe.name == "device1_probe"
+        npt.assert_array_equal(migrated["B"].channels.table["contact"].data, [0, 2])
+
+        nwbfile = _create_electrodes_nwbfile(num_devices=2)
+        _add_electrical_series(nwbfile, "AB", [0, 6], np.zeros((10, 2)), rate=1000.0)
+        with self.assertRaisesRegex(ValueError, "belong to 2 devices"):
+            migrate_electrical_series(nwbfile)
+
+    def test_migrate_offset(self):
+        nwbfile = _create_electrodes_nwbfile()
+        _add_electrical_series(nwbfile, "ElectricalSeries", [0, 1], np.zeros((10, 2)), rate=1000.0, offset=0.1)
+        with self.assertRaisesRegex(ValueError, "nonzero offset"):
+            migrate_electrical_series(nwbfile)
+
+    def test_migrate_nwb_file(self):
+        nwbfile = _create_electrodes_nwbfile()
+        data = np.arange(3000, dtype=np.int16).reshape(1000, 3)
+        timestamps = np.arange(1000) / 1000.0
+        _add_electrical_series(nwbfile, "ElectricalSeries", [0, 1, 2], data, timestamps=timestamps, conversion=1e-6)
+        path = self.tmp_path / "legacy.nwb"
+        with NWBHDF5IO(path, "w") as io:
+            io.write(nwbfile)
+
+        assert migrate_nwb_file(path) == ["ElectricalSeries_extracellular"]
+
+        with h5py.File(path, "r") as f:
+            group = f["acquisition/ElectricalSeries_extracellular"]
+            link = group.get("timestamps", getlink=True)
+            assert isinstance(link, h5py.SoftLink)
+            assert link.path == "/acquisition/ElectricalSeries/timestamps"
+            # the data is a virtual dataset of the ElectricalSeries data, with its own attributes
+            assert group["data"].is_virtual
+            assert [source.dset_name for source in group["data"].virtual_sources()] == [
+                "/acquisition/ElectricalSeries/data"
+            ]
+            assert group["data"].attrs["unit"] == "microvolts"
+            assert group["data"].attrs["conversion"] == 1e-6
+            assert f["acquisition/ElectricalSeries/data"].attrs["unit"] == "volts"
+
+        with NWBHDF5IO(path, "r") as io:
+            read_nwbfile = io.read()
+            series = read_nwbfile.acquisition["ElectricalSeries_extracellular"]
+            npt.assert_array_equal(series.data[:], data)
+            npt.assert_array_equal(series.timestamps[:], timestamps)
+            npt.assert_allclose(series.get_conversion_factors(), [1.0] * 3)
+            assert series.channels.table.probe.probe_model.contacts_table["contact_id"].data[:].tolist() == [
+                str(i) for i in range(6)
+            ]
+
+    def test_migrate_copies_linked_data(self):
+        nwbfile = _create_electrodes_nwbfile()
+        data = np.arange(30, dtype=np.int16).reshape(10, 3)
+        _add_electrical_series(nwbfile, "ElectricalSeries", [0, 1, 2], data, rate=1000.0, conversion=1e-6)
+        path = self.tmp_path / "legacy.nwb"
+        with NWBHDF5IO(path, "w") as io:
+            io.write(nwbfile)
+
+        # written without migrate_nwb_file, the data is copied because a link would keep the unit in volts
+        with NWBHDF5IO(path, "a") as io:
+            read_nwbfile = io.read()
+            migrate_electrical_series(read_nwbfile)
+            io.write(read_nwbfile)
+        with h5py.File(path, "r") as f:
+            group = f["acquisition/ElectricalSeries_extracellular"]
+            assert isinstance(group.get("data", getlink=True), h5py.HardLink)
+            assert not group["data"].is_virtual
+            npt.assert_array_equal(group["data"][:], data)
+            assert group["data"].attrs["unit"] == "microvolts"
+
+
+class TestExportElectricalSeries(TempDirTestCase):
+    """Test adding ElectricalSeries views of ExtracellularSeries."""
+
+    def test_export_electrical_series(self):
+        data = np.arange(30, dtype=np.int16).reshape(10, 3)
+        nwbfile = _create_extracellular_nwbfile(data, rate=30000.0)
+        nwbfile.add_acquisition(
+            ExtracellularSeries(
+                name="Subset",
+                data=data[:, :2],
+                channels=nwbfile.acquisition["channels"].create_region(
+                    name="channels", region=[2, 1], description="Some channels"
+                ),
+                rate=30000.0,
+            )
+        )
+
+        exported = export_electrical_series(nwbfile)
+        series = exported["ExtracellularSeries"]
+        assert isinstance(series, ElectricalSeries)
+        assert series.name == "ExtracellularSeries_electrical"
+        assert series.data is data
+        assert series.rate == 30000.0
+        npt.assert_allclose(series.conversion * np.asarray(series.channel_conversion), [0.195e-6] * 3)
+
+        # the channels table is shared by both series and only added once
+        electrodes = nwbfile.electrodes
+        assert len(electrodes) == 3
+        npt.assert_array_equal(series.electrodes.data, [0, 1, 2])
+        npt.assert_array_equal(exported["Subset"].electrodes.data, [2, 1])
+        assert electrodes["location"].data == ["CA3", "CA0", "CA2"]
+        assert electrodes["filtering"].data == ["High-pass filter at 300 Hz."] * 3
+        assert [group.name for group in electrodes["group"].data] == ["Probe_shank1", "Probe_shank0", "Probe_shank1"]
+        assert electrodes["group"].data[0].device is nwbfile.devices["Probe"]
+        npt.assert_allclose(electrodes["x"].data, [-1000.0] * 3)
+        npt.assert_allclose(electrodes["y"].data, [2300.0, 2000.0, 2200.0])
+        npt.assert_allclose(electrodes["z"].data, [-500.0] * 3)
+        npt.assert_allclose(electrodes["rel_x"].data, [10.0, 0.0, 0.0])
+        npt.assert_allclose(electrodes["rel_y"].data, [60.0, 0.0, 40.0])
+
+    def test_export_nwb_file(self):
+        data = np.arange(3000, dtype=np.int16).reshape(1000, 3)
+        timestamps = np.arange(1000) / 1000.0
+        path = self.tmp_path / "extracellular.nwb"
+        with NWBHDF5IO(path, "w") as io:
+            io.write(_create_extracellular_nwbfile(data, timestamps=timestamps))
+
+        assert export_nwb_file(path) == ["ExtracellularSeries_electrical"]
+
+        with h5py.File(path, "r") as f:
+            group = f["acquisition/ExtracellularSeries_electrical"]
+            link = group.get("timestamps", getlink=True)
+            assert isinstance(link, h5py.SoftLink)
+            assert link.path == "/acquisition/ExtracellularSeries/timestamps"
+            # the data is a virtual dataset of the ExtracellularSeries data, with its own attributes
+            assert group["data"].is_virtual
+            assert [source.dset_name for source in group["data"].virtual_sources()] == [
+                "/acquisition/ExtracellularSeries/data"
+            ]
+            assert group["data"].attrs["unit"] == "volts"
+            npt.assert_allclose(group["data"].attrs["conversion"], 0.195)
+            assert f["acquisition/ExtracellularSeries/data"].attrs["unit"] == "microvolts"
+
+        with NWBHDF5IO(path, "r") as io:
+            read_nwbfile = io.read()
+            series = read_nwbfile.acquisition["ExtracellularSeries_electrical"]
+            npt.assert_array_equal(series.data[:], data)
+            npt.assert_array_equal(series.timestamps[:], timestamps)
+            npt.assert_allclose(series.conversion * series.channel_conversion[:], [0.195e-6] * 3)
+            assert read_nwbfile.electrodes["location"].data[:].tolist() == ["CA3", "CA0", "CA2"]
+            assert read_nwbfile.electrodes["group"][0].device.name == "Probe"
+
+    def test_export_copies_linked_data(self):
+        data = np.arange(30, dtype=np.int16).reshape(10, 3)
+        path = self.tmp_path / "extracellular.nwb"
+        with NWBHDF5IO(path, "w") as io:
+            io.write(_create_extracellular_nwbfile(data, rate=30000.0))
+
+        # written without export_nwb_file, the data is copied because a link would keep the unit in microvolts
+        with NWBHDF5IO(path, "a") as io:
+            read_nwbfile = io.read()
+            export_electrical_series(read_nwbfile)
+            io.write(read_nwbfile)
+        with h5py.File(path, "r") as f:
+            group = f["acquisition/ExtracellularSeries_electrical"]
+            assert isinstance(group.get("data", getlink=True), h5py.HardLink)
+            assert not group["data"].is_virtual
+            npt.assert_array_equal(group["data"][:], data)
+            assert group["data"].attrs["unit"] == "volts"
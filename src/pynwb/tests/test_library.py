@@ -0,0 +1,74 @@
+"""Tests for the precomputed probe library."""
+
+import numpy as np
+import numpy.testing as npt
+from ndx_extracellular_channels import (
+    Probe,
+    ProbeModel,
+    from_probeinterface,
+    list_probe_library,
+    save_probe_library,
+)
+from ndx_extracellular_channels.library import load_probe_library
+
+from pynwb import NWBHDF5IO
+
+from .helpers import TempDirTestCase, create_test_nwbfile, create_test_probeinterface_probe
+
+
+class TestProbeLibrary(TempDirTestCase):
+    """Test creating probe models from the bundled library and from a saved library."""
+
+    def test_bundled_library(self):
+        assert "IMEC/Neuropixels 1.0" in list_probe_library()
+        assert load_probe_library() is load_probe_library()
+
+        probe_model = ProbeModel.from_library("IMEC/Neuropixels 1.0")
+        assert probe_model.name == "Neuropixels 1.0"
+        assert probe_model.model == "Neuropixels 1.0"
+        assert probe_model.manufacturer == "IMEC"
+        contacts_table = probe_model.contacts_table
+        assert len(contacts_table) == 960
+        assert contacts_table["contact_id"].data[:2] == ["e0", "e1"]
+        npt.assert_array_equal(
+            contacts_table["relative_position_in_um"].data[:3], [[16.0, 0.0], [48.0, 0.0], [0.0, 20.0]]
+        )
+        npt.assert_array_equal(contacts_table.shared_plane_axes, [[1.0, 0.0], [0.0, 1.0]])
+
+        # the arrays of each ProbeModel are independent of the cached library
+        contacts_table["width_in_um"].data[0] = 0.0
+        assert ProbeModel.from_library("Neuropixels 1.0").contacts_table["width_in_um"].data[0] == 12.0
+
+        four_shank = ProbeModel.from_library("Neuropixels 2.0 - Four Shank", name="NP2 model")
+        assert four_shank.name == "NP2 model"
+        assert len(four_shank.contacts_table) == 4 * 1280
+        assert four_shank.contacts_table["contact_id"].data[1280] == "s1e0"
+
+    def test_unknown_model(self):
+        with self.assertRaisesRegex(ValueError, "'Neuropixels 9.0' is not in the library"):
+            ProbeModel.from_library("Neuropixels 9.0")
+
+    def test_save_and_load_library(self):
+        probe = create_test_probeinterface_probe()
+        path = self.tmp_path / "library.npz"
+        save_probe_library(path, [from_probeinterface(probe)[0].probe_model])
+
+        assert list_probe_library(path) == ["Test/Two Shank"]
+        probe_model = ProbeModel.from_library("Two Shank", path=str(path))
+        contacts_table = probe_model.contacts_table
+        npt.assert_array_equal(contacts_table["relative_position_in_um"].data, probe.contact_positions)
+        assert contacts_table["contact_id"].data == [f"c{i}" for i in range(16)]
+        assert contacts_table["shank_id"].data == probe.shank_ids.tolist()
+        npt.assert_array_equal(contacts_table["plane_axes"].data, probe.contact_plane_axes)
+        npt.assert_array_equal(probe_model.planar_contour_in_um, probe.probe_planar_contour)
+
+        nwbfile = create_test_nwbfile()
+        nwbfile.add_device(probe_model)
+        nwbfile.add_device(Probe(name="Probe", probe_model=probe_model))
+        nwb_path = self.tmp_path / "library.nwb"
+        with NWBHDF5IO(nwb_path, "w") as io:
+            io.write(nwbfile)
+        with NWBHDF5IO(nwb_path, "r") as io:
+            read_contacts_table = io.read().devices["Two Shank"].contacts_table
+            npt.assert_array_equal(read_contacts_table["relative_position_in_um"].data[:], probe.contact_positions)
+            assert np.all(read_contacts_table["contact_id"].data[:] == [f"c{i}" for i in range(16)])
@@ -0,0 +1,148 @@
+"""Tests for the readers of ExtracellularSeries data."""
+
+import os
+import time
+
+import h5py
+import numpy as np
+import numpy.testing as npt
+from ndx_extracellular_channels import BlockPrefetcher, CachedDataset, ChunkCache
+
+from .helpers import TempDirTestCase
+
+
+class _H5DataTestCase(TempDirTestCase):
+    """TestCase with a chunked and compressed HDF5 dataset, ``self.dataset``, and its values, ``self.data``."""
+
+    def setUp(self):
+        super().setUp()
+        self.data = np.random.default_rng(0).integers(-1000, 1000, size=(10000, 8), dtype=np.int16)
+        path = self.tmp_path / "data.h5"
+        with h5py.File(path, "w") as f:
+            f.create_dataset("data", data=self.data, chunks=(1000, 8), compression="gzip")
+        h5_file = h5py.File(path, "r")
+        self.addCleanup(h5_file.close)
+        self.dataset = h5_file["data"]
+
+
+class TestBlockPrefetcher(_H5DataTestCase):
+    """Test iterating over blocks of data read ahead in a background thread."""
+
+    def test_block_prefetcher(self):
+        data, dataset = self.data, self.dataset
+        for prefetch_depth in (1, 3):
+            with self.subTest(prefetch_depth=prefetch_depth):
+                with BlockPrefetcher(dataset, block_size=1500, prefetch_depth=prefetch_depth, start=100) as blocks:
+                    starts = []
+                    for start, block in blocks:
+                        npt.assert_array_equal(block, data[start : start + 1500])
+                        starts.append(start)
+                        time.sleep(0.001)
+                assert starts == list(range(100, 10000, 1500))
+                assert [(timing["start"], timing["stop"]) for timing in blocks.timings] == [
+                    (start, min(start + 1500, 10000)) for start in starts
+                ]
+                summary = blocks.summary()
+                assert summary["num_blocks"] == len(starts)
+                assert 0.0 <= summary["overlap"] <= 1.0
+
+    def test_block_prefetcher_reuses_buffers(self):
+        data = np.arange(100).reshape(50, 2)
+        blocks = BlockPrefetcher(data, block_size=10, prefetch_depth=1)
+        buffers = {id(block.base) for _, block in blocks}
+        assert len(buffers) == 2
+        assert list(blocks) == []
+
+    def test_block_prefetcher_close_early(self):
+        data = np.arange(100).reshape(50, 2)
+        with BlockPrefetcher(data, block_size=10, prefetch_depth=2) as blocks:
+            start, block = next(blocks)
+            npt.assert_array_equal(block, data[:10])
+        assert not blocks._thread.is_alive()
+        assert list(blocks) == []
+
+    def test_block_prefetcher_error(self):
+        class FailingData:
+            shape = (100, 2)
+            dtype = np.dtype("float64")
+
+            def __len__(self):
+                return 100
+
+            def __getitem__(self, key):
+                raise OSError("read failed")
+
+        with self.assertRaisesRegex(OSError, "read failed"):
+            list(BlockPrefetcher(FailingData(), block_size=10))
+
+
+class TestCachedDataset(_H5DataTestCase):
+    """Test serving reads of a dataset from a cache of decoded chunks."""
+
+    def test_cached_dataset(self):
+        data, dataset = self.data, self.dataset
+        cache = ChunkCache(max_bytes=8 * 1000 * 8 * 2)
+        cached = CachedDataset(dataset, cache=cache)
+        assert cached.chunk_shape == (1000, 8)
+
+        npt.assert_array_equal(cached[1500:2500, 2:5], data[1500:2500, 2:5])
+        assert (cache.hits, cache.misses) == (0, 2)
+        npt.assert_array_equal(cached[1800:2100], data[1800:2100])
+        assert (cache.hits, cache.misses) == (2, 2)
+        npt.assert_array_equal(cached[2100:3100, [7, 0, 3]], data[2100:3100, [7, 0, 3]])
+        assert (cache.hits, cache.misses) == (3, 3)
+        npt.assert_array_equal(cached[-1], data[-1])
+        npt.assert_array_equal(cached[5:5], data[5:5])
+
+        # a second view of the same HDF5 dataset shares the cached chunks
+        CachedDataset(dataset.file["data"], cache=cache)[0:3000]
+        assert (cache.hits, cache.misses) == (5, 5)
+
+        # the least recently used chunks are evicted beyond max_bytes
+        npt.assert_array_equal(cached[:], data)
+        assert (cache.hits, cache.misses) == (9, 11)
+        assert len(cache) == 8
+        assert cache.num_bytes == 8 * 1000 * 8 * 2
+        summary = cache.summary()
+        assert summary["evictions"] == 3
+        assert summary["hit_rate"] == cache.hits / (cache.hits + cache.misses)
+
+        with self.assertRaisesRegex(ValueError, "only supports an int or a slice with step 1"):
+            cached[::2]
+
+    def test_cached_dataset_unchunked(self):
+        data = np.arange(200).reshape(50, 4)
+        cached = CachedDataset(data, chunk_shape=(16, 3))
+        npt.assert_array_equal(cached[10:40, 1:4], data[10:40, 1:4])
+        npt.assert_array_equal(cached[10:40, 1:4], data[10:40, 1:4])
+        assert (cached.cache.hits, cached.cache.misses) == (6, 6)
+        assert not cached.cache.get(cached._key + (0, 0), None).flags.writeable
+
+    def test_cached_dataset_freed_array(self):
+        cache = ChunkCache()
+        data = np.arange(200).reshape(50, 4)
+        cached = CachedDataset(data, cache=cache, chunk_shape=(16, 4))
+        npt.assert_array_equal(cached[:], data)
+        assert len(cache) == 4
+
+        # the chunks of an array are removed when it is freed, because its id can be reused
+        del cached, data
+        assert len(cache) == 0
+        assert cache.num_bytes == 0
+        data = np.arange(200, 400).reshape(50, 4)
+        npt.assert_array_equal(CachedDataset(data, cache=cache, chunk_shape=(16, 4))[:], data)
+
+    def test_cached_dataset_modified_file(self):
+        cache = ChunkCache()
+        path = self.tmp_path / "data.h5"
+        npt.assert_array_equal(CachedDataset(self.dataset, cache=cache)[0:10], self.data[0:10])
+        self.dataset.file.close()
+
+        # chunks of a file that was modified since they were cached are not used
+        with h5py.File(path, "a") as f:
+            f["data"][0:10] = 0
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with h5py.File(path, "r") as f:
+            npt.assert_array_equal(CachedDataset(f["data"], cache=cache)[0:10], 0)
+        assert cache.misses == 2
@@ -0,0 +1,72 @@
+"""Tests for extracting waveform snippets from an ExtracellularSeries."""
+
+import h5py
+import numpy as np
+import numpy.testing as npt
+from ndx_extracellular_channels.snippets import _merge_windows
+
+from .helpers import TempDirTestCase, create_test_series
+
+
+class TestExtractSnippets(TempDirTestCase):
+    """Test extracting snippets around many frames with merged reads."""
+
+    def test_get_snippets(self):
+        rng = np.random.default_rng(0)
+        data = rng.integers(-1000, 1000, size=(20000, 6), dtype=np.int16)
+        frames = np.concatenate([rng.integers(20, 19970, size=500), [20, 20, 19970]])
+        rng.shuffle(frames)
+        channels = [4, 1, 2]
+        expected = np.stack([data[f - 20 : f + 30][:, channels] for f in frames])
+
+        path = self.tmp_path / "data.h5"
+        with h5py.File(path, "w") as f:
+            f.create_dataset("data", data=data, chunks=(512, 6), compression="gzip")
+        with h5py.File(path, "r") as f:
+            series = create_test_series(
+                f["data"], channel_conversion=[1.0, 2.0, 3.0, 4.0, 5.0, 6.0], conversion=0.5, offset=1.0
+            )
+            raw = series.get_snippets(
+                frames=frames, num_frames_before=20, num_frames_after=30, channels=channels, convert=False
+            )
+            snippets = series.get_snippets(
+                frames=frames, num_frames_before=20, num_frames_after=30, channels=channels, max_read_frames=2000
+            )
+            memmapped = series.get_snippets(
+                frames=frames,
+                num_frames_before=20,
+                num_frames_after=30,
+                channels=channels,
+                out=self.tmp_path / "snippets.npy",
+                max_gap=0,
+            )
+
+        assert raw.dtype == np.int16
+        npt.assert_array_equal(raw, expected)
+        assert snippets.dtype == np.float32
+        npt.assert_allclose(snippets, expected * (0.5 * np.array([5.0, 2.0, 3.0])) + 1)
+        assert isinstance(memmapped, np.memmap)
+        npt.assert_array_equal(memmapped, snippets)
+        npt.assert_array_equal(np.load(self.tmp_path / "snippets.npy"), snippets)
+
+    def test_get_snippets_invalid(self):
+        series = create_test_series(np.zeros((100, 2)))
+        with self.assertRaisesRegex(ValueError, "The windows around some frames extend beyond the data"):
+            series.get_snippets(frames=[5], num_frames_before=10, num_frames_after=10)
+        with self.assertRaisesRegex(ValueError, "must be a floating point type"):
+            series.get_snippets(frames=[50], num_frames_before=10, num_frames_after=10, dtype="int16")
+        assert series.get_snippets(frames=[], num_frames_before=10, num_frames_after=10).shape == (0, 20, 2)
+        snippets = series.get_snippets(frames=[50, 60], num_frames_before=10, num_frames_after=10, channels=[])
+        assert snippets.shape == (2, 20, 0)
+        assert snippets.dtype == np.float32
+
+    def test_merge_windows(self):
+        starts = np.array([0, 5, 40, 95, 300])
+        # windows of 10 frames merged if at most 30 frames apart, reads aligned to chunks of 16 frames
+        reads = list(_merge_windows(starts, 10, 30, 1000, 16, 310))
+        assert reads == [(0, 3, 0, 64), (3, 4, 80, 112), (4, 5, 288, 310)]
+        reads = list(_merge_windows(starts, 10, 60, 1000, 16, 310))
+        assert reads == [(0, 4, 0, 112), (4, 5, 288, 310)]
+        # long reads are split
+        reads = list(_merge_windows(starts, 10, 60, 50, 1, 310))
+        assert reads == [(0, 3, 0, 50), (3, 4, 95, 105), (4, 5, 300, 310)]
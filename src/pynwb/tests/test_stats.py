@@ -0,0 +1,64 @@
+"""Tests for the streaming per-channel statistics of an ExtracellularSeries."""
+
+import h5py
+import numpy as np
+import numpy.testing as npt
+
+from .helpers import TempDirTestCase, create_test_series
+
+
+def _expected_stats(data, gains, offset):
+    uv = data * gains + offset
+    return dict(
+        mean_in_uv=uv.mean(axis=0),
+        rms_in_uv=np.sqrt((uv**2).mean(axis=0)),
+        std_in_uv=uv.std(axis=0),
+        min_in_uv=uv.min(axis=0),
+        max_in_uv=uv.max(axis=0),
+    )
+
+
+class TestComputeChannelStats(TempDirTestCase):
+    """Test computing per-channel statistics in blocks from an HDF5 dataset and from an array."""
+
+    def test_compute_channel_stats(self):
+        rng = np.random.default_rng(0)
+        data = (rng.normal(0, 20, size=(10000, 4)) + [0, 100, -50, 2000]).astype(np.int16)
+        data[[10, 20, 30], 1] = np.iinfo(np.int16).max
+        data[40, 2] = np.iinfo(np.int16).min
+
+        path = self.tmp_path / "data.h5"
+        with h5py.File(path, "w") as f:
+            f.create_dataset("data", data=data, chunks=(1000, 4), compression="gzip")
+        with h5py.File(path, "r") as f:
+            series = create_test_series(
+                f["data"],
+                channel_rows=[1, 3, 5, 7],
+                num_channels=8,
+                channel_conversion=[1.0, 1.1, 1.2, 1.3],
+                conversion=0.195,
+            )
+            stats = series.compute_channel_stats(block_size=999, max_workers=3)
+
+        gains = 0.195 * np.array([1.0, 1.1, 1.2, 1.3])
+        assert list(stats.index) == [1, 3, 5, 7]
+        for name, expected in _expected_stats(data.astype(np.float64), gains, 0.0).items():
+            npt.assert_allclose(stats[name], expected, rtol=1e-10, err_msg=name)
+        npt.assert_array_equal(stats["num_saturated"], [0, 3, 1, 0])
+        # the MAD noise of normally distributed data estimates the standard deviation of the noise
+        npt.assert_allclose(stats["mad_noise_in_uv"], 20 * gains, rtol=0.05)
+
+    def test_compute_channel_stats_columns(self):
+        data = np.arange(60, dtype=np.float64).reshape(20, 3)
+        series = create_test_series(data, channel_rows=[0, 2, 4], num_channels=8, offset=1.0)
+        stats = series.compute_channel_stats(block_size=7, column_prefix="ap_")
+
+        npt.assert_allclose(stats["mean_in_uv"], data.mean(axis=0) + 1.0)
+        npt.assert_array_equal(stats["num_saturated"], [0, 0, 0])
+        channels_table = series.channels.table
+        npt.assert_allclose(channels_table["ap_rms_in_uv"].data[::2][:3], stats["rms_in_uv"])
+        assert np.isnan(channels_table["ap_rms_in_uv"].data[1])
+        assert channels_table["ap_num_saturated"].data[1] == -1
+
+        with self.assertRaisesRegex(ValueError, "ChannelsTable 'ChannelsTable': Columns"):
+            series.compute_channel_stats(column_prefix="ap_")
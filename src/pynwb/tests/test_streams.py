@@ -0,0 +1,71 @@
+"""Tests for building and writing several streams from the same contacts."""
+
+import numpy as np
+import numpy.testing as npt
+from ndx_extracellular_channels import MultiStreamBuilder
+
+from pynwb import NWBHDF5IO
+
+from .helpers import TempDirTestCase, create_test_nwbfile, create_test_probe
+
+
+def _create_nwbfile(probe):
+    nwbfile = create_test_nwbfile()
+    nwbfile.add_device(probe.probe_model)
+    nwbfile.add_device(probe)
+    return nwbfile
+
+
+class TestMultiStreamBuilder(TempDirTestCase):
+    """Test building the AP and LF streams of the same contacts and writing them in a single pass."""
+
+    def setUp(self):
+        super().setUp()
+        self.probe = create_test_probe(num_contacts=6, contact_id=[f"e{i}" for i in range(6)])
+
+    def test_multi_stream_builder(self):
+        # interleaved source: AP and LF channels of contacts e4, e1, e2 alternate, followed by a sync channel
+        source = np.arange(1000 * 7, dtype=np.int16).reshape(1000, 7)
+        builder = MultiStreamBuilder(
+            self.probe,
+            contacts=["e4", "e1", "e2"],
+            streams={
+                "AP": dict(source_channels=[0, 2, 4], filter="High-pass filter at 300 Hz."),
+                "LF": dict(source_channels=[1, 3, 5], description="LF channels"),
+            },
+        )
+        ap_table = builder.channels_tables["AP"]
+        assert ap_table.name == "AP_channels"
+        npt.assert_array_equal(ap_table["contact"].data, [4, 1, 2])
+        assert ap_table["filter"].data == ["High-pass filter at 300 Hz."] * 3
+        assert builder.channels_tables["LF"].description == "LF channels"
+        assert builder.channels_tables["LF"].probe is self.probe
+
+        nwbfile = _create_nwbfile(self.probe)
+        series = builder.add_to_nwbfile(nwbfile, source, rate=30000.0, conversion=0.195, chunks=(128, 3))
+        assert set(series) == {"AP", "LF"}
+        path = self.tmp_path / "streams.nwb"
+        with NWBHDF5IO(path, "w") as io:
+            io.write(nwbfile)
+            builder.write_data(source, block_size=300)
+
+        with NWBHDF5IO(path, "r") as io:
+            read_nwbfile = io.read()
+            ap = read_nwbfile.acquisition["AP"]
+            lf = read_nwbfile.acquisition["LF"]
+            npt.assert_array_equal(ap.data[:], source[:, [0, 2, 4]])
+            npt.assert_array_equal(lf.data[:], source[:, [1, 3, 5]])
+            assert ap.data.chunks == (128, 3)
+            assert ap.conversion == 0.195
+            assert ap.channels.table is read_nwbfile.acquisition["AP_channels"]
+            npt.assert_array_equal(lf.channels.table["contact"].data[:], [4, 1, 2])
+
+    def test_multi_stream_builder_errors(self):
+        with self.assertRaisesRegex(ValueError, "Stream 'AP' has 2 source channels but there are 3 contacts."):
+            MultiStreamBuilder(self.probe, contacts=[0, 1, 2], streams={"AP": dict(source_channels=[0, 1])})
+
+        builder = MultiStreamBuilder(self.probe, contacts=[0, 1], streams={"AP": dict(source_channels=[0, 1])})
+        source = np.zeros((10, 2), dtype=np.int16)
+        builder.add_to_nwbfile(_create_nwbfile(self.probe), source, rate=30000.0)
+        with self.assertRaisesRegex(ValueError, "must be written with `io.write` before `write_data` is called"):
+            builder.write_data(source)
@@ -0,0 +1,106 @@
+"""Tests for the batch validation of NWB files."""
+
+import h5py
+import numpy as np
+from ndx_extracellular_channels import (
+    ExtracellularSeries,
+    validate_nwb_file,
+    validate_nwb_files,
+)
+
+from pynwb import NWBHDF5IO
+
+from .helpers import TempDirTestCase, create_test_channels_table, create_test_nwbfile, create_test_probe
+
+
+def _write_file(path, channel_conversion=None):
+    nwbfile = create_test_nwbfile()
+    probe = create_test_probe(positions=[[10.0 * (i % 2), 20.0 * i] for i in range(4)])
+    nwbfile.add_device(probe.probe_model)
+    nwbfile.add_device(probe)
+    channels_table = create_test_channels_table(probe, [3, 0, 2], name="channels")
+    nwbfile.add_acquisition(channels_table)
+    nwbfile.add_acquisition(
+        ExtracellularSeries(
+            name="ExtracellularSeries",
+            data=np.zeros((10, 3), dtype=np.int16),
+            channels=channels_table.create_region(name="channels", region=[0, 1, 2], description="All channels"),
+            channel_conversion=channel_conversion,
+            rate=30000.0,
+        )
+    )
+    with NWBHDF5IO(path, "w") as io:
+        io.write(nwbfile)
+    return str(path)
+
+
+class TestValidateNWBFiles(TempDirTestCase):
+    """Test validating NWB files against the namespace and the checks of the extension."""
+
+    def test_validate_nwb_file(self):
+        report = validate_nwb_file(_write_file(self.tmp_path / "valid.nwb"))
+        assert report == {"file_path": str(self.tmp_path / "valid.nwb"), "valid": True, "errors": []}
+
+        path = _write_file(self.tmp_path / "invalid.nwb", channel_conversion=[1.0, 1.0, 1.0])
+        with h5py.File(path, "a") as f:
+            series = f["acquisition/ExtracellularSeries"]
+            attrs = dict(series["data"].attrs)
+            del series["data"]
+            series.create_dataset("data", data=np.zeros((3, 10), dtype=np.int16))
+            series["data"].attrs.update(attrs)
+            f["acquisition/channels/contact"][1] = 4
+
+        report = validate_nwb_file(path)
+        assert not report["valid"]
+        checks = {error["check"]: error for error in report["errors"]}
+        assert set(checks) == {"channels", "channel_conversion", "contact"}
+        assert checks["channels"]["object_path"] == "/acquisition/ExtracellularSeries"
+        assert "should be transposed" in checks["channels"]["message"]
+        assert checks["contact"]["object_path"] == "/acquisition/channels/contact"
+        assert "e.g., 4 at row 1" in checks["contact"]["message"]
+
+    def test_validate_unit(self):
+        path = _write_file(self.tmp_path / "unit.nwb")
+        with h5py.File(path, "a") as f:
+            # data linked from an ElectricalSeries keeps its unit in volts
+            volts = f.create_dataset("analysis/volts", data=np.zeros((10, 3), dtype=np.int16))
+            volts.attrs.update(unit="volts", conversion=1e-6, resolution=-1.0, offset=0.0)
+            del f["acquisition/ExtracellularSeries/data"]
+            f["acquisition/ExtracellularSeries/data"] = h5py.SoftLink("/analysis/volts")
+
+        report = validate_nwb_file(path)
+        assert not report["valid"]
+        assert [error["check"] for error in report["errors"]] == ["unit"]
+        assert report["errors"][0]["object_path"] == "/acquisition/ExtracellularSeries/data"
+        assert "'volts' (conversion 1e-06) instead of 'microvolts'" in report["errors"][0]["message"]
+
+        with h5py.File(path, "a") as f:
+            f["analysis/volts"].attrs.update(unit="microvolts", conversion=np.nan)
+        report = validate_nwb_file(path)
+        assert [error["check"] for error in report["errors"]] == ["unit"]
+        assert "not finite and nonzero" in report["errors"][0]["message"]
+
+    def test_validate_schema_and_read_errors(self):
+        path = _write_file(self.tmp_path / "schema.nwb")
+        with h5py.File(path, "a") as f:
+            del f["general/devices/Neuropixels 1.0/contacts_table/relative_position_in_um"]
+        report = validate_nwb_file(path)
+        assert [error["check"] for error in report["errors"]] == ["schema"]
+        assert "relative_position_in_um" in report["errors"][0]["message"]
+
+        (self.tmp_path / "broken.nwb").write_bytes(b"not an HDF5 file")
+        report = validate_nwb_file(str(self.tmp_path / "broken.nwb"))
+        assert [error["check"] for error in report["errors"]] == ["read"]
+
+    def test_validate_nwb_files(self):
+        paths = [_write_file(self.tmp_path / f"file{i}.nwb") for i in range(4)]
+        with h5py.File(paths[1], "a") as f:
+            f["acquisition/channels/contact"][0] = -1
+
+        for max_workers in (1, 2):
+            reports = validate_nwb_files(paths, max_workers=max_workers)
+            assert [report["file_path"] for report in reports] == paths
+            assert [report["valid"] for report in reports] == [True, False, True, True]
+
+            reports = validate_nwb_files(paths, max_workers=max_workers, stop_on_error=True)
+            assert [report["valid"] for report in reports] == [True, False]
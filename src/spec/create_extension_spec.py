@@ -110,6 +110,20 @@ def main():
                 quantity="?",
             ),
         ],
+        attributes=[
+            NWBAttributeSpec(
+                name="shared_plane_axes",
+                doc=(
+                    "The axes defining the contact plane, shared by all contacts. This is a compact alternative to "
+                    "the `plane_axes` column for probes where all contacts have the same orientation, and should "
+                    "not be used together with the `plane_axes` column. See `plane_axes` for the format."
+                ),
+                dtype="float",
+                dims=[["v1, v2", "x, y"], ["v1, v2", "x, y, z"]],
+                shape=[[2, 2], [2, 3]],
+                required=False,
+            ),
+        ],
     )
 
     probe = NWBGroupSpec(